@@ -102,6 +102,20 @@ def from_entity_model_meta(value: ModelEntityMeta) -> BaseModel:
     return cls(**value['data'])
 
 
+def _is_json_compact(value: Any) -> bool:
+    """
+    whether the value can be dumped to json and loaded back without losing anything.
+    """
+    if value is None or type(value) in (bool, int, float, str):
+        # subclasses such as enums are not loaded back as themselves.
+        return True
+    elif type(value) is list:
+        return all(_is_json_compact(item) for item in value)
+    elif type(value) is dict:
+        return all(isinstance(k, str) and _is_json_compact(v) for k, v in value.items())
+    return False
+
+
 def to_entity_meta(value: Union[EntityType, Any]) -> EntityMeta:
     if value is None:
         return EntityMeta(
@@ -110,18 +124,23 @@ def to_entity_meta(value: Union[EntityType, Any]) -> EntityMeta:
         )
     elif value is True or value is False:
         return EntityMeta(type="bool", content=str(value))
-    elif isinstance(value, int):
+    # the subclasses such as enums are not loaded back as themselves from the text, they are pickled.
+    elif type(value) is int:
         return EntityMeta(type="int", content=str(value))
-    elif isinstance(value, str):
+    elif type(value) is str:
         return EntityMeta(type="str", content=str(value))
-    elif isinstance(value, float):
+    elif type(value) is float:
         return EntityMeta(type="float", content=str(value))
-    elif isinstance(value, list):
-        content = yaml.safe_dump(value)
-        return EntityMeta(type="list", content=content)
-    elif isinstance(value, dict):
-        content = yaml.safe_dump(value)
-        return EntityMeta(type="dict", content=content)
+    elif isinstance(value, (list, dict)) and _is_json_compact(value):
+        # json is much more compact and faster than yaml.
+        content = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        return EntityMeta(type="json", content=content)
+    elif isinstance(value, (list, dict)):
+        try:
+            content = yaml.safe_dump(value)
+        except yaml.YAMLError:
+            return _to_pickle_entity_meta(value)
+        return EntityMeta(type="list" if isinstance(value, list) else "dict", content=content)
     elif hasattr(value, '__to_entity_meta__'):
         return getattr(value, '__to_entity_meta__')()
     elif isinstance(value, BaseModel):
@@ -139,12 +158,16 @@ def to_entity_meta(value: Union[EntityType, Any]) -> EntityMeta:
         content = value.model_dump_json(exclude_defaults=True)
         return EntityMeta(type=type_, content=content)
     else:
-        content_bytes = pickle.dumps(value)
-        content = base64.encodebytes(content_bytes)
-        return EntityMeta(
-            type="pickle",
-            content=content.decode(),
-        )
+        return _to_pickle_entity_meta(value)
+
+
+def _to_pickle_entity_meta(value: Any) -> EntityMeta:
+    content_bytes = pickle.dumps(value)
+    content = base64.b64encode(content_bytes)
+    return EntityMeta(
+        type="pickle",
+        content=content.decode(),
+    )
 
 
 T = TypeVar("T")
@@ -173,6 +196,8 @@ def from_entity_meta(meta: EntityMeta, module: Optional[ModuleType] = None) -> A
         return meta['content'] == "True"
     elif unmarshal_type == "float":
         return float(meta['content'])
+    elif unmarshal_type == "json":
+        return json.loads(meta['content'])
     elif unmarshal_type == "list" or unmarshal_type == "dict":
         return yaml.safe_load(meta['content'])
     elif unmarshal_type == 'pickle':
@@ -19,6 +19,9 @@ from ghostos_common.helpers.modules import (
     rewrite_module_by_path,
     create_module,
     create_and_bind_module,
+    compile_source_cached,
+    get_source_hash,
+    reload_module_if_changed,
 )
 from ghostos_common.helpers.io import BufferPrint
 from ghostos_common.helpers.timeutils import Timeleft, timestamp_datetime, timestamp, timestamp_ms
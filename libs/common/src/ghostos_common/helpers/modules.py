@@ -1,6 +1,9 @@
 import inspect
 from typing import Any, Tuple, Optional, Dict, Callable, Type, TypeVar
-from types import ModuleType
+from types import ModuleType, CodeType
+from collections import OrderedDict
+from threading import Lock
+import hashlib
 import os
 import sys
 
@@ -21,6 +24,9 @@ __all__ = [
     'create_module',
     'create_and_bind_module',
     'get_module_fullname_from_path',
+    'compile_source_cached',
+    'get_source_hash',
+    'reload_module_if_changed',
 ]
 
 Importer = Callable[[str], ModuleType]
@@ -96,17 +102,90 @@ def parse_import_path_module_and_attr_name(import_path: str) -> Tuple[str, Optio
     return parts[0], parts[1]
 
 
+SOURCE_HASH_ATTR = "__source_hash__"
+""" the attribute of the module that records the hash of the source code it executed """
+
+_code_cache: "OrderedDict[Tuple[str, str], CodeType]" = OrderedDict()
+_code_cache_lock = Lock()
+_code_cache_size = 256
+
+
+def get_source_hash(source: str) -> str:
+    return hashlib.md5(source.encode("utf-8")).hexdigest()
+
+
+def compile_source_cached(source: str, filename: str, source_hash: Optional[str] = None) -> CodeType:
+    """
+    compile python source code with an in-memory cache keyed by (filename, source hash).
+    unlike `__pycache__`, it does not write anything to disk and does not depend on the mtime of the file,
+    so it is safe for the temp modules and the modules rewritten many times in one second.
+    """
+    if source_hash is None:
+        source_hash = get_source_hash(source)
+    key = (filename, source_hash)
+    with _code_cache_lock:
+        code = _code_cache.get(key, None)
+        if code is not None:
+            _code_cache.move_to_end(key)
+            return code
+    code = compile(source, filename, "exec", dont_inherit=True)
+    with _code_cache_lock:
+        _code_cache[key] = code
+        while len(_code_cache) > _code_cache_size:
+            _code_cache.popitem(last=False)
+    return code
+
+
+def _read_source(file_path: str) -> str:
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _exec_module_source(module: ModuleType, file_path: str, source: str) -> None:
+    source_hash = get_source_hash(source)
+    code = compile_source_cached(source, file_path, source_hash)
+    exec(code, module.__dict__)
+    setattr(module, SOURCE_HASH_ATTR, source_hash)
+
+
 def create_module(module_name: str, file_path: str):
     from importlib import util
 
     # 加载模块
     spec = util.spec_from_file_location(module_name, file_path)
     module = util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    if file_path.endswith(".py"):
+        _exec_module_source(module, file_path, _read_source(file_path))
+    else:
+        spec.loader.exec_module(module)
 
     return module
 
 
+def reload_module_if_changed(module: ModuleType, source: Optional[str] = None) -> bool:
+    """
+    reload the module from its source file only if the source code changed since it was executed.
+    :param module: the module to reload.
+    :param source: the source code already known, to avoid reading the file again.
+    :return: whether the module is reloaded.
+    """
+    file_path = getattr(module, "__file__", None)
+    if not file_path or not file_path.endswith(".py") or not os.path.exists(file_path):
+        from importlib import reload
+        reload(module)
+        return True
+    if source is None:
+        source = _read_source(file_path)
+    source_hash = get_source_hash(source)
+    # the modules imported by the import system have no source hash, they are reloaded at the first time.
+    if getattr(module, SOURCE_HASH_ATTR, None) == source_hash:
+        return False
+    code = compile_source_cached(source, file_path, source_hash)
+    exec(code, module.__dict__)
+    setattr(module, SOURCE_HASH_ATTR, source_hash)
+    return True
+
+
 def get_module_fullname_from_path(file_path: str, use_longest_match: bool = True) -> Optional[str]:
     """
     根据文件的绝对路径反解出模块名。
@@ -160,10 +239,17 @@ def get_module_fullname_from_path(file_path: str, use_longest_match: bool = True
     return module_path
 
 
-def create_and_bind_module(modulename: str, filename: str, force: bool = False):
+def create_and_bind_module(modulename: str, filename: str, force: bool = False, reload_changed: bool = False):
+    """
+    :param force: always create the module again from the file.
+    :param reload_changed: execute the bound module again only if its source file changed.
+    """
     from sys import modules
     if not force and modulename in modules:
-        return modules[modulename]
+        existing = modules[modulename]
+        if reload_changed and filename.endswith(".py") and getattr(existing, "__file__", None) == filename:
+            reload_module_if_changed(existing)
+        return existing
     module = create_module(modulename, filename)
     modules[modulename] = module
     return module
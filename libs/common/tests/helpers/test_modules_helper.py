@@ -34,3 +34,41 @@ def test_get_module_fullname_from_path():
     modulename = get_module_fullname_from_path(helpers.__file__, use_longest_match=True)
     assert modulename is not None
     assert modulename.endswith("ghostos_common.helpers")
+
+
+def test_create_and_bind_module_with_source_hash(tmp_path):
+    import sys
+    from ghostos_common.helpers import create_and_bind_module, reload_module_if_changed
+
+    filename = str(tmp_path.joinpath("ghostos_temp_hashed_module.py"))
+    with open(filename, "w") as f:
+        f.write("value = 1\ncounter = []\ncounter.append(1)\n")
+
+    modulename = "ghostos_temp_hashed_module"
+    try:
+        module = create_and_bind_module(modulename, filename)
+        assert module.value == 1
+        counter = module.counter
+        # unchanged source is not executed again.
+        assert not reload_module_if_changed(module)
+        assert create_and_bind_module(modulename, filename, reload_changed=True) is module
+        assert module.counter is counter
+
+        with open(filename, "w") as f:
+            f.write("value = 2\ncounter = []\n")
+        assert reload_module_if_changed(module)
+        assert module.value == 2
+        assert module.counter is not counter
+
+        with open(filename, "w") as f:
+            f.write("value = 3\n")
+        assert create_and_bind_module(modulename, filename, reload_changed=True) is module
+        assert module.value == 3
+
+        # force always creates the module again.
+        forced = create_and_bind_module(modulename, filename, force=True)
+        assert forced is not module
+        assert forced.value == 3
+        assert sys.modules[modulename] is forced
+    finally:
+        sys.modules.pop(modulename, None)
@@ -1,5 +1,6 @@
 from ghostos_common.entity import to_entity_meta, from_entity_meta
 from pydantic import BaseModel
+from enum import Enum
 
 
 class Foo:
@@ -36,3 +37,18 @@ def test_entities():
         meta = to_entity_meta(c)
         value = from_entity_meta(meta)
         assert value == c, f"{c}: {value}"
+
+
+class Color(str, Enum):
+    red = "red"
+
+
+def test_enum_values_are_pickled():
+    meta = to_entity_meta({"a": 1})
+    assert meta["type"] == "json"
+    for value in [Color.red, {"color": Color.red}, [Color.red]]:
+        meta = to_entity_meta(value)
+        # the enums are not loaded back from json or yaml.
+        assert meta["type"] == "pickle"
+        assert from_entity_meta(meta) == value
+    assert from_entity_meta(to_entity_meta(Color.red)) is Color.red
@@ -1,7 +1,13 @@
 from __future__ import annotations
 import inspect
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import CodeType
+from weakref import WeakKeyDictionary
 from abc import ABCMeta, abstractmethod
-from typing import Type, Dict, TypeVar, Callable, Set, Optional, List, Generic, Any, Union, Iterable
+from typing import Type, Dict, TypeVar, Callable, Set, Optional, List, Generic, Any, Union, Iterable, Tuple
 from typing import get_args, get_origin, ClassVar
 
 __all__ = [
@@ -12,6 +18,11 @@ __all__ = [
     "ProviderAdapter", 'provide',
     'Contracts',
     'get_caller_info',
+    'CallerInfo',
+    'capture_caller_info',
+    'set_debug_lineinfo',
+    'ContainerProfiler',
+    'set_container_profiler',
     'get_container',
     'set_container',
 ]
@@ -167,6 +178,61 @@ class FactoryType(metaclass=ABCMeta):
         pass
 
 
+InjectionPlan = Tuple[Tuple[str, Any, Any], ...]
+"""(parameter name, resolved typehint or None, default value) of a callable for injection"""
+
+_make_plans: WeakKeyDictionary = WeakKeyDictionary()
+"""class => injection plan of its __init__"""
+
+_call_plans: WeakKeyDictionary = WeakKeyDictionary()
+"""function => injection plan"""
+
+_making = threading.local()
+"""the classes being made by the current thread, to detect the dependency cycles."""
+
+
+def _build_injection_plan(caller: Callable, local_values: Dict, drop_first: bool = False) -> InjectionPlan:
+    """
+    reflect the parameters of the caller once. string annotations are resolved by the local values,
+    the parameters with unresolved string annotations are not injected.
+    """
+    empty = inspect.Parameter.empty
+    plan = []
+    parameters = list(inspect.signature(caller).parameters.items())
+    if drop_first:
+        parameters = parameters[1:]
+    for name, param in parameters:
+        if name == "self":
+            continue
+        typehint = None
+        annotation = param.annotation
+        if annotation and annotation is not empty:
+            typehint = annotation
+            if isinstance(typehint, str) and typehint in local_values:
+                typehint = local_values[typehint]
+            if isinstance(typehint, str):
+                continue
+        plan.append((name, typehint, param.default))
+    return tuple(plan)
+
+
+def _get_injection_plan(plans: WeakKeyDictionary, key: Any, build: Callable[[], InjectionPlan]) -> InjectionPlan:
+    try:
+        plan = plans.get(key, None)
+    except TypeError:
+        # not weak referable, such as some builtins.
+        return build()
+    if plan is None:
+        plan = build()
+        plans[key] = plan
+    return plan
+
+
+def _module_values(target: Any) -> Dict:
+    target_module = inspect.getmodule(target)
+    return target_module.__dict__ if target_module is not None else {}
+
+
 class Container(IoCContainer):
     """
     一个简单的 IoC 容器.
@@ -207,19 +273,39 @@ class Container(IoCContainer):
         self._aliases: Dict[Any, Any] = {}
         self._is_shutdown: bool = False
         self._shutdown: List[Callable[[], None]] = []
-        self._making_count: int = 0
-        if inherit and parent is not None:
-            self._inherit(parent)
+        # inheritable providers of the ancestors are not copied, but looked up through the parent chain,
+        # so creating a child container is constant time.
+        self._inherit: bool = inherit and parent is not None
+        # singletons of a contract are built exactly once under its own re-entrant lock,
+        # the container level lock only guards the creation of the contract locks.
+        self._locks_lock = threading.Lock()
+        self._contract_locks: Dict[Any, threading.RLock] = {}
+        # bumped when the bindings of this container change. the sum of the generations of the ancestors
+        # is the stamp of the resolved cache: contract => (stamp, inherited provider, owner container)
+        self._generation: int = 0
+        self._resolved: Dict[Any, Tuple[int, Optional[Provider], Optional[Container]]] = {}
+        self._lookup_hits: int = 0
+        self._lookup_misses: int = 0
 
         Container.instance_count += 1
 
-    def _inherit(self, parent: Container):
+    def _get_inherited_provider(self, abstract: Any) -> Optional[Provider]:
         """
-        inherit none singleton provider from parent
+        find the nearest provider of the ancestors, return it if it is inheritable.
+        the inherited provider makes instance with the child container.
         """
-        for provider in parent.providers(recursively=True):
-            if provider.inheritable() and not isinstance(provider, Bootstrapper):
-                self._register(provider)
+        con = self.parent
+        while con is not None:
+            provider = con._providers.get(abstract, None)
+            if provider is None and abstract in con._aliases:
+                # the aliases of the inherited provider are inherited too.
+                provider = con.get_provider(con._aliases[abstract])
+            if provider is not None:
+                if provider.inheritable() and not isinstance(provider, Bootstrapper):
+                    return provider
+                return None
+            con = con.parent
+        return None
 
     def bootstrap(self) -> None:
         """
@@ -272,10 +358,11 @@ class Container(IoCContainer):
         - params 感觉不需要.
         """
         self._check_destroyed()
+        profiler = _profiler
+        if profiler is not None:
+            profiler.on_fetch(abstract)
         # 进行初始化.
         if not self._bootstrapped:
-            caller_info = get_caller_info(4)
-            # warnings.warn("container is not bootstrapped before using: %s" % (caller_info,))
             self.bootstrap()
 
         # get bound instance
@@ -286,19 +373,30 @@ class Container(IoCContainer):
         # use provider as factory to initialize instance of the contract
         if abstract in self._providers:
             provider = self._providers[abstract]
-            made = provider.factory(self)
-            if made is not None and provider.singleton():
-                self._set_instance(abstract, made)
-            return made
+            if not provider.singleton():
+                return self._call_factory(abstract, provider)
+            return self._make_singleton(abstract, provider)
+
+        # the resolution of the ancestors is cached until any binding of the ancestors changes.
+        provider, owner = self._resolve(abstract)
+
+        # inherited provider from the ancestors, override by the providers of this container.
+        if provider is not None:
+            contract = provider.contract()
+            if contract != abstract:
+                # inherited alias
+                return self.get(contract)
+            if not provider.singleton():
+                return self._call_factory(abstract, provider)
+            return self._make_singleton(abstract, provider)
 
         # factory type is self registered
         if isinstance(abstract, type) and issubclass(abstract, FactoryType):
-            provider = provide(abstract, abstract.singleton(), get_caller_info(2))(abstract.factory)
+            provider = provide(abstract, abstract.singleton(), capture_caller_info(2))(abstract.factory)
             self.register(provider)
-            made = abstract.factory(self)
-            if made is not None and abstract.singleton():
-                self._set_instance(abstract, made)
-            return made
+            if not abstract.singleton():
+                return self._call_factory(abstract, provider)
+            return self._make_singleton(abstract, provider)
 
         # search aliases if the real contract exists
         if abstract in self._aliases:
@@ -306,10 +404,131 @@ class Container(IoCContainer):
             return self.get(contract)
 
         # at last
-        if self.parent is not None:
-            return self.parent.get(abstract)
+        if owner is not None:
+            return owner.get(abstract)
         return None
 
+    def _call_factory(self, abstract: Any, provider: Provider) -> Any:
+        profiler = _profiler
+        if profiler is None:
+            return provider.factory(self)
+        with profiler.building(abstract, self, provider.singleton()):
+            return provider.factory(self)
+
+    def _ancestry_generation(self) -> int:
+        generation = 0
+        con = self.parent
+        while con is not None:
+            generation += con._generation
+            con = con.parent
+        return generation
+
+    def _resolve(self, abstract: Any) -> Tuple[Optional[Provider], Optional[Container]]:
+        """
+        resolve the contract from the ancestors.
+        :return: (the inherited provider, the nearest ancestor container which owns the contract)
+        """
+        parent = self.parent
+        if parent is None:
+            return None, None
+        cached = self._resolved.get(abstract, None)
+        if cached is not None and cached[0] == self._ancestry_generation():
+            self._lookup_hits += 1
+            return cached[1], cached[2]
+
+        self._lookup_misses += 1
+        parent._check_destroyed()
+        # the ancestors are bootstrapped before they are searched, as `parent.get` does.
+        if not parent._bootstrapped:
+            parent.bootstrap()
+        if (
+                abstract in parent._instances
+                or abstract in parent._providers
+                or abstract in parent._aliases
+                or (isinstance(abstract, type) and issubclass(abstract, FactoryType))
+        ):
+            owner = parent
+        else:
+            parent_inherited, owner = parent._resolve(abstract)
+            if parent_inherited is not None:
+                owner = parent
+        inherited = self._get_inherited_provider(abstract) if self._inherit else None
+        self._resolved[abstract] = (self._ancestry_generation(), inherited, owner)
+        return inherited, owner
+
+    def warmup(
+            self,
+            contracts: Optional[Iterable[ABSTRACT]] = None,
+            parallel: bool = True,
+            max_workers: Optional[int] = None,
+    ) -> Dict[Any, Exception]:
+        """
+        resolve the singleton providers of this container ahead of time.
+        with parallel, the contracts are fetched concurrently in a thread pool;
+        the shared dependencies are still built once by the per-contract locks.
+        :param contracts: the contracts to resolve, default are all the singleton providers of this container.
+        :param parallel: resolve in a thread pool or one by one.
+        :param max_workers: max workers of the thread pool.
+        :return: the contracts failed to resolve, and the errors.
+        """
+        self._check_destroyed()
+        # bootstrap in the caller thread, bootstrappers may register more providers.
+        self.bootstrap()
+        if contracts is None:
+            contracts = [
+                contract for contract, provider in list(self._providers.items())
+                if provider.singleton() and contract not in self._instances
+            ]
+        else:
+            contracts = list(contracts)
+
+        errors: Dict[Any, Exception] = {}
+        if not parallel or len(contracts) < 2:
+            for contract in contracts:
+                try:
+                    self.get(contract)
+                except Exception as e:
+                    errors[contract] = e
+            return errors
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="container_warmup") as executor:
+            futures = {contract: executor.submit(self.get, contract) for contract in contracts}
+            for contract, future in futures.items():
+                e = future.exception()
+                if e is not None:
+                    errors[contract] = e
+        return errors
+
+    def lookup_stats(self) -> Dict[str, int]:
+        """
+        the hits and misses of the resolved cache of this container.
+        """
+        return {"hits": self._lookup_hits, "misses": self._lookup_misses}
+
+    def _contract_lock(self, abstract: Any) -> threading.RLock:
+        lock = self._contract_locks.get(abstract, None)
+        if lock is None:
+            with self._locks_lock:
+                lock = self._contract_locks.setdefault(abstract, threading.RLock())
+        return lock
+
+    def _make_singleton(self, abstract: Any, provider: Provider) -> Any:
+        """
+        double-checked singleton making.
+        the lock is re-entrant, so the factory can fetch other contracts (or itself) of the same thread.
+        """
+        with self._contract_lock(abstract):
+            got = self._instances.get(abstract, None)
+            if got is not None:
+                return got
+            made = self._call_factory(abstract, provider)
+            if made is not None:
+                # the owner of the contract is not changed, so the generation is not bumped.
+                self._add_bound_contract(abstract)
+                self._instances[abstract] = made
+            return made
+
     def get_bound(self, abstract: ABSTRACT) -> Union[INSTANCE, Provider, None]:
         """
         get bound of an abstract
@@ -334,7 +553,7 @@ class Container(IoCContainer):
             singleton: bool = False,
     ):
         self._check_destroyed()
-        lineinfo = get_caller_info(2)
+        lineinfo = capture_caller_info(2)
 
         def _maker(c):
             return maker()
@@ -364,10 +583,12 @@ class Container(IoCContainer):
             provider.bootstrap(self)
 
     def _bind_alias(self, alias: Any, contract: Any) -> None:
+        self._generation += 1
         self._aliases[alias] = contract
         self._bound.add(alias)
 
     def _register_provider(self, contract: ABSTRACT, provider: Provider) -> None:
+        self._generation += 1
         # remove singleton instance that already bound
         if contract in self._instances:
             del self._instances[contract]
@@ -425,6 +646,7 @@ class Container(IoCContainer):
         """
         设定常量.
         """
+        self._generation += 1
         self._add_bound_contract(abstract)
         self._instances[abstract] = instance
 
@@ -457,16 +679,18 @@ class Container(IoCContainer):
             raise RuntimeError(f"container {self.bloodline} is called after destroyed")
 
     def make(self, cls: Type[INSTANCE], *args, **kwargs) -> INSTANCE:
+        stack = getattr(_making, "stack", None)
+        if stack is None:
+            stack = _making.stack = []
+        if cls in stack:
+            cycle = " -> ".join(str(item) for item in [*stack[stack.index(cls):], cls])
+            raise RuntimeError(f"container class making dependency cycle: {cycle}")
+        stack.append(cls)
         try:
-            self._making_count += 1
-            if self._making_count > 10:
-                self._making_count = 0
-                raise RuntimeError(f"container class making looped too many times, raised at {cls}")
             named_kwargs = {name: value for name, value in kwargs.items()}
             return self._make(cls, list(args), named_kwargs)
         finally:
-            if self._making_count > 0:
-                self._making_count -= 1
+            stack.pop()
 
     def _make(self, cls: Type[INSTANCE], args: list, named_kwargs: dict) -> INSTANCE:
         if instance := self.get(cls):
@@ -475,35 +699,24 @@ class Container(IoCContainer):
         if not isinstance(cls, type):
             raise TypeError(f"Arguments cls: {type(cls)} should be class")
 
-        init_fn = getattr(cls, '__init__', None)
-        if init_fn is None:
-            raise TypeError(f"class {cls} does not implement __init__")
-        target_module = inspect.getmodule(cls)
-        named_kwargs = self._reflect_callable_args(init_fn, named_kwargs, target_module.__dict__)
+        def build() -> InjectionPlan:
+            init_fn = getattr(cls, '__init__', None)
+            if init_fn is None:
+                raise TypeError(f"class {cls} does not implement __init__")
+            return _build_injection_plan(init_fn, _module_values(cls))
 
+        plan = _get_injection_plan(_make_plans, cls, build)
+        named_kwargs = self._inject_by_plan(plan, named_kwargs)
         return cls(*args, **named_kwargs)
 
-    def _reflect_callable_args(
-            self,
-            caller: Callable,
-            named_kwargs: Dict,
-            local_values: Dict,
-    ) -> Dict:
+    def _inject_by_plan(self, plan: InjectionPlan, named_kwargs: Dict) -> Dict:
         empty = inspect.Parameter.empty
-        for name, param in inspect.signature(caller).parameters.items():
+        for name, typehint, default in plan:
             # ignore which already in kwargs
             if name in named_kwargs:
                 continue
-            if name == "self":
-                continue
-            injection = param.default
-            annotation = param.annotation
-            if annotation and annotation is not empty:
-                typehint = annotation
-                if isinstance(typehint, str) and typehint in local_values:
-                    typehint = local_values[typehint]
-                if isinstance(typehint, str):
-                    continue
+            injection = default
+            if typehint is not None:
                 got = self.make(typehint)
                 if got is not None:
                     injection = got
@@ -515,9 +728,16 @@ class Container(IoCContainer):
         return named_kwargs
 
     def call(self, caller: Callable, *args, **kwargs) -> Any:
-        target_module = inspect.getmodule(caller)
+        # the plan of a bound method is shared by the instances of its function.
+        is_method = inspect.ismethod(caller)
+        key = caller.__func__ if is_method else caller
+
+        def build() -> InjectionPlan:
+            return _build_injection_plan(key, _module_values(caller), drop_first=is_method)
+
+        plan = _get_injection_plan(_call_plans, key, build)
         named_kwargs = {name: value for name, value in kwargs.items()}
-        named_kwargs = self._reflect_callable_args(caller, named_kwargs, target_module.__dict__)
+        named_kwargs = self._inject_by_plan(plan, named_kwargs)
         return caller(*args, **named_kwargs)
 
     def shutdown(self) -> None:
@@ -527,6 +747,7 @@ class Container(IoCContainer):
         if self._is_shutdown:
             return
         self._is_shutdown = True
+        self._generation += 1
         for shutdown in self._shutdown:
             shutdown()
 
@@ -540,6 +761,8 @@ class Container(IoCContainer):
         del self._bootstrapper
         del self._bootstrapped
         del self._aliases
+        del self._contract_locks
+        del self._resolved
         Container.instance_count -= 1
 
 
@@ -628,8 +851,11 @@ class ProviderAdapter(Generic[INSTANCE], Provider[INSTANCE]):
             contract_type: Type[INSTANCE],
             factory: Callable[[Container], Optional[INSTANCE]],
             singleton: bool = True,
-            lineinfo: str = "",
+            lineinfo: Union[str, CallerInfo, None] = "",
     ):
+        """
+        :param lineinfo: where the provider is defined. formatted only when the provider is printed.
+        """
         self._contract_type = contract_type
         self._factory = factory
         self._singleton = singleton
@@ -653,31 +879,87 @@ class ProviderAdapter(Generic[INSTANCE], Provider[INSTANCE]):
         return f" <ghostos_container.ProviderAdapter for {self.contract()}>"
 
 
+_debug_lineinfo: bool = True
+""" if False, the providers do not capture the line info where they are defined. """
+
+
+def set_debug_lineinfo(enabled: bool) -> None:
+    """
+    globally switch capturing the debug line info of the providers. turn it off in production.
+    """
+    global _debug_lineinfo
+    _debug_lineinfo = enabled
+
+
+class CallerInfo:
+    """
+    lazy caller info, only the code object and the line number are captured.
+    the string is formatted only when it is printed.
+    """
+    __slots__ = ('code', 'lineno')
+
+    def __init__(self, code: Optional[CodeType], lineno: int):
+        self.code = code
+        self.lineno = lineno
+
+    def format(self, with_full_file: bool = True) -> str:
+        if self.code is None:
+            return ""
+        filename = self.code.co_filename
+        if not with_full_file:
+            filename = filename.split("/")[-1]
+        return f"{filename}:{self.lineno}"
+
+    def __bool__(self) -> bool:
+        return self.code is not None
+
+    def __str__(self) -> str:
+        return self.format()
+
+    def __repr__(self) -> str:
+        return self.format()
+
+
+def _get_frame(backtrace: int):
+    # sys._getframe(0) is the caller of this function.
+    backtrace += 1
+    try:
+        return sys._getframe(backtrace)
+    except ValueError:
+        # backtrace more than the stack, use the outermost frame.
+        frame = sys._getframe(1)
+        while frame.f_back is not None:
+            frame = frame.f_back
+        return frame
+
+
+def capture_caller_info(backtrace: int = 1) -> Optional[CallerInfo]:
+    """
+    cheap version of get_caller_info, no source context is read.
+    :return: None if debug line info is disabled by set_debug_lineinfo.
+    """
+    if not _debug_lineinfo:
+        return None
+    frame = _get_frame(backtrace)
+    return CallerInfo(frame.f_code, frame.f_lineno)
+
+
 def get_caller_info(backtrace: int = 1, with_full_file: bool = True) -> str:
-    stack = inspect.stack()
-    # 获取调用者的上下文信息
-    if backtrace > len(stack) - 1:
-        backtrace = len(stack) - 1
-    caller_frame_record = stack[backtrace]
-    frame = caller_frame_record[0]
-    info = inspect.getframeinfo(frame)
-    filename = info.filename
-    if not with_full_file:
-        filename = filename.split("/")[-1]
-    return f"{filename}:{info.lineno}"
+    frame = _get_frame(backtrace)
+    return CallerInfo(frame.f_code, frame.f_lineno).format(with_full_file)
 
 
 def provide(
         abstract: ABSTRACT,
         singleton: bool = True,
-        lineinfo: str = "",
+        lineinfo: Union[str, CallerInfo, None] = "",
 ) -> Callable[[Factory], Provider]:
     """
     helper function to generate provider with factory.
     can be used as a decorator.
     """
     if not lineinfo:
-        lineinfo = get_caller_info(2)
+        lineinfo = capture_caller_info(2)
 
     def wrapper(factory: Factory) -> Provider:
         return ProviderAdapter(abstract, factory, singleton, lineinfo=lineinfo)
@@ -706,6 +988,154 @@ class Contracts:
         return Contracts(list(abstracts))
 
 
+def _contract_name(contract: Any) -> str:
+    if isinstance(contract, type):
+        return f"{contract.__module__}.{contract.__qualname__}"
+    return str(contract)
+
+
+class ContainerProfiler:
+    """
+    instrumentation of the containers. records every factory called by the containers:
+    the wall time, the contracts fetched while building (the dependency graph),
+    and the level of the container which builds the instance.
+
+    >>> with ContainerProfiler() as profiler:
+    >>>     container.force_fetch(Foo)
+    >>> print(profiler.flame_table())
+    """
+
+    class Build:
+        __slots__ = ('contract', 'bloodline', 'singleton', 'elapsed', 'fetched', 'children')
+
+        def __init__(self, contract: Any, bloodline: List[str], singleton: bool):
+            self.contract = contract
+            self.bloodline = bloodline
+            self.singleton = singleton
+            self.elapsed: float = 0.0
+            self.fetched: List[Any] = []
+            self.children: List[ContainerProfiler.Build] = []
+
+        @property
+        def level(self) -> int:
+            return len(self.bloodline) - 1
+
+        @property
+        def self_elapsed(self) -> float:
+            return self.elapsed - sum(child.elapsed for child in self.children)
+
+    def __init__(self):
+        self.builds: List[ContainerProfiler.Build] = []
+        """the builds not nested in other builds"""
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._previous: Optional[ContainerProfiler] = None
+
+    def _stack(self) -> List[ContainerProfiler.Build]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def on_fetch(self, contract: Any) -> None:
+        stack = self._stack()
+        if stack and contract not in stack[-1].fetched:
+            stack[-1].fetched.append(contract)
+
+    @contextmanager
+    def building(self, contract: Any, container: Container, singleton: bool):
+        stack = self._stack()
+        build = self.Build(contract, container.bloodline, singleton)
+        if stack:
+            stack[-1].children.append(build)
+        else:
+            with self._lock:
+                self.builds.append(build)
+        stack.append(build)
+        start = time.perf_counter()
+        try:
+            yield build
+        finally:
+            build.elapsed = time.perf_counter() - start
+            stack.pop()
+
+    def iter_builds(self) -> Iterable[Build]:
+        stack = list(reversed(self.builds))
+        while stack:
+            build = stack.pop()
+            yield build
+            stack.extend(reversed(build.children))
+
+    def flame_table(self, min_ms: float = 0.0, bar_width: int = 20) -> str:
+        """
+        the builds as an indented tree, nested builds are under the builds which fetched them.
+        :param min_ms: hide the builds faster than it.
+        :param bar_width: width of the bar of the slowest build.
+        """
+        slowest = max((build.elapsed for build in self.builds), default=0.0) or 1.0
+        lines = [f"{'total(ms)':>10} {'self(ms)':>10} {'level':>5}  {'':<{bar_width}}  contract"]
+
+        def walk(build: ContainerProfiler.Build, depth: int) -> None:
+            total_ms = build.elapsed * 1000
+            if total_ms < min_ms:
+                return
+            bar = "#" * max(1, round(build.elapsed / slowest * bar_width))
+            lines.append(
+                f"{total_ms:>10.2f} {build.self_elapsed * 1000:>10.2f} {build.level:>5}  "
+                f"{bar:<{bar_width}}  {'  ' * depth}{_contract_name(build.contract)}"
+                f"{'' if build.singleton else ' (factory)'} [{'/'.join(build.bloodline)}]"
+            )
+            for child in build.children:
+                walk(child, depth + 1)
+
+        for root in self.builds:
+            walk(root, 0)
+        return "\n".join(lines)
+
+    def dot(self) -> str:
+        """
+        the dependency graph of the contracts in DOT format.
+        """
+        nodes: Dict[str, str] = {}
+        edges: Dict[Tuple[str, str], None] = {}
+        for build in self.iter_builds():
+            name = _contract_name(build.contract).replace('"', '\\"')
+            nodes[name] = f"{name}\\n{build.elapsed * 1000:.2f}ms level {build.level}"
+            for fetched in build.fetched:
+                fetched_name = _contract_name(fetched).replace('"', '\\"')
+                nodes.setdefault(fetched_name, fetched_name)
+                edges[(name, fetched_name)] = None
+        lines = ["digraph container {", "    rankdir=LR;", "    node [shape=box];"]
+        for name, label in nodes.items():
+            lines.append(f'    "{name}" [label="{label}"];')
+        for name, fetched_name in edges:
+            lines.append(f'    "{name}" -> "{fetched_name}";')
+        lines.append("}")
+        return "\n".join(lines)
+
+    def __enter__(self) -> ContainerProfiler:
+        self._previous = set_container_profiler(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        set_container_profiler(self._previous)
+        self._previous = None
+
+
+_profiler: Optional[ContainerProfiler] = None
+
+
+def set_container_profiler(profiler: Optional[ContainerProfiler]) -> Optional[ContainerProfiler]:
+    """
+    install the profiler to all the containers, None to uninstall.
+    :return: the previous profiler
+    """
+    global _profiler
+    previous = _profiler
+    _profiler = profiler
+    return previous
+
+
 __container = Container()
 
 
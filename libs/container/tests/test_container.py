@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import pytest
 from abc import ABCMeta, abstractmethod
 from typing import Type, Dict, get_args, get_origin, ClassVar
 
@@ -273,3 +274,267 @@ def test_container_with_factory_type():
     bar.bar = 456
     bar = container.get(_Bar)
     assert bar.bar == 456
+
+
+def test_provider_lineinfo_is_lazy():
+    from ghostos_container import CallerInfo, set_debug_lineinfo, get_caller_info
+    p = provide(int)(lambda c: 1)
+    assert isinstance(p._lineinfo, CallerInfo)
+    assert __file__ in repr(p)
+    assert get_caller_info(1).startswith(__file__)
+
+    set_debug_lineinfo(False)
+    try:
+        p = provide(int)(lambda c: 1)
+        assert not p._lineinfo
+        assert " at " not in repr(p)
+    finally:
+        set_debug_lineinfo(True)
+
+
+def test_child_container_inherits_providers_by_chain():
+    import time
+
+    class Inheritable(Provider[Foo]):
+        def singleton(self) -> bool:
+            return False
+
+        def aliases(self):
+            yield Zoo
+
+        def factory(self, con: Container) -> Foo:
+            return Foo(con.force_fetch(int))
+
+    root = Container()
+    root.register(Inheritable())
+    root.set(int, 1)
+    child = Container(parent=root)
+    # providers are not copied to the child.
+    assert child.get_provider(Foo) is root.get_provider(Foo)
+    assert len(list(child.providers(recursively=False))) == 0
+
+    child.set(int, 2)
+    # inherited provider makes instance with the child container.
+    assert child.force_fetch(Foo).a == 2
+    assert child.force_fetch(Zoo).a == 2
+    assert root.force_fetch(Foo).a == 1
+
+    # override by the child.
+    child.register(provide(Foo, singleton=False)(lambda c: Foo(3)))
+    assert child.force_fetch(Foo).a == 3
+
+    # creating nested containers does not copy the providers, so it stays cheap with many providers.
+    for i in range(200):
+        root.register(provide(f"contract_{i}", singleton=False)(lambda c: 1))
+    start = time.perf_counter()
+    for i in range(100):
+        con = root
+        for j in range(20):
+            con = Container(parent=con)
+        assert con.force_fetch(Foo).a == 1
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0
+
+
+def test_singleton_is_made_once_by_threads():
+    import time
+    from threading import Thread, Barrier
+
+    made = []
+
+    class Bar:
+        pass
+
+    class Foo:
+        def __init__(self, bar: Bar):
+            self.bar = bar
+
+    def make_bar(c: Container) -> Bar:
+        time.sleep(0.01)
+        made.append(Bar)
+        return Bar()
+
+    def make_foo(c: Container) -> Foo:
+        time.sleep(0.01)
+        made.append(Foo)
+        # re-entrant: the factory fetches other contracts.
+        return Foo(c.force_fetch(Bar))
+
+    container = Container()
+    container.register(provide(Bar)(make_bar))
+    container.register(provide(Foo)(make_foo))
+
+    barrier = Barrier(10)
+    results = []
+
+    def run():
+        barrier.wait()
+        results.append(container.force_fetch(Foo))
+
+    threads = [Thread(target=run) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert made == [Foo, Bar]
+    assert len(results) == 10
+    assert all(r is results[0] for r in results)
+
+
+def test_resolved_cache_of_ancestors():
+    class Foo:
+        def __init__(self, a: int):
+            self.a = a
+
+    root = Container()
+    root.set(int, 1)
+    middle = Container(parent=root)
+    child = Container(parent=middle)
+
+    assert child.force_fetch(int) == 1
+    assert child.lookup_stats() == {"hits": 0, "misses": 1}
+    assert child.force_fetch(int) == 1
+    assert child.lookup_stats() == {"hits": 1, "misses": 1}
+    assert child.get(Foo) is None
+    assert child.get(Foo) is None
+    assert child.lookup_stats() == {"hits": 2, "misses": 2}
+
+    # binding of any ancestor invalidates the cache.
+    middle.set(int, 2)
+    assert child.force_fetch(int) == 2
+    root.register(provide(Foo, singleton=False)(lambda c: Foo(c.force_fetch(int))))
+    # not inheritable provider makes instance with the root container.
+    assert child.force_fetch(Foo).a == 1
+    middle.register(provide(Foo, singleton=False)(lambda c: Foo(3)))
+    assert child.force_fetch(Foo).a == 3
+    assert child.lookup_stats()["misses"] == 5
+
+    # binding of the child itself does not.
+    child.set(str, "hello")
+    assert child.force_fetch(Foo).a == 3
+    assert child.lookup_stats()["misses"] == 5
+
+
+class Cycle:
+    def __init__(self, cycle: Cycle):
+        self.cycle = cycle
+
+
+def test_container_make_with_cached_plan():
+    from ghostos_container import _make_plans, _call_plans
+
+    container = Container()
+    container.set(Foo, Foo(123))
+    assert container.make(Bar).foo.a == 123
+    assert Bar in _make_plans
+    # the plan is reused by the other containers.
+    child = Container(parent=container)
+    child.set(Foo, Foo(456))
+    assert child.make(Bar).foo.a == 456
+
+    # bound methods share the plan of the function.
+    class Caller:
+        def __init__(self, c: int):
+            self.c = c
+
+        def call(self, bar: Bar) -> int:
+            return bar.foo.a + self.c
+
+    assert container.call(Caller(1).call) == 124
+    assert container.call(Caller(2).call) == 125
+    assert Caller.call in _call_plans
+
+    # dependency cycle is detected exactly.
+    with pytest.raises(RuntimeError) as e:
+        container.make(Cycle)
+    assert "dependency cycle" in str(e.value)
+    # the making stack is clear after the error.
+    assert container.make(Bar).foo.a == 123
+
+
+def test_container_profiler():
+    from ghostos_container import ContainerProfiler
+
+    class A:
+        pass
+
+    class B:
+        pass
+
+    root = Container(name="root")
+    root.set(int, 1)
+    root.register(provide(B)(lambda c: B() if c.get(int) else None))
+    root.register(provide(A, singleton=False)(lambda c: A() if c.force_fetch(B) else None))
+    child = Container(parent=root, name="child")
+
+    with ContainerProfiler() as profiler:
+        child.force_fetch(A)
+        child.force_fetch(A)
+    # uninstalled
+    child.force_fetch(A)
+
+    assert len(profiler.builds) == 2
+    first = profiler.builds[0]
+    assert first.contract is A
+    assert first.level == 0
+    assert first.fetched == [B]
+    assert len(first.children) == 1
+    assert first.children[0].fetched == [int]
+    # the singleton is built once.
+    assert len(profiler.builds[1].children) == 0
+    assert len(list(profiler.iter_builds())) == 3
+
+    table = profiler.flame_table()
+    assert "(factory)" in table
+    dot = profiler.dot()
+    assert dot.startswith("digraph")
+    assert "->" in dot
+
+
+def test_container_warmup():
+    import time
+    import threading
+
+    class A:
+        pass
+
+    class B:
+        pass
+
+    class C:
+        pass
+
+    made = []
+    threads = set()
+
+    def maker(cls, *depends):
+        def factory(c: Container):
+            for depend in depends:
+                c.force_fetch(depend)
+            time.sleep(0.02)
+            made.append(cls)
+            threads.add(threading.get_ident())
+            return cls()
+
+        return factory
+
+    container = Container()
+    container.register(provide(A)(maker(A)))
+    container.register(provide(B)(maker(B, A)))
+    container.register(provide(C)(maker(C, A)))
+    container.register(provide(str, singleton=False)(lambda c: "not warmed"))
+    container.register(provide(int)(lambda c: 1 / 0))
+
+    errors = container.warmup()
+    assert set(errors.keys()) == {int}
+    assert isinstance(errors[int], ZeroDivisionError)
+    # each singleton is built once, the independent branches are built in different threads.
+    assert sorted(made, key=lambda cls: cls.__name__) == [A, B, C]
+    assert len(threads) > 1
+    assert str not in container._instances
+
+    made.clear()
+    errors = container.warmup(parallel=False)
+    assert list(errors.keys()) == [int]
+    assert made == []
@@ -1,4 +1,56 @@
-from ghostos.abcd.concepts import *
-from ghostos_common import *
-from ghostos_moss import *
-from ghostos_container import *
+from typing import TYPE_CHECKING
+from importlib import import_module
+
+if TYPE_CHECKING:
+    from ghostos.abcd.concepts import *
+    from ghostos_common import *
+    from ghostos_moss import *
+    from ghostos_container import *
+
+# the package root re-exports these modules lazily (PEP 562),
+# so importing a submodule such as `ghostos.scripts.cli` does not load the whole framework.
+# the latter overrides the former, as the star imports did.
+_EXPORTED_MODULES = ("ghostos.abcd.concepts", "ghostos_common", "ghostos_moss", "ghostos_container")
+
+
+def _exported_names(module) -> list:
+    names = getattr(module, "__all__", None)
+    if names is None:
+        names = [name for name in dir(module) if not name.startswith("_")]
+    return list(names)
+
+
+_export_map = None
+
+
+def _get_export_map() -> dict:
+    """
+    exported name => module name, the latter module overrides the former.
+    """
+    global _export_map
+    if _export_map is None:
+        exported = {}
+        for modulename in _EXPORTED_MODULES:
+            for attr in _exported_names(import_module(modulename)):
+                exported[attr] = modulename
+        _export_map = exported
+    return _export_map
+
+
+def __getattr__(name: str):
+    if name == "__all__":
+        all_names = list(_get_export_map().keys())
+        globals()["__all__"] = all_names
+        return all_names
+
+    # the exported modules may export dunder names too, such as ghostos_moss.__is_subclass__
+    modulename = _get_export_map().get(name, None)
+    if modulename is not None:
+        value = getattr(import_module(modulename), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__getattr__("__all__")))
@@ -3,7 +3,7 @@ from typing import Union, Optional, ClassVar, Dict
 from pydantic import BaseModel, Field
 from ghostos.abcd.concepts import Operator, Session, Action, SessionPyContext
 from ghostos_common.prompter import PromptObjectModel, TextPOM
-from ghostos_moss import MossRuntime
+from ghostos_moss import MossRuntime, PyContext
 from ghostos.core.messages import FunctionCaller
 from ghostos.core.llms import (
     Prompt, PromptPipe,
@@ -169,10 +169,7 @@ class MossAction(Action, PromptPipe):
             if op is not None and not isinstance(op, Operator):
                 return self.fire_error(session, caller, "result of moss code is not None or Operator")
 
-            pycontext = result.pycontext
-            # rebind pycontext to session
-            pycontext = SessionPyContext(**pycontext.model_dump(exclude_defaults=True))
-            pycontext.bind(session)
+            self._rebind_pycontext(session, result.pycontext)
 
             # handle std output
             std_output = result.std_output
@@ -192,6 +189,24 @@ class MossAction(Action, PromptPipe):
             session.logger.exception(e)
             return self.fire_error(session, caller, f"error during executing moss code: {e}")
 
+    @staticmethod
+    def _rebind_pycontext(session: Session, pycontext: PyContext) -> None:
+        """
+        rebind pycontext to session.
+        if no property changed, only the execution of the bound one is updated instead of copying all the properties.
+        """
+        bound = session.state.get(SessionPyContext.__name__, None)
+        if (
+                not pycontext.is_dirty()
+                and isinstance(bound, SessionPyContext)
+                and bound.properties.keys() == pycontext.properties.keys()
+        ):
+            bound.execute_code = pycontext.execute_code
+            bound.executed = pycontext.executed
+            return
+        pycontext = SessionPyContext.model_construct(**dict(pycontext.fork()))
+        pycontext.bind(session)
+
     @staticmethod
     def fire_error(session: Session, caller: FunctionCaller, error: str) -> Operator:
         message = caller.new_output("Function Error: %s" % error)
@@ -5,12 +5,15 @@ import sys
 
 import yaml
 from warnings import warn
-from typing import List, Optional, Tuple, Union
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
 from os.path import dirname, join, exists, abspath, isdir
-from ghostos.abcd import GhostOS
 from ghostos_container import Container, Provider, Contracts
-from ghostos.prototypes.ghostfunc import init_ghost_func, GhostFunc
 from pydantic import BaseModel, Field
+from ghostos.framework.storage.filestorage import FileStorageConf
+
+if TYPE_CHECKING:
+    from ghostos.abcd import GhostOS
+    from ghostos.prototypes.ghostfunc import init_ghost_func, GhostFunc
 
 # Core Concepts
 #
@@ -137,6 +140,14 @@ class BootstrapConfig(BaseModel):
         default=None,
         description="import path to generate ghostos app container, Callable[[], Container]",
     )
+    warmup_app_container: bool = Field(
+        default=False,
+        description="resolve the singleton providers of the app container in parallel before serving",
+    )
+    workspace_storage: FileStorageConf = Field(
+        default_factory=FileStorageConf,
+        description="atomic write, fsync and compression options of the workspace file storage",
+    )
 
     __from_file__: str = ""
 
@@ -272,7 +283,7 @@ def default_application_providers(
     """
     from ghostos.contracts.shutdown import ShutdownProvider
     from ghostos.contracts.modules import DefaultModulesProvider
-    from ghostos_moss import DefaultMOSSProvider
+    from ghostos_moss import DefaultMOSSProvider, DefaultMossRuntimePoolProvider
     from ghostos.core.messages.openai import DefaultOpenAIParserProvider
     from ghostos.framework.workspaces import BasicWorkspaceProvider
     from ghostos.framework.configs import WorkspaceConfigsProvider
@@ -280,14 +291,14 @@ def default_application_providers(
     from ghostos.framework.processes import WorkspaceProcessesProvider
     from ghostos.framework.threads import MsgThreadsRepoByWorkSpaceProvider
     from ghostos.framework.tasks import WorkspaceTasksProvider
-    from ghostos.framework.eventbuses import MemEventBusImplProvider
+    from ghostos.framework.eventbuses import FairEventBusImplProvider
     from ghostos.framework.llms import ConfigBasedLLMsProvider, PromptStorageInWorkspaceProvider
     from ghostos.framework.logger import DefaultLoggerProvider
     from ghostos.framework.variables import WorkspaceVariablesProvider
     from ghostos.framework.ghostos import GhostOSProvider
     from ghostos.framework.documents import ConfiguredDocumentRegistryProvider
     from ghostos.framework.realtime import ConfigBasedRealtimeProvider
-    from ghostos.core.aifunc import DefaultAIFuncExecutorProvider, AIFuncRepoByConfigsProvider
+    from ghostos.core.aifunc import DefaultAIFuncExecutorProvider, AIFuncRepoByConfigsProvider, AIFuncCacheProvider
 
     # session level libraries
     from ghostos.libraries.replier import ReplierImplProvider
@@ -306,6 +317,7 @@ def default_application_providers(
             workspace_dir=config.abs_workspace_dir(),
             configs_path=config.workspace_configs_dir,
             runtime_path=config.workspace_runtime_dir,
+            storage_conf=config.workspace_storage,
         ),
         WorkspaceConfigsProvider(),
         WorkspaceProcessesProvider(),
@@ -320,10 +332,11 @@ def default_application_providers(
 
         # --- session ---#
         MsgThreadsRepoByWorkSpaceProvider(),
-        MemEventBusImplProvider(),
+        FairEventBusImplProvider(),
 
         # --- moss --- #
         DefaultMOSSProvider(),
+        DefaultMossRuntimePoolProvider(),
 
         # --- llm --- #
         ConfigBasedLLMsProvider(),
@@ -337,6 +350,7 @@ def default_application_providers(
         # --- aifunc --- #
         DefaultAIFuncExecutorProvider(),
         AIFuncRepoByConfigsProvider(),
+        AIFuncCacheProvider(),
 
         GhostOSProvider(),
         ConfigBasedRealtimeProvider(),
@@ -353,9 +367,11 @@ def make_app_container(
         bootstrap_conf: Optional[BootstrapConfig] = None,
         app_providers: Optional[List[Provider]] = None,
         app_contracts: Optional[Contracts] = None,
+        warmup: Optional[bool] = None,
 ) -> Container:
     """
     make application global container
+    :param warmup: resolve the singleton providers ahead of time. default is BootstrapConfig.warmup_app_container
     """
     if bootstrap_conf is None:
         bootstrap_conf = get_bootstrap_config(local=True)
@@ -372,6 +388,14 @@ def make_app_container(
     _container.register(*app_providers)
     # contracts validation
     app_contracts.validate(_container)
+
+    if warmup is None:
+        warmup = bootstrap_conf.warmup_app_container
+    if warmup:
+        errors = _container.warmup(parallel=True)
+        if errors:
+            failed = "\n".join(f"- {contract}: {e!r}" for contract, e in errors.items())
+            warn(f"GhostOS app container warmup failed to resolve contracts:\n{failed}")
     return _container
 
 
@@ -409,6 +433,7 @@ def bootstrap() -> Container:
 
 
 def get_ghostos(container: Optional[Container] = None) -> GhostOS:
+    from ghostos.abcd import GhostOS
     if container is None:
         container = bootstrap()
     return container.force_fetch(GhostOS)
@@ -433,4 +458,12 @@ def reset(con: Container) -> Container:
     # reset global ghost func
     return _application_container
 
+
+def __getattr__(name: str):
+    # the ghost func prototype loads the whole framework, import it only when it is used.
+    if name in ('GhostFunc', 'init_ghost_func'):
+        from ghostos.prototypes import ghostfunc
+        return getattr(ghostfunc, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # --- test the module by python -i --- #
@@ -2,7 +2,15 @@ from typing import Callable, Optional, Type
 from typing_extensions import Self
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Condition
+from pydantic import BaseModel, Field
 from ghostos_container import Provider, Container
+import time
+
+__all__ = [
+    'Pool', 'DefaultPool', 'DefaultPoolProvider',
+    'BoundedPool', 'PoolStats', 'PoolFullError',
+]
 
 
 class Pool(ABC):
@@ -42,6 +50,95 @@ class DefaultPool(Pool):
         self.pool.shutdown(wait=wait, cancel_futures=cancel_futures)
 
 
+class PoolFullError(RuntimeError):
+    """
+    the bounded pool is saturated and the caller can not wait any longer.
+    """
+    pass
+
+
+class PoolStats(BaseModel):
+    size: int = Field(description="max number of the running callers")
+    max_pending: int = Field(description="max number of the callers waiting for a worker")
+    running: int = Field(default=0, description="the running callers")
+    pending: int = Field(default=0, description="the callers waiting for a worker")
+    submitted: int = Field(default=0, description="the accepted callers")
+    rejected: int = Field(default=0, description="the callers rejected when the pool is saturated")
+    total_wait: float = Field(default=0.0, description="seconds the started callers waited in the queue")
+    max_wait: float = Field(default=0.0, description="the longest queue wait time in seconds")
+    started: int = Field(default=0, description="the callers started by the workers")
+
+    def avg_wait(self) -> float:
+        return self.total_wait / self.started if self.started else 0.0
+
+
+class BoundedPool(DefaultPool):
+    """
+    thread pool with a bounded queue.
+    when size + max_pending callers are accepted and not done, submit blocks the caller for a free slot
+    at most `queue_timeout` seconds and raises PoolFullError then. None timeout waits forever, 0 rejects at once.
+    """
+
+    def __init__(self, size: int, max_pending: int = 0, queue_timeout: Optional[float] = None):
+        super().__init__(size)
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._cond = Condition()
+        self._stats = PoolStats(size=size, max_pending=max_pending)
+
+    def submit(self, caller: Callable, *args, **kwargs) -> Future:
+        capacity = self.size + self.max_pending
+        with self._cond:
+            stats = self._stats
+            if not self._cond.wait_for(lambda: stats.running + stats.pending < capacity, self.queue_timeout):
+                stats.rejected += 1
+                raise PoolFullError(f"pool is full, {stats.running} running and {stats.pending} pending")
+            stats.pending += 1
+            stats.submitted += 1
+        queued_at = time.time()
+
+        def run():
+            waited = time.time() - queued_at
+            with self._cond:
+                stats.pending -= 1
+                stats.running += 1
+                stats.started += 1
+                stats.total_wait += waited
+                stats.max_wait = max(stats.max_wait, waited)
+            try:
+                return caller(*args, **kwargs)
+            finally:
+                self._release(running=1)
+
+        try:
+            return self.pool.submit(run)
+        except RuntimeError:
+            # the executor is shutdown.
+            self._release(pending=1)
+            raise
+
+    def _release(self, running: int = 0, pending: int = 0) -> None:
+        with self._cond:
+            self._stats.running -= running
+            self._stats.pending -= pending
+            self._cond.notify()
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return self._stats.model_copy()
+
+    def new(self, size: int) -> Self:
+        return BoundedPool(size, self.max_pending, self.queue_timeout)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+        if cancel_futures:
+            with self._cond:
+                # the canceled callers never run.
+                self._stats.pending = 0
+                self._cond.notify_all()
+
+
 class DefaultPoolProvider(Provider[Pool]):
 
     def __init__(self, size: int = 100):
@@ -1,5 +1,6 @@
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Dict
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 
 __all__ = ['Storage', 'FileStorage']
 
@@ -44,6 +45,22 @@ class Storage(ABC):
         """
         pass
 
+    def put_many(self, contents: Dict[str, bytes]) -> None:
+        """
+        保存多个文件, 实现可以合并为一次批量写入.
+        :param contents: 相对路径 => 文件内容.
+        """
+        for file_path, content in contents.items():
+            self.put(file_path, content)
+
+    @contextmanager
+    def batch(self):
+        """
+        put_many 调用可以延迟到 batch 退出时一起写入, 实现可以合并同类 storage 的写入.
+        嵌套的 batch 合并到最外层.
+        """
+        yield
+
     @abstractmethod
     def dir(self, prefix_dir: str, recursive: bool, patten: Optional[str] = None) -> Iterable[str]:
         """
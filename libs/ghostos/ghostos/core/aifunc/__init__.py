@@ -1,10 +1,12 @@
 from ghostos.core.aifunc.driver import DefaultAIFuncDriverImpl
 from ghostos.core.aifunc.interfaces import (
     AIFunc, AIFuncResult, AIFuncCtx, AIFuncDriver, AIFuncExecutor,
-    AIFuncRepository,
+    AIFuncRepository, AIFuncCache,
     ExecFrame, ExecStep,
+    TooManyFailureError, AIFuncCancelledError,
 )
-from ghostos.core.aifunc.func import get_aifunc_result_type
+from ghostos.core.aifunc.func import get_aifunc_result_type, AIFuncCacheConf
 from ghostos.core.aifunc.executor import DefaultAIFuncExecutorImpl, DefaultAIFuncExecutorProvider
+from ghostos.core.aifunc.pool import AIFuncPool, AIFuncCancelScope
 from ghostos.core.aifunc.repository import AIFuncRepoByConfigsProvider, AIFuncRepoByConfigs, AIFuncsConf
-
+from ghostos.core.aifunc.cache import AIFuncCacheImpl, AIFuncCacheProvider
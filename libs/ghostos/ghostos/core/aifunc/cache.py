@@ -0,0 +1,129 @@
+from typing import Optional, Dict, Tuple, Type
+from collections import OrderedDict
+from threading import Lock
+from os.path import join
+import hashlib
+import json
+import time
+
+from ghostos.core.aifunc.func import AIFunc, AIFuncResult, get_aifunc_result_type, get_aifunc_cache_conf
+from ghostos.core.aifunc.interfaces import AIFuncCache
+from ghostos.contracts.storage import Storage
+from ghostos.contracts.workspace import Workspace
+from ghostos_container import Provider, Container
+
+__all__ = ['AIFuncCacheImpl', 'AIFuncCacheProvider', 'aifunc_cache_key']
+
+
+def aifunc_cache_key(fn: AIFunc) -> str:
+    """
+    the class identifier and the hash of the canonical json of the arguments.
+    """
+    args = json.dumps(fn.model_dump(mode="json"), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    digest = hashlib.sha256(args.encode()).hexdigest()
+    return join(fn.func_name(), digest)
+
+
+class AIFuncCacheImpl(AIFuncCache):
+    """
+    two tiers result cache: the recently used results in memory,
+    and the results of the aifuncs with `disk` setting in the storage, shared by the processes.
+    """
+
+    def __init__(self, storage: Optional[Storage] = None, max_size: int = 1024):
+        self._storage = storage
+        self._max_size = max_size
+        self._memory: "OrderedDict[str, Tuple[float, AIFuncResult]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fn: AIFunc) -> Optional[AIFuncResult]:
+        conf = get_aifunc_cache_conf(type(fn))
+        if conf is None:
+            return None
+        key = aifunc_cache_key(fn)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key, None)
+            if cached is not None:
+                expires, result = cached
+                if not expires or expires > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return result.model_copy(deep=True)
+                del self._memory[key]
+
+        result = None
+        if conf.disk and self._storage is not None:
+            result = self._get_from_disk(key, type(fn), now)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return result
+
+    def _get_from_disk(self, key: str, fn_type: Type[AIFunc], now: float) -> Optional[AIFuncResult]:
+        filename = key + ".json"
+        if not self._storage.exists(filename):
+            return None
+        try:
+            data = json.loads(self._storage.get(filename))
+            expires = data.get("expires", 0)
+            if expires and expires <= now:
+                self._storage.remove(filename)
+                return None
+            result_type = fn_type.__aifunc_result__ or get_aifunc_result_type(fn_type)
+            result = result_type(**data["result"])
+        except (ValueError, KeyError, TypeError, FileNotFoundError):
+            # broken or removed by another process.
+            return None
+        self._remember(key, expires, result)
+        return result.model_copy(deep=True)
+
+    def set(self, fn: AIFunc, result: AIFuncResult) -> None:
+        conf = get_aifunc_cache_conf(type(fn))
+        if conf is None:
+            return
+        key = aifunc_cache_key(fn)
+        expires = time.time() + conf.ttl if conf.ttl > 0 else 0
+        self._remember(key, expires, result.model_copy(deep=True))
+        if conf.disk and self._storage is not None:
+            data = {"expires": expires, "result": result.model_dump(mode="json")}
+            self._storage.put(key + ".json", json.dumps(data, ensure_ascii=False).encode())
+
+    def _remember(self, key: str, expires: float, result: AIFuncResult) -> None:
+        with self._lock:
+            self._memory[key] = (expires, result)
+            self._memory.move_to_end(key)
+            if len(self._memory) > self._max_size:
+                self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "memory": len(self._memory)}
+
+
+class AIFuncCacheProvider(Provider[AIFuncCache]):
+
+    def __init__(self, runtime_cache_dir: str = "aifunc_results", max_size: int = 1024):
+        """
+        :param runtime_cache_dir: the dir in the workspace runtime cache for the disk tier, empty means memory only.
+        :param max_size: max results kept in memory.
+        """
+        self._runtime_cache_dir = runtime_cache_dir
+        self._max_size = max_size
+
+    def singleton(self) -> bool:
+        return True
+
+    def factory(self, con: Container) -> Optional[AIFuncCache]:
+        storage = None
+        if self._runtime_cache_dir:
+            workspace = con.force_fetch(Workspace)
+            storage = workspace.runtime_cache().sub_storage(self._runtime_cache_dir)
+        return AIFuncCacheImpl(storage, self._max_size)
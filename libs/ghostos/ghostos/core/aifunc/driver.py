@@ -3,16 +3,16 @@ from typing import Tuple, List, Optional, Any
 
 from ghostos.core.aifunc.interfaces import (
     AIFuncDriver, AIFuncExecutor, ExecStep, ExecFrame, AIFuncRepository,
-    TooManyFailureError,
+    TooManyFailureError, AIFuncCancelledError,
 )
 from ghostos.core.aifunc.func import (
     AIFunc,
     get_aifunc_instruction, get_aifunc_result_type, get_aifunc_pycontext, get_aifunc_llmapi,
 )
-from ghostos.core.llms import LLMs, Prompt
+from ghostos.core.llms import LLMs, LLMApi, Prompt
 from ghostos_moss.abcd import MossRuntime
 from ghostos.core.runtime import GoThreadInfo, EventTypes, GoThreads, thread_to_prompt
-from ghostos.core.messages import Role, Message, Stream
+from ghostos.core.messages import Role, Message, MessageType, Stream
 from ghostos_container import Container
 
 __all__ = [
@@ -180,13 +180,20 @@ class DefaultAIFuncDriverImpl(AIFuncDriver):
             llm_api = manager.default_llm_api()
 
         # call llm api
-        ai_generation = llm_api.chat_completion(chat)
+        if upstream is not None and upstream.allow_streaming():
+            generated = self.stream_generation(manager, llm_api, chat, step, upstream)
+            if not generated:
+                raise RuntimeError(f"AIFunc `{self.name()}` receive nothing from llm")
+            ai_generation = generated[-1]
+        else:
+            ai_generation = llm_api.chat_completion(chat)
+            generated = [ai_generation]
+            # on_message hook
+            self.on_message(ai_generation, step, upstream)
 
         # append ai_generation
-        thread.append(ai_generation)
+        thread.append(*generated)
         step.generate = ai_generation
-        # on_message hook
-        self.on_message(ai_generation, step, upstream)
 
         # parse the ai_generation.
         code = self.parse_moss_code_in_message(ai_generation)
@@ -258,7 +265,7 @@ class DefaultAIFuncDriverImpl(AIFuncDriver):
             # I think this method is thread-safe
             step.messages.extend(messages)
             self.error_times = 0
-        except TooManyFailureError:
+        except (TooManyFailureError, AIFuncCancelledError):
             raise
         except Exception as e:
             exe_info = "\n".join(traceback.format_exception(e)[-5:])
@@ -283,6 +290,37 @@ class DefaultAIFuncDriverImpl(AIFuncDriver):
             runtime.close()
         return thread, result, finish
 
+    def stream_generation(
+            self,
+            manager: AIFuncExecutor,
+            llm_api: LLMApi,
+            chat: Prompt,
+            step: ExecStep,
+            upstream: Stream,
+    ) -> List[Message]:
+        """
+        forward the llm chunks to the upstream as they arrive, and stop the llm call once cancelled.
+        :return: the complete messages generated.
+        """
+        generated = []
+        items = llm_api.deliver_chat_completion(chat, stream=True)
+        try:
+            for item in items:
+                if not upstream.alive():
+                    manager.cancel()
+                if manager.is_cancelled():
+                    raise AIFuncCancelledError(f"AIFunc `{self.name()}` is cancelled")
+                if MessageType.is_protocol_message(item):
+                    continue
+                if item.is_complete():
+                    generated.append(item)
+                self.on_message(item, step, upstream)
+        finally:
+            # close the llm response stream.
+            if hasattr(items, "close"):
+                items.close()
+        return generated
+
     def parse_moss_code_in_message(self, message: Message) -> str:
         content = message.content
 
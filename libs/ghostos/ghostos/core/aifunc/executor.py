@@ -1,14 +1,19 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import wait, FIRST_COMPLETED
+import inspect
 
-from typing import Dict, Any, Optional, Type, Callable, Iterable
+from typing import Dict, Any, Optional, Type, Callable, Iterable, List, Union
 from typing_extensions import Self
 
 from ghostos_container import Container, Provider, ABSTRACT
 from ghostos.core.llms import LLMApi, LLMs
 from ghostos_moss import MossCompiler
 from ghostos.core.aifunc.func import AIFunc, AIFuncResult, get_aifunc_result_type
-from ghostos.core.aifunc.interfaces import AIFuncExecutor, AIFuncCtx, AIFuncDriver, ExecFrame, ExecStep
+from ghostos.core.aifunc.interfaces import (
+    AIFuncExecutor, AIFuncCtx, AIFuncDriver, AIFuncCache, ExecFrame, ExecStep,
+    AIFuncCancelledError,
+)
 from ghostos.core.aifunc.driver import DefaultAIFuncDriverImpl
+from ghostos.core.aifunc.pool import AIFuncPool, AIFuncJob, AIFuncCancelScope
 from ghostos.core.messages import Stream, MessageType
 
 __all__ = ['DefaultAIFuncExecutorImpl', 'DefaultAIFuncExecutorProvider']
@@ -25,6 +30,9 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
             llm_api_name: str = "",
             max_depth: int = 10,
             max_step: int = 10,
+            pool: Optional[AIFuncPool] = None,
+            max_workers: int = 8,
+            scope: Optional[AIFuncCancelScope] = None,
     ):
         # manager do not create submanager
         # but the container of MossCompiler from this manager
@@ -39,9 +47,25 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
         if step and step.depth > self._max_depth:
             raise RuntimeError(f"AiFunc depth {step.depth} > {self._max_depth}, stackoverflow")
         self._default_driver_type = default_driver if default_driver else DefaultAIFuncDriverImpl
+        # the root executor owns the pool, the sub executors share it.
+        self._owns_pool = pool is None
+        self._pool = pool
+        self._max_workers = max_workers
+        self._scope = scope if scope is not None else AIFuncCancelScope()
         self._destroyed = False
 
-    def sub_executor(self, step: ExecStep, upstream: Optional[Stream] = None) -> "AIFuncExecutor":
+    def pool(self) -> AIFuncPool:
+        if self._pool is None:
+            self._pool = AIFuncPool(self._max_workers)
+        return self._pool
+
+    def sub_executor(
+            self,
+            step: ExecStep,
+            upstream: Optional[Stream] = None,
+            *,
+            scope: Optional[AIFuncCancelScope] = None,
+    ) -> "AIFuncExecutor":
         # sub manager's upstream may be None
         # parent manager do not pass upstream to submanager
         manager = DefaultAIFuncExecutorImpl(
@@ -51,10 +75,27 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
             default_driver=self._default_driver_type,
             llm_api_name=self._llm_api_name,
             max_depth=self._max_depth,
+            max_step=self._max_step,
+            pool=self.pool(),
+            # cancel this manager cancels the sub managers too.
+            scope=scope if scope is not None else self._scope.child(),
         )
         # register submanager, destroy them together
         return manager
 
+    def cancel(self) -> None:
+        self._scope.cancel()
+
+    def is_cancelled(self) -> bool:
+        return self._scope.cancelled()
+
+    def _check_cancelled(self, upstream: Optional[Stream]) -> None:
+        if upstream is not None and not upstream.alive():
+            # nobody is waiting for the result.
+            self.cancel()
+        if self.is_cancelled():
+            raise AIFuncCancelledError("aifunc is cancelled")
+
     def context(self) -> AIFuncCtx:
         return self
 
@@ -95,6 +136,13 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
         try:
             if frame is None:
                 frame = ExecFrame.from_func(fn)
+            self._check_cancelled(upstream)
+            cache = self._container.get(AIFuncCache)
+            if cache is not None:
+                cached = cache.get(fn)
+                if cached is not None:
+                    frame.set_result(cached)
+                    return cached
             driver = self.get_driver(fn)
             thread = driver.initialize(self.container(), frame)
             step = 0
@@ -102,6 +150,7 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
             result = None
             while not finished:
                 step += 1
+                self._check_cancelled(upstream)
                 # each step generate a new exec step
                 exec_step = frame.new_step()
                 if self._max_step != 0 and step > self._max_step:
@@ -116,6 +165,8 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
                 raise RuntimeError(f"result is invalid AIFuncResult {type(result)}, expecting {result_type}")
 
             frame.set_result(result)
+            if cache is not None and result is not None:
+                cache.set(fn, result)
             # if frame is the root, send final message as protocol
             return result
         except Exception as e:
@@ -134,12 +185,15 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
         return driver(fn)
 
     def run(self, key: str, fn: AIFunc) -> AIFuncResult:
+        return self._run(key, fn, self._scope.child())
+
+    def _run(self, key: str, fn: AIFunc, scope: AIFuncCancelScope) -> AIFuncResult:
         if self._exec_step is not None:
             frame = self._exec_step.new_frame(fn)
         else:
             frame = ExecFrame.from_func(fn)
         sub_step = frame.new_step()
-        sub_manager = self.sub_executor(sub_step)
+        sub_manager = self.sub_executor(sub_step, scope=scope)
         try:
             result = sub_manager.execute(fn, frame=frame, upstream=self._upstream)
             # thread safe? python dict is thread safe
@@ -151,20 +205,63 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
             sub_manager.destroy()
 
     def parallel_run(self, fn_dict: Dict[str, AIFunc]) -> Dict[str, AIFuncResult]:
-        def execute_task(key: str, fn: AIFunc):
-            r = self.run(key, fn)
-            return key, r
-
-        results = {}
-        with ThreadPoolExecutor(max_workers=len(fn_dict)) as executor:
-            futures = [executor.submit(execute_task, key, fn) for key, fn in fn_dict.items()]
-            for future in as_completed(futures):
-                key, result = future.result()
-                results[key] = result
-                self._values[key] = result
+        return self.run_graph(fn_dict)
 
+    def run_graph(
+            self,
+            fn_dict: Dict[str, Union[AIFunc, Callable[..., AIFunc]]],
+            depends: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, AIFuncResult]:
+        depends = self._graph_depends(fn_dict, depends or {})
+        pool = self.pool()
+        # one failed aifunc cancels the others in the graph, no more threads and tokens wasted.
+        scope = self._scope.child()
+        results: Dict[str, AIFuncResult] = {}
+        running: Dict[str, AIFuncJob] = {}
+        waiting = dict(fn_dict)
+        try:
+            while waiting or running:
+                if scope.cancelled():
+                    raise AIFuncCancelledError("aifunc is cancelled")
+                for key in list(waiting.keys()):
+                    if all(dep in results for dep in depends[key]):
+                        fn = waiting.pop(key)
+                        if not isinstance(fn, AIFunc):
+                            fn = fn(**{dep: results[dep] for dep in depends[key]})
+                        running[key] = pool.submit(self._run, key, fn, scope)
+                if not running:
+                    raise RuntimeError(f"aifuncs {list(waiting.keys())} depend on each other")
+                # run the job on the current thread instead of idle waiting.
+                pool.steal(running.values())
+                done, _ = wait([job.future for job in running.values()], return_when=FIRST_COMPLETED)
+                for key, job in list(running.items()):
+                    if job.future in done:
+                        del running[key]
+                        results[key] = job.future.result()
+        except BaseException:
+            scope.cancel()
+            raise
         return results
 
+    @staticmethod
+    def _graph_depends(
+            fn_dict: Dict[str, Union[AIFunc, Callable[..., AIFunc]]],
+            depends: Dict[str, List[str]],
+    ) -> Dict[str, List[str]]:
+        result = {}
+        for key, fn in fn_dict.items():
+            if key in depends:
+                deps = list(depends[key])
+            elif isinstance(fn, AIFunc):
+                deps = []
+            else:
+                deps = list(inspect.signature(fn).parameters.keys())
+            for dep in deps:
+                if dep not in fn_dict:
+                    raise KeyError(f"aifunc {key} depends on unknown key {dep}")
+            result[key] = deps
+        return result
+
     def get(self, key: str) -> Optional[Any]:
         return self._values.get(key, None)
 
@@ -181,6 +278,9 @@ class DefaultAIFuncExecutorImpl(AIFuncExecutor, AIFuncCtx):
             # so they could be destroyed outside already
             return
         self._destroyed = True
+        if self._owns_pool and self._pool is not None:
+            self._pool.shutdown(wait=False)
+        del self._pool
         del self._container
         del self._values
         del self._exec_step
@@ -192,8 +292,14 @@ class DefaultAIFuncExecutorProvider(Provider[AIFuncExecutor]):
     def __init__(
             self,
             llm_api_name: str = "",
+            max_workers: int = 8,
     ):
+        """
+        :param llm_api_name: default llm api of the aifuncs
+        :param max_workers: max concurrent aifuncs run by the pool of each root executor
+        """
         self._llm_api_name = llm_api_name
+        self._max_workers = max_workers
 
     def singleton(self) -> bool:
         # !! AIFuncManager shall not be
@@ -206,4 +312,5 @@ class DefaultAIFuncExecutorProvider(Provider[AIFuncExecutor]):
         return DefaultAIFuncExecutorImpl(
             container=con,
             llm_api_name=self._llm_api_name,
+            max_workers=self._max_workers,
         )
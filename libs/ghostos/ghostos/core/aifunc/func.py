@@ -1,7 +1,7 @@
 from __future__ import annotations
-from typing import Callable, Type, Optional, TYPE_CHECKING
+from typing import Callable, Type, Optional, Union, TYPE_CHECKING
 from abc import ABC
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from ghostos_common.helpers import generate_import_path, import_from_path
 from ghostos_common.prompter import PromptAbleClass
 from ghostos.core.llms import LLMs, LLMApi
@@ -14,11 +14,21 @@ if TYPE_CHECKING:
     from ghostos.core.aifunc.interfaces import AIFuncDriver
 
 __all__ = [
-    'AIFunc', 'AIFuncResult',
+    'AIFunc', 'AIFuncResult', 'AIFuncCacheConf',
     'get_aifunc_result_type', 'get_aifunc_instruction', 'get_aifunc_pycontext', 'get_aifunc_llmapi',
+    'get_aifunc_cache_conf',
 ]
 
 
+class AIFuncCacheConf(BaseModel):
+    """
+    result cache setting of an AIFunc class.
+    the result is cached by the class and the arguments, so only set it on the deterministic aifuncs.
+    """
+    ttl: float = Field(default=3600, description="seconds the cached result lives, 0 means never expire")
+    disk: bool = Field(default=True, description="also cache the result in the workspace runtime cache")
+
+
 class AIFunc(PromptAbleClass, BaseModel, ABC):
     """
     Model interface for an AIFunc arguments, always followed by an AIFuncResult Model.
@@ -31,6 +41,9 @@ class AIFunc(PromptAbleClass, BaseModel, ABC):
     __aifunc_driver__: Optional[Type[AIFuncDriver]] = None
     """可以指定自己的 driver. 不指定的话, 使用系统默认提供的 driver"""
 
+    __aifunc_cache__: Union[AIFuncCacheConf, bool, None] = None
+    """缓存结果的设置. 默认不缓存, True 表示使用默认的 AIFuncCacheConf"""
+
     @classmethod
     def __class_prompt__(cls) -> str:
         if cls is AIFunc:
@@ -143,3 +156,14 @@ def get_aifunc_instruction(fn: AIFunc) -> str:
     instruction = instruction_fn(fn)
     return str(instruction)
 
+
+def get_aifunc_cache_conf(fn: Type[AIFunc]) -> Optional[AIFuncCacheConf]:
+    """
+    get the result cache setting of the AIFunc class, None means not cached.
+    """
+    conf = fn.__aifunc_cache__
+    if conf is True:
+        return AIFuncCacheConf()
+    elif not conf:
+        return None
+    return conf
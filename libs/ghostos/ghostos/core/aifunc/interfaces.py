@@ -1,4 +1,4 @@
-from typing import Any, Optional, Tuple, Dict, Type, List, Iterable, Callable
+from typing import Any, Optional, Tuple, Dict, Type, List, Iterable, Callable, Union
 from abc import ABC, abstractmethod
 from ghostos.core.aifunc.func import AIFunc, AIFuncResult
 from ghostos_moss import MossCompiler, PyContext
@@ -14,9 +14,9 @@ from pydantic import BaseModel, Field
 __all__ = [
     'AIFunc', 'AIFuncResult',
     'AIFuncExecutor', 'AIFuncCtx', 'AIFuncDriver',
-    'AIFuncRepository',
+    'AIFuncRepository', 'AIFuncCache',
     'ExecFrame', 'ExecStep',
-    'TooManyFailureError',
+    'TooManyFailureError', 'AIFuncCancelledError',
 ]
 
 
@@ -24,6 +24,13 @@ class TooManyFailureError(RuntimeError):
     pass
 
 
+class AIFuncCancelledError(RuntimeError):
+    """
+    the aifunc is cancelled by the caller, or the upstream is closed.
+    """
+    pass
+
+
 class AIFuncCtx(ABC):
     """
     System context that could execute an AIFunc and keep result in it during multi-turns thinking.
@@ -54,6 +61,30 @@ class AIFuncCtx(ABC):
         """
         pass
 
+    @abstractmethod
+    def run_graph(
+            self,
+            fn_dict: Dict[str, Union[AIFunc, Callable[..., AIFunc]]],
+            depends: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, AIFuncResult]:
+        """
+        Run multiple AIFuncs that depend on each other's results, the independent ones run in parallel.
+
+        :param fn_dict: keys are result identifiers, values are AIFunc instances,
+               or functions that make the AIFunc from the results of the other keys.
+               the function receives the results as keyword arguments named by the keys.
+        :param depends: the keys each key depends on. if not given, the parameter names of the function are used.
+        :return: A dictionary where keys are the same as in fn_dict and values are the corresponding AIFuncResults.
+
+        for example:
+        results = ctx.run_graph({
+            "outline": WriteOutline(topic="..."),
+            "intro": lambda outline: WriteSection(outline=outline.content, section="introduction"),
+            "summary": lambda outline: WriteSection(outline=outline.content, section="summary"),
+        })
+        """
+        pass
+
     @abstractmethod
     def get(self, key: str) -> Optional[Any]:
         """
@@ -254,6 +285,19 @@ class AIFuncExecutor(ABC):
 
         return frame, execution
 
+    @abstractmethod
+    def cancel(self) -> None:
+        """
+        cancel the running aifunc and all its sub aifuncs, when the caller does not need the result any more.
+        the cancellation is cooperative, the execution raises AIFuncCancelledError at the next check point,
+        such as a new step or a streaming llm chunk.
+        """
+        pass
+
+    @abstractmethod
+    def is_cancelled(self) -> bool:
+        pass
+
     @abstractmethod
     def sub_executor(self, step: ExecStep, upstream: Optional[Stream] = None) -> "AIFuncExecutor":
         """
@@ -339,6 +383,31 @@ class AIFuncRepository(ABC):
         pass
 
 
+class AIFuncCache(ABC):
+    """
+    cache the results of the AIFuncs which enable __aifunc_cache__,
+    keyed by the AIFunc class and the arguments.
+    """
+
+    @abstractmethod
+    def get(self, fn: AIFunc) -> Optional[AIFuncResult]:
+        """
+        :return: the cached result of the same aifunc and arguments, None if not cached or expired.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, fn: AIFunc, result: AIFuncResult) -> None:
+        """
+        cache the result if the AIFunc class enables __aifunc_cache__.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
 class AIFuncDriver(ABC):
     """
     the driver that produce multi-turns thinking of an AIFunc.
@@ -0,0 +1,137 @@
+from typing import Callable, Any, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Lock
+
+__all__ = ['AIFuncPool', 'AIFuncJob', 'AIFuncCancelScope']
+
+
+class AIFuncJob:
+    """
+    a job submitted to the AIFuncPool. it runs exactly once,
+    by a pool worker or by the waiting caller who steals it before the worker starts.
+    """
+
+    def __init__(self, caller: Callable[..., Any], *args, **kwargs):
+        self.future = Future()
+        self._caller = caller
+        self._args = args
+        self._kwargs = kwargs
+        self._claimed = False
+        self._lock = Lock()
+
+    def claimed(self) -> bool:
+        return self._claimed
+
+    def run(self) -> bool:
+        """
+        run the job if nobody claimed it.
+        :return: if the job is run by this call.
+        """
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+        if not self.future.set_running_or_notify_cancel():
+            return True
+        try:
+            result = self._caller(*self._args, **self._kwargs)
+        except BaseException as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(result)
+        finally:
+            del self._caller, self._args, self._kwargs
+        return True
+
+
+class AIFuncPool:
+    """
+    bounded thread pool shared by an AIFuncExecutor and all its sub executors, caps the concurrent aifuncs.
+    - when no worker is idle, the job runs on the caller thread at once,
+      so the nested fan-out never waits for a worker held by its own ancestors.
+    - the caller steals the jobs not started yet while waiting for them.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._idle = max_workers
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aifunc")
+        self._shutdown = False
+        self.inline_runs = 0
+        self.stolen_runs = 0
+
+    def submit(self, caller: Callable[..., Any], *args, **kwargs) -> AIFuncJob:
+        job = AIFuncJob(caller, *args, **kwargs)
+        with self._lock:
+            reserved = self._idle > 0 and not self._shutdown
+            if reserved:
+                self._idle -= 1
+            else:
+                self.inline_runs += 1
+        if reserved:
+            try:
+                self._executor.submit(self._work, job)
+                return job
+            except RuntimeError:
+                # the pool is shutdown.
+                with self._lock:
+                    self._idle += 1
+        job.run()
+        return job
+
+    def _work(self, job: AIFuncJob) -> None:
+        try:
+            job.run()
+        finally:
+            with self._lock:
+                self._idle += 1
+
+    def steal(self, jobs: Iterable[AIFuncJob]) -> bool:
+        """
+        run one of the jobs not started yet on the caller thread.
+        :return: if any job is run.
+        """
+        for job in jobs:
+            if not job.claimed() and job.run():
+                with self._lock:
+                    self.stolen_runs += 1
+                return True
+        return False
+
+    def idle(self) -> int:
+        return self._idle
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._shutdown = True
+        self._executor.shutdown(wait=wait)
+
+    def __del__(self):
+        if not getattr(self, "_shutdown", True):
+            self._executor.shutdown(wait=False)
+
+
+class AIFuncCancelScope:
+    """
+    cooperative cancellation flag of an aifunc and its sub aifuncs.
+    a scope is cancelled when itself or any of its ancestors is cancelled.
+    """
+
+    def __init__(self, parent: Optional["AIFuncCancelScope"] = None):
+        self._parent = parent
+        self._cancelled = False
+
+    def child(self) -> "AIFuncCancelScope":
+        return AIFuncCancelScope(self)
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def cancelled(self) -> bool:
+        scope = self
+        while scope is not None:
+            if scope._cancelled:
+                return True
+            scope = scope._parent
+        return False
@@ -2,13 +2,8 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 
-from typing import List, Iterable, Optional, Union, Callable, Set
+from typing import List, Iterable, Optional, Union, Callable, Set, TYPE_CHECKING
 from typing_extensions import Self
-from openai.types.chat.completion_create_params import Function, FunctionCall
-from openai import NotGiven, NOT_GIVEN
-from openai.types.chat.chat_completion_function_call_option_param import ChatCompletionFunctionCallOptionParam
-from openai.types.shared_params.function_definition import FunctionDefinition
-from openai.types.chat.chat_completion_tool_param import ChatCompletionToolParam
 
 from pydantic import BaseModel, Field
 from ghostos_common import helpers
@@ -17,6 +12,12 @@ from ghostos_common.helpers import timestamp, uuid
 from ghostos.core.llms.configs import ModelConf
 from ghostos.core.llms.tools import LLMFunc, FunctionalToken
 
+if TYPE_CHECKING:
+    # the openai sdk is imported by the methods which the openai driver calls.
+    from openai.types.chat.completion_create_params import Function, FunctionCall
+    from openai import NotGiven
+    from openai.types.chat.chat_completion_tool_param import ChatCompletionToolParam
+
 __all__ = [
     'Prompt', 'PromptPipe',
     'run_prompt_pipeline',
@@ -115,6 +116,8 @@ class Prompt(BaseModel):
         return result
 
     def get_openai_functions(self) -> Union[List[Function], NotGiven]:
+        from openai.types.chat.completion_create_params import Function
+        from openai import NOT_GIVEN
         if not self.functions:
             return NOT_GIVEN
         functions = []
@@ -130,6 +133,9 @@ class Prompt(BaseModel):
         return functions
 
     def get_openai_tools(self) -> Union[List[ChatCompletionToolParam], NotGiven]:
+        from openai.types.shared_params.function_definition import FunctionDefinition
+        from openai.types.chat.chat_completion_tool_param import ChatCompletionToolParam
+        from openai import NOT_GIVEN
         if not self.functions:
             return NOT_GIVEN
         tools = []
@@ -146,6 +152,10 @@ class Prompt(BaseModel):
         return tools
 
     def get_openai_function_call(self) -> Union[FunctionCall, NotGiven]:
+        from openai.types.chat.chat_completion_function_call_option_param import (
+            ChatCompletionFunctionCallOptionParam,
+        )
+        from openai import NOT_GIVEN
         if not self.functions:
             return NOT_GIVEN
         if self.function_call is None:
@@ -1,3 +1,4 @@
+from typing import TYPE_CHECKING
 from ghostos.core.messages.message import (
     Message, Role, MessageType,
     FunctionCaller, FunctionOutput,
@@ -11,11 +12,41 @@ from ghostos.core.messages.message_classes import (
 
 )
 from ghostos.core.messages.payload import Payload
-from ghostos.core.messages.openai import (
-    OpenAIMessageParser, DefaultOpenAIMessageParser, DefaultOpenAIParserProvider,
-    CompletionUsagePayload,
-)
 from ghostos.core.messages.buffers import Buffer, Flushed
 from ghostos.core.messages.utils import copy_messages
 from ghostos.core.messages.transport import Stream, Receiver, new_basic_connection, ReceiverBuffer, ListReceiver
 from ghostos.core.messages.pipeline import Pipe, SequencePipe, run_pipeline
+
+if TYPE_CHECKING:
+    from ghostos.core.messages.openai import (
+        OpenAIMessageParser, DefaultOpenAIMessageParser, DefaultOpenAIParserProvider,
+        CompletionUsagePayload,
+    )
+
+_openai_names = (
+    'OpenAIMessageParser', 'DefaultOpenAIMessageParser', 'DefaultOpenAIParserProvider', 'CompletionUsagePayload',
+)
+
+__all__ = [
+    'Message', 'Role', 'MessageType',
+    'FunctionCaller', 'FunctionOutput',
+    'MessageClass', 'MessageKind',
+    'MessageClassesParser',
+    'MessageStage',
+    'MessageKindParser',
+    'VariableMessage', 'ImageAssetMessage', 'AudioMessage', 'FunctionCallMessage', 'FunctionCallOutputMessage',
+    'Payload',
+    'Buffer', 'Flushed',
+    'copy_messages',
+    'Stream', 'Receiver', 'new_basic_connection', 'ReceiverBuffer', 'ListReceiver',
+    'Pipe', 'SequencePipe', 'run_pipeline',
+    *_openai_names,
+]
+
+
+def __getattr__(name: str):
+    # the openai sdk is heavy, load the openai message parser only when it is used.
+    if name in _openai_names:
+        from ghostos.core.messages import openai
+        return getattr(openai, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,3 +7,4 @@ from ghostos.core.runtime.processes import GoProcess, GoProcesses
 from ghostos.core.runtime.events import Event, EventBus, EventTypes
 from ghostos.core.runtime.thread_history import ThreadHistory
 from ghostos.core.runtime.runtime import Runtime
+from ghostos.core.runtime.unit_of_work import UnitOfWork
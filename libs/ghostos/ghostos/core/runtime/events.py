@@ -7,6 +7,7 @@ from ghostos.core.messages.message import Message, Role
 from ghostos_common.entity import EntityMeta
 from ghostos_common.helpers import uuid
 from contextlib import contextmanager
+import time
 
 __all__ = [
     'Event', 'EventBus', 'EventTypes',
@@ -69,6 +70,14 @@ class Event(BaseModel):
         default=False,
         description="if the event is a callback from child task to parent task.",
     )
+    priority: Optional[float] = Field(
+        default=None,
+        description="raise the scheduling priority of the target task to it until the task is scheduled",
+    )
+    deadline: Optional[float] = Field(
+        default=None,
+        description="the timestamp in seconds after which the unhandled event is expired and dropped",
+    )
 
     def is_empty(self) -> bool:
         return not self.reason and not self.instruction and not self.messages
@@ -79,6 +88,14 @@ class Event(BaseModel):
         """
         return self.task_id == self.from_task_id
 
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """
+        the canceled event never expires.
+        """
+        if self.deadline is None or self.type == EventTypes.CANCEL.value:
+            return False
+        return (now or time.time()) > self.deadline
+
     def is_from_client(self) -> bool:
         return self.from_task_id is None
 
@@ -255,9 +272,10 @@ class EventBus(ABC):
         pass
 
     @abstractmethod
-    def pop_task_notification(self) -> Optional[str]:
+    def pop_task_notification(self, timeout: Optional[float] = 0) -> Optional[str]:
         """
         pop a task notification from the main queue.
+        :param timeout: seconds to block until a notification arrives. 0 is not blocking, None blocks forever.
         :return: task id or None if not found.
         """
         pass
@@ -278,6 +296,15 @@ class EventBus(ABC):
     def clear_all(self):
         pass
 
+    def ack_event(self, e: Event) -> None:
+        """
+        acknowledge the popped event is handled. the durable event bus delivers the unacknowledged event again.
+        """
+        pass
+
     @contextmanager
     def transaction(self):
+        """
+        the events sent in the transaction are committed together when it exits without error.
+        """
         yield
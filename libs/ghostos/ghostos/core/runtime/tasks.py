@@ -6,7 +6,7 @@ from pydantic import BaseModel, Field
 from ghostos_common.identifier import Identifier, Identical
 from ghostos_common.entity import EntityMeta
 from ghostos.core.messages import Payload
-from ghostos_common.helpers import timestamp
+from ghostos_common.helpers import timestamp, md5
 from contextlib import contextmanager
 
 __all__ = [
@@ -123,7 +123,12 @@ Parent task id of the task.
 
     priority: float = Field(
         default=0.0,
-        description="The priority of the task",
+        description="The priority of the task, the background tasks of higher priority are scheduled first",
+    )
+    deadline: Optional[float] = Field(
+        default=None,
+        description="The timestamp in seconds the task is expected to respond before. "
+                    "the background task is scheduled more urgently when the deadline is coming",
     )
 
     # --- relations --- #
@@ -169,6 +174,7 @@ children task ids to wait
             context: Optional[EntityMeta] = None,
             parent_task_id: Optional[str] = None,
             priority: float = 0.0,
+            deadline: Optional[float] = None,
     ) -> "GoTaskStruct":
         return GoTaskStruct(
             task_id=task_id,
@@ -182,6 +188,7 @@ children task ids to wait
             name=name,
             description=description,
             priority=priority,
+            deadline=deadline,
         )
 
     def add_child(
@@ -203,6 +210,9 @@ children task ids to wait
             meta=meta,
             context=context,
             parent_task_id=self.task_id,
+            # the child works for the parent, as urgent as the parent.
+            priority=self.priority,
+            deadline=self.deadline,
         )
         child.depth = self.depth + 1
         return child
@@ -234,6 +244,13 @@ children task ids to wait
     def is_new(self) -> bool:
         return TaskState.NEW.value == self.state
 
+    def content_hash(self) -> str:
+        """
+        hash of the task content except the update time,
+        the repository skips saving the unchanged task by it.
+        """
+        return md5(self.model_dump_json(exclude_defaults=True, exclude={"updated"}))
+
     def new_turn(self) -> Self:
         """
         保存一轮变更之前运行的方法.
@@ -6,7 +6,7 @@ from ghostos.core.messages import Message, copy_messages, Role, MessageType, Mes
 from ghostos_moss.pycontext import PyContext
 from ghostos.core.llms import Prompt
 from ghostos.core.runtime.events import Event, EventTypes
-from ghostos_common.helpers import uuid, timestamp, yaml_pretty_dump
+from ghostos_common.helpers import uuid, timestamp, yaml_pretty_dump, md5
 from contextlib import contextmanager
 
 __all__ = [
@@ -319,6 +319,12 @@ class GoThreadInfo(BaseModel):
             return None
         return self.current.event
 
+    def content_hash(self) -> str:
+        """
+        hash of the thread content, the repository skips saving the unchanged thread by it.
+        """
+        return md5(self.model_dump_json(exclude_defaults=True))
+
     def fork(self, tid: Optional[str] = None) -> "GoThreadInfo":
         tid = tid if tid else uuid()
         root_id = self.root_id if self.root_id else self.id
@@ -445,6 +451,13 @@ class GoThreads(ABC):
     def save_thread(self, thread: GoThreadInfo) -> None:
         pass
 
+    def save_threads(self, *threads: GoThreadInfo) -> None:
+        """
+        save the threads in one batch. the storage based implementations write them together.
+        """
+        for thread in threads:
+            self.save_thread(thread)
+
     @abstractmethod
     def fork_thread(self, thread: GoThreadInfo) -> GoThreadInfo:
         pass
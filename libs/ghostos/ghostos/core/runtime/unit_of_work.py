@@ -0,0 +1,59 @@
+from typing import Dict, List, Tuple
+
+from ghostos.core.runtime.tasks import GoTasks, GoTaskStruct
+from ghostos.core.runtime.threads import GoThreads, GoThreadInfo
+from ghostos.core.runtime.events import EventBus, Event
+
+__all__ = ['UnitOfWork']
+
+
+class UnitOfWork:
+    """
+    collect the task, thread and event writes of one session step, and flush them together:
+    the tasks and the threads in one storage batch, which the file storages write with a single fsync pass,
+    and the events in one eventbus transaction which is committed only after the tasks and threads are saved.
+    the later write of the same task or thread replaces the earlier one.
+    """
+
+    def __init__(self, tasks: GoTasks, threads: GoThreads, eventbus: EventBus):
+        self._tasks = tasks
+        self._threads = threads
+        self._eventbus = eventbus
+        self._saving_tasks: Dict[str, GoTaskStruct] = {}
+        self._saving_threads: Dict[str, GoThreadInfo] = {}
+        self._sending_events: List[Tuple[Event, bool]] = []
+
+    def save_task(self, *tasks: GoTaskStruct) -> None:
+        for task in tasks:
+            self._saving_tasks[task.task_id] = task
+
+    def save_thread(self, *threads: GoThreadInfo) -> None:
+        for thread in threads:
+            self._saving_threads[thread.id] = thread
+
+    def send_event(self, e: Event, notify: bool) -> None:
+        self._sending_events.append((e, notify))
+
+    def pending(self) -> int:
+        """
+        the number of the writes waiting for flush.
+        """
+        return len(self._saving_tasks) + len(self._saving_threads) + len(self._sending_events)
+
+    def flush(self) -> None:
+        if not self.pending():
+            return
+        tasks = list(self._saving_tasks.values())
+        threads = list(self._saving_threads.values())
+        events = self._sending_events
+        self._saving_tasks = {}
+        self._saving_threads = {}
+        self._sending_events = []
+        with self._eventbus.transaction():
+            with self._tasks.transaction(), self._threads.transaction():
+                if tasks:
+                    self._tasks.save_task(*tasks)
+                if threads:
+                    self._threads.save_threads(*threads)
+            for e, notify in events:
+                self._eventbus.send_event(e, notify)
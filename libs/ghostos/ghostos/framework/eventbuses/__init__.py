@@ -1,2 +1,6 @@
 from ghostos.core.runtime import EventBus
 from ghostos.framework.eventbuses.memimpl import MemEventBusImplProvider, MemEventBusImpl
+from ghostos.framework.eventbuses.fairimpl import FairEventBusImplProvider, FairEventBusImpl, TaskQueueStats
+from ghostos.framework.eventbuses.sqliteimpl import (
+    SQLiteEventBusImplProvider, SQLiteEventBusImpl, SQLiteEventBusConf,
+)
@@ -0,0 +1,135 @@
+from typing import Optional, Dict, Deque, Tuple, Type, List
+from typing_extensions import Self
+from collections import deque, OrderedDict
+from threading import Condition, RLock
+import time
+
+from pydantic import BaseModel, Field
+from ghostos.core.runtime import Event
+from ghostos.core.runtime.events import EventBus, EventTypes
+from ghostos_container import Container, BootstrapProvider
+from ghostos.contracts.shutdown import Shutdown
+
+__all__ = ['FairEventBusImpl', 'FairEventBusImplProvider', 'TaskQueueStats']
+
+
+class TaskQueueStats(BaseModel):
+    task_id: str = Field(description="task id of the queue")
+    depth: int = Field(description="the number of the pending events")
+    oldest_age: float = Field(description="seconds since the oldest pending event was sent")
+    notified: bool = Field(description="if the task is waiting in the ready set")
+
+
+class FairEventBusImpl(EventBus):
+    """
+    in memory event bus for multiple consumers.
+    - the notified task ids are kept in an ordered ready set, a task is ready at most once.
+    - consumers pop the notifications in the notified order and notify the task again after handling one event,
+      so the tasks are served round-robin, and a chatty task can not starve the others.
+    - pop_task_notification blocks until a task is ready or timeout.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._ready_cond = Condition(self._lock)
+        self._ready: "OrderedDict[str, None]" = OrderedDict()
+        self._task_queues: Dict[str, Deque[Tuple[float, Event]]] = {}
+        self._closed = False
+
+    def with_process_id(self, process_id: str) -> Self:
+        return self
+
+    def send_event(self, e: Event, notify: bool) -> None:
+        with self._lock:
+            queue = self._task_queues.get(e.task_id, None)
+            if queue is None:
+                queue = self._task_queues[e.task_id] = deque()
+            item = (time.time(), e)
+            if e.type == EventTypes.CANCEL.value:
+                # canceled event is higher priority.
+                queue.appendleft(item)
+            else:
+                queue.append(item)
+            if notify:
+                self.notify_task(e.task_id)
+
+    def pop_task_event(self, task_id: str) -> Optional[Event]:
+        with self._lock:
+            queue = self._task_queues.get(task_id, None)
+            if not queue:
+                return None
+            _, event = queue.popleft()
+            if not queue:
+                del self._task_queues[task_id]
+            return event
+
+    def notify_task(self, task_id: str) -> None:
+        with self._lock:
+            if self._closed or task_id in self._ready:
+                return
+            self._ready[task_id] = None
+            self._ready_cond.notify()
+
+    def pop_task_notification(self, timeout: Optional[float] = 0) -> Optional[str]:
+        with self._lock:
+            if timeout != 0:
+                self._ready_cond.wait_for(lambda: self._ready or self._closed, timeout=timeout)
+            if not self._ready:
+                return None
+            task_id, _ = self._ready.popitem(last=False)
+            return task_id
+
+    def clear_task(self, task_id: str) -> None:
+        with self._lock:
+            self._task_queues.pop(task_id, None)
+            self._ready.pop(task_id, None)
+
+    def clear_all(self):
+        with self._lock:
+            self._task_queues.clear()
+            self._ready.clear()
+
+    def task_queue_stats(self) -> List[TaskQueueStats]:
+        """
+        depth and age of the pending events of each task.
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                TaskQueueStats(
+                    task_id=task_id,
+                    depth=len(queue),
+                    oldest_age=now - min(sent_at for sent_at, _ in queue),
+                    notified=task_id in self._ready,
+                )
+                for task_id, queue in self._task_queues.items()
+            ]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            self.clear_all()
+            # wake up the blocking consumers.
+            self._ready_cond.notify_all()
+
+
+class FairEventBusImplProvider(BootstrapProvider[EventBus]):
+    """
+    fair event bus provider
+    """
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[EventBus]:
+        return EventBus
+
+    def factory(self, con: Container) -> Optional[EventBus]:
+        return FairEventBusImpl()
+
+    def bootstrap(self, container: Container) -> None:
+        shutdown = container.get(Shutdown)
+        if shutdown is not None:
+            eventbus = container.force_fetch(EventBus)
+            if isinstance(eventbus, FairEventBusImpl):
+                shutdown.register(eventbus.shutdown)
@@ -55,10 +55,11 @@ class MemEventBusImpl(EventBus):
             queue.task_done()
             del self._task_queues[task_id]
 
-    def pop_task_notification(self) -> Optional[str]:
+    def pop_task_notification(self, timeout: Optional[float] = 0) -> Optional[str]:
         try:
-            task_id = self._task_notification_queue.get_nowait()
-            return task_id
+            if timeout == 0:
+                return self._task_notification_queue.get_nowait()
+            return self._task_notification_queue.get(timeout=timeout)
         except Empty:
             return None
 
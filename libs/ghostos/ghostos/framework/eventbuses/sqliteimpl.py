@@ -0,0 +1,322 @@
+from typing import Optional, List, Tuple, Type, Callable
+from typing_extensions import Self
+from contextlib import contextmanager
+from os.path import join
+import sqlite3
+import threading
+import time
+
+from pydantic import BaseModel, Field
+from ghostos.core.runtime import Event
+from ghostos.core.runtime.events import EventBus, EventTypes
+from ghostos.contracts.workspace import Workspace
+from ghostos.contracts.logger import LoggerItf
+from ghostos_container import Container, Provider
+
+__all__ = ['SQLiteEventBusImpl', 'SQLiteEventBusConf', 'SQLiteEventBusImplProvider']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT NOT NULL UNIQUE,
+    process_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    visible_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    redeliver INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS events_task ON events (process_id, task_id, visible_at, priority, seq);
+CREATE INDEX IF NOT EXISTS events_redeliver ON events (process_id, redeliver, visible_at);
+CREATE TABLE IF NOT EXISTS notifications (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    process_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    notified_at REAL NOT NULL,
+    UNIQUE (process_id, task_id)
+);
+"""
+
+
+class SQLiteEventBusConf(BaseModel):
+    """
+    the arguments of a SQLiteEventBusImpl, to open the same bus in another process.
+    """
+    filename: str = Field(description="the sqlite database file")
+    visibility_timeout: float = Field(default=300.0)
+    max_attempts: int = Field(default=3)
+    poll_interval: float = Field(default=0.05)
+    process_id: str = Field(default="")
+
+
+class SQLiteEventBusImpl(EventBus):
+    """
+    durable event bus on a local sqlite database in WAL mode, shared by the worker processes of one workspace.
+    - events are delivered at least once: a popped event is invisible to the others for the visibility timeout,
+      and it is deleted only when acknowledged. the events of a crashed worker are delivered again.
+    - the notifications are a deduplicated ready set of task ids, popped in the notified order.
+    - the sends, notifications and acks in a `transaction()` are committed together when it exits without error.
+    """
+
+    def __init__(
+            self,
+            filename: str,
+            *,
+            visibility_timeout: float = 300.0,
+            max_attempts: int = 3,
+            poll_interval: float = 0.05,
+            process_id: str = "",
+            logger: Optional[LoggerItf] = None,
+    ):
+        self._filename = filename
+        self._visibility_timeout = visibility_timeout
+        self._max_attempts = max_attempts
+        self._poll_interval = poll_interval
+        self._process_id = process_id
+        self._logger = logger
+        self._local = threading.local()
+        # wake up the consumers of this process early. consumers of the other processes poll.
+        self._notified = threading.Condition()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(events)").fetchall()]
+            if columns and "redeliver" not in columns:
+                # the database created before the redelivery notification.
+                conn.execute("ALTER TABLE events ADD COLUMN redeliver INTEGER NOT NULL DEFAULT 0")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._filename, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _buffer(self) -> Optional[List[Callable[[sqlite3.Connection], None]]]:
+        return getattr(self._local, "buffer", None)
+
+    def _execute(self, op: Callable[[sqlite3.Connection], None]) -> None:
+        buffer = self._buffer()
+        if buffer is not None:
+            buffer.append(op)
+            return
+        with self._write() as conn:
+            op(conn)
+        self._wakeup()
+
+    def _wakeup(self) -> None:
+        with self._notified:
+            self._notified.notify_all()
+
+    @classmethod
+    def from_conf(cls, conf: SQLiteEventBusConf, logger: Optional[LoggerItf] = None) -> Self:
+        return cls(
+            conf.filename,
+            visibility_timeout=conf.visibility_timeout,
+            max_attempts=conf.max_attempts,
+            poll_interval=conf.poll_interval,
+            process_id=conf.process_id,
+            logger=logger,
+        )
+
+    def conf(self) -> SQLiteEventBusConf:
+        return SQLiteEventBusConf(
+            filename=self._filename,
+            visibility_timeout=self._visibility_timeout,
+            max_attempts=self._max_attempts,
+            poll_interval=self._poll_interval,
+            process_id=self._process_id,
+        )
+
+    def with_process_id(self, process_id: str) -> Self:
+        return SQLiteEventBusImpl(
+            self._filename,
+            visibility_timeout=self._visibility_timeout,
+            max_attempts=self._max_attempts,
+            poll_interval=self._poll_interval,
+            process_id=process_id,
+            logger=self._logger,
+        )
+
+    @contextmanager
+    def transaction(self):
+        if self._buffer() is not None:
+            # nested transaction joins the outer one.
+            yield
+            return
+        self._local.buffer = []
+        try:
+            yield
+            buffer = self._local.buffer
+        finally:
+            self._local.buffer = None
+        if buffer:
+            with self._write() as conn:
+                for op in buffer:
+                    op(conn)
+            self._wakeup()
+
+    def send_event(self, e: Event, notify: bool) -> None:
+        now = time.time()
+        # canceled event is higher priority.
+        priority = 0 if e.type == EventTypes.CANCEL.value else 1
+        data = e.model_dump_json(exclude_defaults=True)
+
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT OR REPLACE INTO events (event_id, process_id, task_id, priority, data, sent_at, visible_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (e.event_id, self._process_id, e.task_id, priority, data, now, now),
+            )
+            if notify:
+                self._insert_notification(conn, e.task_id, now)
+
+        self._execute(op)
+
+    def _insert_notification(self, conn: sqlite3.Connection, task_id: str, now: float) -> None:
+        conn.execute(
+            "INSERT OR IGNORE INTO notifications (process_id, task_id, notified_at) VALUES (?, ?, ?)",
+            (self._process_id, task_id, now),
+        )
+
+    def notify_task(self, task_id: str) -> None:
+        now = time.time()
+        self._execute(lambda conn: self._insert_notification(conn, task_id, now))
+
+    def pop_task_event(self, task_id: str) -> Optional[Event]:
+        while True:
+            now = time.time()
+            with self._write() as conn:
+                row = conn.execute(
+                    "SELECT seq, event_id, data, attempts FROM events"
+                    " WHERE process_id = ? AND task_id = ? AND visible_at <= ?"
+                    " ORDER BY priority, seq LIMIT 1",
+                    (self._process_id, task_id, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                seq, event_id, data, attempts = row
+                if attempts >= self._max_attempts:
+                    # the event failed too many times, drop it.
+                    conn.execute("DELETE FROM events WHERE seq = ?", (seq,))
+                else:
+                    conn.execute(
+                        "UPDATE events SET visible_at = ?, attempts = attempts + 1, redeliver = 1 WHERE seq = ?",
+                        (now + self._visibility_timeout, seq),
+                    )
+                    return Event.model_validate_json(data)
+            if self._logger:
+                self._logger.error("drop event %s of task %s after %d attempts", event_id, task_id, attempts)
+
+    def ack_event(self, e: Event) -> None:
+        self._execute(lambda conn: conn.execute(
+            "DELETE FROM events WHERE process_id = ? AND event_id = ?",
+            (self._process_id, e.event_id),
+        ))
+
+    def _pop_notification(self) -> Optional[str]:
+        now = time.time()
+        with self._write() as conn:
+            # the events popped by a crashed worker are visible again, but nobody notifies the task.
+            # notify each of them once, until it is popped again.
+            expired = conn.execute(
+                "SELECT seq, task_id FROM events WHERE process_id = ? AND redeliver = 1 AND visible_at <= ?"
+                " ORDER BY seq",
+                (self._process_id, now),
+            ).fetchall()
+            for seq, task_id in expired:
+                self._insert_notification(conn, task_id, now)
+                conn.execute("UPDATE events SET redeliver = 0 WHERE seq = ?", (seq,))
+
+            row = conn.execute(
+                "SELECT seq, task_id FROM notifications WHERE process_id = ? ORDER BY seq LIMIT 1",
+                (self._process_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM notifications WHERE seq = ?", (row[0],))
+            return row[1]
+
+    def pop_task_notification(self, timeout: Optional[float] = 0) -> Optional[str]:
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            task_id = self._pop_notification()
+            if task_id is not None:
+                return task_id
+            if deadline is None:
+                wait = self._poll_interval
+            else:
+                wait = min(self._poll_interval, deadline - time.time())
+                if wait <= 0:
+                    return None
+            with self._notified:
+                self._notified.wait(wait)
+
+    def clear_task(self, task_id: str) -> None:
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM events WHERE process_id = ? AND task_id = ?", (self._process_id, task_id))
+            conn.execute(
+                "DELETE FROM notifications WHERE process_id = ? AND task_id = ?",
+                (self._process_id, task_id),
+            )
+
+        self._execute(op)
+
+    def clear_all(self):
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM events WHERE process_id = ?", (self._process_id,))
+            conn.execute("DELETE FROM notifications WHERE process_id = ?", (self._process_id,))
+
+        self._execute(op)
+
+    def task_queue_depths(self) -> List[Tuple[str, int, float]]:
+        """
+        (task id, pending events, seconds since the oldest event sent) of each task.
+        """
+        rows = self._connect().execute(
+            "SELECT task_id, COUNT(*), MIN(sent_at) FROM events WHERE process_id = ? GROUP BY task_id",
+            (self._process_id,),
+        ).fetchall()
+        now = time.time()
+        return [(task_id, count, now - sent_at) for task_id, count, sent_at in rows]
+
+
+class SQLiteEventBusImplProvider(Provider[EventBus]):
+    """
+    durable event bus in the workspace runtime directory.
+    """
+
+    def __init__(self, filename: str = "eventbus.db", visibility_timeout: float = 300.0, max_attempts: int = 3):
+        self._filename = filename
+        self._visibility_timeout = visibility_timeout
+        self._max_attempts = max_attempts
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[EventBus]:
+        return EventBus
+
+    def factory(self, con: Container) -> Optional[EventBus]:
+        workspace = con.force_fetch(Workspace)
+        logger = con.get(LoggerItf)
+        return SQLiteEventBusImpl(
+            join(workspace.runtime().abspath(), self._filename),
+            visibility_timeout=self._visibility_timeout,
+            max_attempts=self._max_attempts,
+            logger=logger,
+        )
@@ -1,3 +1,5 @@
 from ghostos.framework.ghostos.ghostos_impl import GhostOS, GhostOSImpl, GhostOSConfig, GhostOSProvider
 from ghostos.framework.ghostos.shell_impl import MatrixImpl, MatrixConf, Matrix
 from ghostos.framework.ghostos.conversation_impl import Conversation, ConversationImpl, ConversationConf
+from ghostos.framework.ghostos.process_runner import ProcessBackgroundRunner, MatrixWorkerSpec, WorkerStats
+from ghostos.framework.ghostos.scheduler import TaskScheduler, TaskSchedulerConf
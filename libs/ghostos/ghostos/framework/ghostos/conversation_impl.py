@@ -15,12 +15,14 @@ from ghostos.core.runtime import (
     GoThreadInfo, GoThreads,
 )
 from ghostos.core.llms import LLMFunc
-from ghostos.contracts.pool import Pool
+from ghostos.contracts.pool import Pool, PoolFullError
 from ghostos.contracts.logger import LoggerItf, wrap_logger
 from ghostos_common.entity import to_entity_meta, get_entity
 from pydantic import BaseModel, Field
 from .session_impl import SessionImpl
-from threading import Lock, Thread
+from .scheduler import TaskScheduler
+from threading import Lock
+from concurrent.futures import Future, wait
 
 __all__ = ["ConversationImpl", "ConversationConf", "Conversation"]
 
@@ -87,7 +89,7 @@ class ConversationImpl(Conversation[G]):
         self._tasks = container.force_fetch(GoTasks)
         self._threads = container.force_fetch(GoThreads)
         self._eventbus = container.force_fetch(EventBus)
-        self._submit_session_thread: Optional[Thread] = None
+        self._submit_session_future: Optional[Future] = None
         self._handling_event = False
         self._mutex = Lock()
         self._shell_closed = shell_closed
@@ -208,9 +210,7 @@ class ConversationImpl(Conversation[G]):
             request_timeout: float = 0.0,
     ) -> Tuple[Event, Receiver]:
         self._validate_closed()
-        if self._submit_session_thread:
-            self._submit_session_thread.join()
-            self._submit_session_thread = None
+        self._wait_session_event()
         messages = list(self._message_parser.parse(inputs))
         context_meta = to_entity_meta(context) if context is not None else None
         if self._ctx is not None:
@@ -250,13 +250,25 @@ class ConversationImpl(Conversation[G]):
             complete_only=self._is_background or not streaming,
             request_timeout=request_timeout,
         )
-        if self._submit_session_thread:
-            self._submit_session_thread.join()
-            self._submit_session_thread = None
-        self._submit_session_thread = Thread(target=self._submit_session_event, args=(event, stream,))
-        self._submit_session_thread.start()
+        self._wait_session_event()
+        try:
+            self._submit_session_future = self._pool.submit(self._submit_session_event, event, stream)
+        except PoolFullError:
+            with stream:
+                pass
+            if self._is_background:
+                # send the rejected event back, it will be handled later.
+                self._eventbus.send_event(event, notify=True)
+            self.logger.error("reject event %s since the pool is full", event.event_id)
+            raise
         return retriever
 
+    def _wait_session_event(self) -> None:
+        future = self._submit_session_future
+        if future is not None:
+            wait([future])
+            self._submit_session_future = None
+
     def _validate_closed(self):
         # todo: change error to defined error
         if self._closed:
@@ -282,10 +294,11 @@ class ConversationImpl(Conversation[G]):
                 if not self.fail(error=e):
                     raise
             finally:
+                # the handled event is acknowledged even if the session failed, the failure is already handled.
+                self._eventbus.ack_event(event)
                 if task and task.shall_notify():
                     self._eventbus.notify_task(event.task_id)
                 self._handling_event = False
-                self._submit_session_thread = None
 
     def loop_session_event(self, session: SessionImpl, event: Event, max_step: int) -> None:
         op = default_init_event_operator(event)
@@ -321,8 +334,12 @@ class ConversationImpl(Conversation[G]):
         )
 
     def pop_event(self) -> Optional[Event]:
-        if self.available():
-            return self._eventbus.pop_task_event(self.scope.task_id)
+        while self.available():
+            event = self._eventbus.pop_task_event(self.scope.task_id)
+            if event is None or not event.is_expired():
+                return event
+            self.logger.info("drop expired event %s of task %s", event.event_id, self.task_id)
+            self._eventbus.ack_event(event)
         return None
 
     def send_event(self, event: Event) -> None:
@@ -331,6 +348,8 @@ class ConversationImpl(Conversation[G]):
         notify = True
         if task:
             notify = task.depth > 0
+        if notify and (scheduler := self._container.get(TaskScheduler)):
+            scheduler.hint(event.task_id, event.priority, event.deadline)
         self._eventbus.send_event(event, notify)
 
     def fail(self, error: Exception) -> bool:
@@ -353,8 +372,7 @@ class ConversationImpl(Conversation[G]):
         self._closed = True
         self.logger.info("conversation %s is closing", self.task_id)
         self._handling_event = False
-        if self._submit_session_thread:
-            self._submit_session_thread = None
+        self._submit_session_future = None
         self.logger.info("conversation %s is destroying", self.task_id)
         self._container.shutdown()
         self._container = None
@@ -365,6 +383,9 @@ class ConversationImpl(Conversation[G]):
     def is_closed(self) -> bool:
         return self._closed or self._shell_closed()
 
+    def is_background(self) -> bool:
+        return self._is_background
+
     def is_alive(self) -> bool:
         return not self._closed
 
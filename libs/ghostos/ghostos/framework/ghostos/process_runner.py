@@ -0,0 +1,250 @@
+from typing import Optional, List
+import multiprocessing
+import os
+import threading
+import time
+
+from pydantic import BaseModel, Field
+from ghostos.core.runtime import GoProcess
+from ghostos.framework.eventbuses.sqliteimpl import SQLiteEventBusImpl, SQLiteEventBusConf
+from ghostos.contracts.logger import get_ghostos_logger
+from ghostos.framework.ghostos.shell_impl import MatrixImpl, MatrixConf
+
+__all__ = ['MatrixWorkerSpec', 'WorkerStats', 'ProcessBackgroundRunner', 'run_matrix_worker']
+
+
+class MatrixWorkerSpec(BaseModel):
+    """
+    how a worker process builds its own matrix.
+    """
+    container_maker: str = Field(
+        default="",
+        description="import path of the app container maker, Callable[[], Container]. "
+                    "default is ghostos.bootstrap:bootstrap",
+    )
+    config: MatrixConf = Field(description="the config of the matrix, providers included")
+    process: GoProcess = Field(description="the process of the matrix, shared by the workers")
+    eventbus: Optional[SQLiteEventBusConf] = Field(
+        default=None,
+        description="the cross-process eventbus shared with the parent, "
+                    "override the eventbus of the worker's container if given",
+    )
+    idle_time: float = Field(default=1.0, description="seconds to wait when no event is handled")
+    heartbeat_interval: float = Field(default=1.0)
+
+
+class WorkerStats(BaseModel):
+    index: int
+    pid: Optional[int] = None
+    alive: bool = False
+    started_at: float = 0.0
+    last_heartbeat: float = 0.0
+    handled: int = Field(default=0, description="events handled since the worker started")
+    errors: int = Field(default=0, description="errors raised since the worker started")
+    restarts: int = 0
+
+    def throughput(self) -> float:
+        """
+        handled events per second of the current worker process.
+        """
+        elapsed = (self.last_heartbeat or time.time()) - self.started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.handled / elapsed
+
+
+_STATS_FIELDS = 4
+"""pid, last heartbeat, handled, errors of each worker in the shared stats array"""
+
+_EXIT_MISCONFIGURED = 3
+"""exit code of a worker that can not share the events with the parent, restarting it does not help"""
+
+
+def run_matrix_worker(index: int, spec_data: str, stopped, stats) -> None:
+    """
+    main function of a worker process.
+    bootstrap its own container against the shared workspace, and run the background events until stopped.
+    :param index: index of the worker
+    :param spec_data: the MatrixWorkerSpec in json
+    :param stopped: shared flag of the graceful shutdown
+    :param stats: shared array of the workers' stats, the worker only writes its own slot.
+    """
+    from ghostos_container import Container
+    from ghostos_common.helpers import import_from_path
+    from ghostos.core.runtime import EventBus
+
+    spec = MatrixWorkerSpec.model_validate_json(spec_data)
+    offset = index * _STATS_FIELDS
+    counts = {"handled": 0, "errors": 0}
+
+    def heartbeat() -> None:
+        stats[offset:offset + _STATS_FIELDS] = [os.getpid(), time.time(), counts["handled"], counts["errors"]]
+
+    # the bootstrap may take long, beat from a thread until the event loop starts.
+    bootstrapped = threading.Event()
+
+    def heartbeat_loop() -> None:
+        while not bootstrapped.wait(spec.heartbeat_interval):
+            heartbeat()
+
+    heartbeat()
+    beating = threading.Thread(target=heartbeat_loop, name="ghostos_matrix_heartbeat", daemon=True)
+    beating.start()
+    try:
+        if spec.container_maker:
+            container = import_from_path(spec.container_maker)()
+            container.bootstrap()
+        else:
+            from ghostos.bootstrap import bootstrap
+            container = bootstrap()
+        if spec.eventbus is not None:
+            container = Container(parent=container, name="matrix_worker")
+            container.set(EventBus, SQLiteEventBusImpl.from_conf(spec.eventbus))
+        matrix = MatrixImpl(spec.config, container, spec.process, [])
+    finally:
+        bootstrapped.set()
+
+    logger = matrix.logger
+    eventbus = matrix.eventbus()
+    if not isinstance(eventbus, SQLiteEventBusImpl):
+        # a private eventbus never receives the events of the parent.
+        logger.error("matrix worker %d needs a cross-process eventbus, got %s", index, type(eventbus))
+        matrix.close()
+        raise SystemExit(_EXIT_MISCONFIGURED)
+
+    try:
+        # the flags and the stats are lock free, a killed worker can not block the others.
+        # the heartbeat is written by the event loop, so a worker hanging in a handler is restarted.
+        while not stopped.value:
+            heartbeat()
+            event = None
+            try:
+                event = matrix.run_background_event()
+                if event is not None:
+                    counts["handled"] += 1
+            except Exception as e:
+                counts["errors"] += 1
+                logger.exception(e)
+            if event is None:
+                time.sleep(spec.idle_time)
+    finally:
+        heartbeat()
+        matrix.close()
+
+
+class ProcessBackgroundRunner:
+    """
+    run the background events of a matrix in N worker processes, so the ghost turns do not share one GIL.
+    each worker bootstraps its own container, the workers cooperate by the cross-process event bus
+    and the task locks in the shared workspace.
+    call `check()` periodically to collect the heartbeats and restart the dead or unresponsive workers.
+    """
+
+    def __init__(self, spec: MatrixWorkerSpec, workers: int = 4, health_timeout: float = 60.0):
+        self._spec = spec
+        self._spec_data = spec.model_dump_json()
+        self._workers = workers
+        self._health_timeout = health_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stopped = self._ctx.RawValue("b", 0)
+        self._shared_stats = self._ctx.RawArray("d", workers * _STATS_FIELDS)
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._stats: List[WorkerStats] = [WorkerStats(index=i) for i in range(workers)]
+        self._started = False
+        self._logger = get_ghostos_logger()
+
+    def start(self) -> None:
+        if self._started:
+            raise RuntimeError("process background runner already started")
+        self._started = True
+        for index in range(self._workers):
+            self._spawn(index)
+
+    def _spawn(self, index: int) -> None:
+        p = self._ctx.Process(
+            target=run_matrix_worker,
+            args=(index, self._spec_data, self._stopped, self._shared_stats),
+            name=f"ghostos_matrix_worker_{index}",
+            daemon=True,
+        )
+        p.start()
+        self._processes[index] = p
+        stats = self._stats[index]
+        now = time.time()
+        stats.pid = p.pid
+        stats.alive = True
+        stats.started_at = now
+        # the bootstrap time counts into the health timeout.
+        stats.last_heartbeat = now
+        stats.handled = 0
+        stats.errors = 0
+
+    def _collect(self) -> None:
+        for index, stats in enumerate(self._stats):
+            offset = index * _STATS_FIELDS
+            pid, at, handled, errors = self._shared_stats[offset:offset + _STATS_FIELDS]
+            if int(pid) != stats.pid:
+                # not started yet, or the stats of a replaced worker.
+                continue
+            stats.last_heartbeat = max(stats.last_heartbeat, at)
+            stats.handled = int(handled)
+            stats.errors = int(errors)
+
+    def check(self) -> List[WorkerStats]:
+        """
+        collect the heartbeats, restart the dead workers and the workers without heartbeat for the health timeout.
+        :return: the stats of the workers.
+        """
+        self._collect()
+        if not self._started or self._stopped.value:
+            return self.stats()
+        now = time.time()
+        for index, p in enumerate(self._processes):
+            stats = self._stats[index]
+            alive = p is not None and p.is_alive()
+            if alive and now - stats.last_heartbeat <= self._health_timeout:
+                continue
+            if alive:
+                self._logger.error("matrix worker %d (pid %s) is unresponsive, restart it", index, stats.pid)
+                p.terminate()
+                p.join(5)
+            elif p is not None and p.exitcode == _EXIT_MISCONFIGURED:
+                raise RuntimeError(
+                    f"matrix worker {index} can not share the eventbus of the parent, "
+                    f"make the container maker provide a SQLiteEventBusImpl"
+                )
+            else:
+                self._logger.error(
+                    "matrix worker %d (pid %s) exited with %s, restart it",
+                    index, stats.pid, p.exitcode if p else None,
+                )
+            stats.restarts += 1
+            self._spawn(index)
+        return self.stats()
+
+    def stats(self) -> List[WorkerStats]:
+        self._collect()
+        result = []
+        for index, p in enumerate(self._processes):
+            stats = self._stats[index].model_copy()
+            stats.alive = p is not None and p.is_alive()
+            result.append(stats)
+        return result
+
+    def alive(self) -> bool:
+        return any(p is not None and p.is_alive() for p in self._processes)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        graceful shutdown: the workers finish the handling events and exit, the others are terminated after timeout.
+        """
+        self._stopped.value = 1
+        deadline = time.time() + timeout
+        for p in self._processes:
+            if p is not None:
+                p.join(max(0.0, deadline - time.time()))
+        for p in self._processes:
+            if p is not None and p.is_alive():
+                p.terminate()
+                p.join(5)
+        self._collect()
@@ -0,0 +1,160 @@
+from typing import Optional, Dict, Tuple, Callable
+from threading import Lock
+import time
+
+from pydantic import BaseModel, Field
+from ghostos.core.runtime import EventBus, GoTasks, GoTaskStruct
+
+__all__ = ['TaskScheduler', 'TaskSchedulerConf']
+
+
+class TaskSchedulerConf(BaseModel):
+    window: int = Field(
+        default=16,
+        description="max number of the notified tasks pulled from the eventbus to choose from",
+    )
+    aging_rate: float = Field(
+        default=0.1,
+        description="priority gained per second waiting in the window, so the low priority tasks never starve",
+    )
+    deadline_window: float = Field(
+        default=60.0,
+        description="seconds before the deadline the task starts to gain priority",
+    )
+    deadline_boost: float = Field(
+        default=10.0,
+        description="priority gained when the deadline is reached",
+    )
+    interactive_boost: float = Field(
+        default=5.0,
+        description="priority gained by the child task of a live foreground conversation",
+    )
+
+
+class TaskScheduler:
+    """
+    choose the next background task by priority instead of the notified order.
+    the notified tasks are pulled from the eventbus into a small window, then the one of the highest score is chosen,
+    and the others are notified back at once, so they are not stranded in a crashed worker or hoarded by one process.
+    score = task priority (or the priority of the events sent to it)
+            + interactive boost if its parent is in a live foreground conversation
+            + deadline boost growing in the deadline window
+            + aging rate * seconds waited in the window
+    """
+
+    def __init__(
+            self,
+            eventbus: EventBus,
+            tasks: GoTasks,
+            conf: Optional[TaskSchedulerConf] = None,
+            is_interactive: Optional[Callable[[GoTaskStruct], bool]] = None,
+    ):
+        self._eventbus = eventbus
+        self._tasks = tasks
+        self._conf = conf or TaskSchedulerConf()
+        self._is_interactive = is_interactive
+        self._lock = Lock()
+        # task id => (entered at, task)
+        self._window: Dict[str, Tuple[float, GoTaskStruct]] = {}
+        # task id => entered at, of the tasks given back to the eventbus, so they keep aging.
+        self._entered: Dict[str, float] = {}
+        # task id => (priority, deadline) raised by the events sent to the task.
+        self._hints: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+
+    def hint(self, task_id: str, priority: Optional[float] = None, deadline: Optional[float] = None) -> None:
+        """
+        raise the priority or bring forward the deadline of the task until it is scheduled.
+        """
+        if priority is None and deadline is None:
+            return
+        with self._lock:
+            hinted_priority, hinted_deadline = self._hints.get(task_id, (None, None))
+            if priority is not None and (hinted_priority is None or priority > hinted_priority):
+                hinted_priority = priority
+            if deadline is not None and (hinted_deadline is None or deadline < hinted_deadline):
+                hinted_deadline = deadline
+            self._hints[task_id] = (hinted_priority, hinted_deadline)
+
+    def score(self, task: GoTaskStruct, waited: float, now: float) -> float:
+        conf = self._conf
+        priority = task.priority
+        deadline = task.deadline
+        hinted_priority, hinted_deadline = self._hints.get(task.task_id, (None, None))
+        if hinted_priority is not None:
+            priority = max(priority, hinted_priority)
+        if hinted_deadline is not None:
+            deadline = hinted_deadline if deadline is None else min(deadline, hinted_deadline)
+
+        score = priority + conf.aging_rate * waited
+        if deadline is not None and conf.deadline_window > 0:
+            left = deadline - now
+            if left <= 0:
+                score += conf.deadline_boost
+            elif left < conf.deadline_window:
+                score += conf.deadline_boost * (1 - left / conf.deadline_window)
+        if self._is_interactive is not None and self._is_interactive(task):
+            score += conf.interactive_boost
+        return score
+
+    def next_task_id(self) -> Optional[str]:
+        """
+        pop the task id to run next, or None if no task is notified.
+        """
+        with self._lock:
+            self._fill()
+            if not self._window:
+                return None
+            now = time.time()
+            chosen = None
+            chosen_score = None
+            for task_id, (entered, task) in self._window.items():
+                score = self.score(task, now - entered, now)
+                # the earlier entered one wins the tie, since the window is in the notified order.
+                if chosen_score is None or score > chosen_score:
+                    chosen = task_id
+                    chosen_score = score
+            del self._window[chosen]
+            self._hints.pop(chosen, None)
+            self._give_back()
+            return chosen
+
+    def _fill(self) -> None:
+        now = time.time()
+        # at most one window of pulls, the eventbus may notify the same task again and again.
+        for _ in range(self._conf.window):
+            if len(self._window) >= self._conf.window:
+                return
+            task_id = self._eventbus.pop_task_notification()
+            if task_id is None:
+                return
+            if task_id in self._window:
+                # already waiting, the eventbus has nothing new.
+                return
+            task = self._tasks.get_task(task_id)
+            if task is None:
+                self._eventbus.clear_task(task_id)
+                self._hints.pop(task_id, None)
+                continue
+            self._window[task_id] = (self._entered.get(task_id, now), task)
+
+    def _give_back(self) -> None:
+        # the notifications of the tasks in the window are consumed, only the chosen one shall be.
+        self._entered = {task_id: entered for task_id, (entered, _) in self._window.items()}
+        for task_id in self._window:
+            self._eventbus.notify_task(task_id)
+        self._window.clear()
+
+    def size(self) -> int:
+        """
+        the number of the tasks waiting in the window.
+        """
+        return len(self._window)
+
+    def release(self) -> None:
+        """
+        give the tasks in the window back to the eventbus, so the other workers can handle them.
+        """
+        with self._lock:
+            self._give_back()
+            self._entered.clear()
+            self._hints.clear()
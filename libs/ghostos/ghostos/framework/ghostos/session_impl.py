@@ -16,7 +16,7 @@ from ghostos.core.messages.message_classes import (
 from ghostos.core.runtime import (
     TaskBrief, GoTaskStruct, TaskPayload, GoTasks, TaskState,
     EventBus, Event, EventTypes,
-    GoThreads,
+    GoThreads, UnitOfWork,
     GoThreadInfo,
 )
 from ghostos_common.prompter import PromptObjectModel
@@ -413,11 +413,19 @@ class SessionImpl(Session[Ghost]):
             self._saved = True
             self.logger.info("saving session on %s", self.scope.model_dump())
             self._validate_alive()
+            # all the writes of the step are flushed together,
+            # the events are sent only if the tasks and threads are saved.
+            uow = UnitOfWork(
+                self.container.force_fetch(GoTasks),
+                self.container.force_fetch(GoThreads),
+                self.container.force_fetch(EventBus),
+            )
             self._update_subtasks()
-            self._update_state_changes()
-            self._do_create_tasks()
-            self._do_save_threads()
-            self._do_fire_events()
+            self._update_state_changes(uow)
+            self._do_create_tasks(uow)
+            self._do_save_threads(uow)
+            self._do_fire_events(uow)
+            uow.flush()
             self._reset()
         except Exception as e:
             self.logger.exception(e)
@@ -434,7 +442,7 @@ class SessionImpl(Session[Ghost]):
             children.append(tid)
         self.task.children = children
 
-    def _update_state_changes(self) -> None:
+    def _update_state_changes(self, uow: UnitOfWork) -> None:
         task = self.task
         thread = self.thread
         task.meta = to_entity_meta(self.ghost)
@@ -478,36 +486,30 @@ class SessionImpl(Session[Ghost]):
             # do not save confirm to thread.
             thread.store()
 
-        tasks = self.container.force_fetch(GoTasks)
-        threads = self.container.force_fetch(GoThreads)
         self.logger.debug("task info %s", task.model_dump())
-        tasks.save_task(task)
-        threads.save_thread(thread)
+        uow.save_task(task)
+        uow.save_thread(thread)
 
-    def _do_create_tasks(self) -> None:
-        tasks = self.container.force_fetch(GoTasks)
+    def _do_create_tasks(self, uow: UnitOfWork) -> None:
         if self._creating_tasks:
-            tasks.save_task(*self._creating_tasks.values())
+            uow.save_task(*self._creating_tasks.values())
             self._creating_tasks = {}
 
-    def _do_save_threads(self) -> None:
-        threads = self.container.force_fetch(GoThreads)
+    def _do_save_threads(self, uow: UnitOfWork) -> None:
         if self._saving_threads:
-            for saving in self._saving_threads.values():
-                threads.save_thread(saving)
+            uow.save_thread(*self._saving_threads.values())
             self._saving_threads = {}
 
-    def _do_fire_events(self) -> None:
+    def _do_fire_events(self, uow: UnitOfWork) -> None:
         if not self._firing_events:
             return
         logger = self.logger
-        bus = self.container.force_fetch(EventBus)
         for e in self._firing_events:
             # all the sub-tasks need notification
             notify = True
             if e.task_id == self.task.parent:
                 notify = self.task.depth - 1 == 0
-            bus.send_event(e, notify)
+            uow.send_event(e, notify)
             logger.debug("session fired event %s", {e.event_id})
         self._firing_events = []
 
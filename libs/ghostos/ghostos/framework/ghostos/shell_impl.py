@@ -1,7 +1,7 @@
 import time
-from typing import Union, Optional, Iterable, List, Tuple, TypeVar, Callable
+from typing import Union, Optional, Iterable, List, Tuple, TypeVar, Callable, TYPE_CHECKING
 from ghostos.contracts.logger import LoggerItf, get_ghostos_logger
-from ghostos.contracts.pool import Pool, DefaultPool
+from ghostos.contracts.pool import Pool, BoundedPool, PoolStats
 from ghostos_container import Container, Provider
 from ghostos.abcd import Matrix, Conversation, Ghost, Scope, Background
 from ghostos.abcd.utils import get_ghost_driver
@@ -14,9 +14,13 @@ from ghostos.core.messages import Stream
 from ghostos_common.helpers import uuid, Timeleft, import_from_path
 from ghostos_common.identifier import get_identifier
 from ghostos_common.entity import to_entity_meta
-from threading import Lock
+from threading import Lock, Thread
 from pydantic import BaseModel, Field
 from .conversation_impl import ConversationImpl, ConversationConf
+from .scheduler import TaskScheduler, TaskSchedulerConf
+
+if TYPE_CHECKING:
+    from .process_runner import ProcessBackgroundRunner
 
 __all__ = ['MatrixConf', 'MatrixImpl', 'Matrix']
 
@@ -29,10 +33,23 @@ class MatrixConf(BaseModel):
         default=3,
     )
     pool_size: int = 100
+    pool_queue_size: int = Field(
+        default=100,
+        description="max number of the session events waiting for a pool worker",
+    )
+    pool_queue_timeout: Optional[float] = Field(
+        default=30.0,
+        description="seconds to wait for a pool slot when the queue is full, then the event is rejected. "
+                    "None means waiting forever",
+    )
     background_idle_time: float = Field(1)
     task_lock_overdue: float = Field(
         default=10.0
     )
+    scheduler: TaskSchedulerConf = Field(
+        default_factory=TaskSchedulerConf,
+        description="how the background tasks are scheduled",
+    )
     providers: List[str] = []
 
 
@@ -68,12 +85,16 @@ class MatrixImpl(Matrix):
             process_id=self._process_id,
             task_id=self._process_id,
         )
-        self._pool = DefaultPool(config.pool_size)
+        # the session events run in the bounded pool, the long-lived background workers run in their own threads.
+        self._pool = BoundedPool(config.pool_size, config.pool_queue_size, config.pool_queue_timeout)
         self._container.set(Pool, self._pool)
         self._eventbus = self._container.force_fetch(EventBus)
         self._tasks = self._container.force_fetch(GoTasks)
+        self._scheduler = TaskScheduler(self._eventbus, self._tasks, config.scheduler, self._is_interactive)
+        self._container.set(TaskScheduler, self._scheduler)
         self._closed = False
         self._background_started = False
+        self._background_threads: List[Thread] = []
         # bootstrap the container.
         # bind self
         self._container.set(Matrix, self)
@@ -95,8 +116,24 @@ class MatrixImpl(Matrix):
         notify = True
         if task:
             notify = task.depth > 0
+        if notify:
+            self._scheduler.hint(task_id, event.priority, event.deadline)
         self._eventbus.send_event(event, notify)
 
+    def _is_interactive(self, task: GoTaskStruct) -> bool:
+        """
+        the task is a child of a live foreground conversation, someone is waiting for it.
+        """
+        if not task.parent:
+            return False
+        with self._conversation_mutex:
+            for conversation in self._conversations:
+                if conversation.task_id != task.parent or conversation.is_closed():
+                    continue
+                if isinstance(conversation, ConversationImpl) and not conversation.is_background():
+                    return True
+        return False
+
     def sync(
             self,
             ghost: Ghost,
@@ -287,7 +324,7 @@ class MatrixImpl(Matrix):
             background: Optional[Background] = None,
     ) -> Union[Event, None]:
         self._validate_closed()
-        task_id = self._eventbus.pop_task_notification()
+        task_id = self._scheduler.next_task_id()
         if task_id is None:
             return None
 
@@ -298,6 +335,8 @@ class MatrixImpl(Matrix):
 
         conversation = self._sync_task(task, throw=False, is_background=True)
         if conversation is None:
+            # the task is locked by another worker, the events shall not be lost.
+            self._eventbus.notify_task(task_id)
             return None
 
         def on_event(e: Event, r: Receiver) -> None:
@@ -327,6 +366,19 @@ class MatrixImpl(Matrix):
             finally:
                 self._eventbus.notify_task(self._scope.task_id)
 
+    def pool_stats(self) -> PoolStats:
+        """
+        queue wait time, running and pending callers of the matrix pool.
+        """
+        return self._pool.stats()
+
+    def running_sessions(self) -> int:
+        """
+        the number of the conversations that are handling an event.
+        """
+        with self._conversation_mutex:
+            return len([c for c in self._conversations if not c.is_closed() and not c.available()])
+
     def submit(self, caller: Callable, *args, **kwargs):
         pool = self.container().force_fetch(Pool)
         pool.submit(caller, *args, **kwargs)
@@ -336,8 +388,56 @@ class MatrixImpl(Matrix):
         if self._background_started:
             raise RuntimeError(f'background run already started')
 
+        self._background_started = True
+        # a worker waits for the session events it dispatched to the pool,
+        # it shall not hold a slot of the pool, or the workers deadlock the pool.
         for i in range(worker):
-            self._pool.submit(self._run_background_worker, background)
+            t = Thread(
+                target=self._run_background_worker,
+                args=(background,),
+                name=f"ghostos_background_worker_{i}",
+                daemon=True,
+            )
+            t.start()
+            self._background_threads.append(t)
+
+    def background_run_processes(
+            self,
+            worker: int = 4,
+            *,
+            container_maker: str = "",
+            providers: Optional[List[str]] = None,
+            health_timeout: float = 60.0,
+    ) -> "ProcessBackgroundRunner":
+        """
+        run the background events in worker processes instead of threads.
+        each worker bootstraps its own container by the container maker against the shared workspace,
+        and handles the events of the eventbus of this matrix, which shall be a SQLiteEventBusImpl.
+        :param worker: number of the worker processes
+        :param container_maker: import path of the app container maker, default is ghostos.bootstrap:bootstrap
+        :param providers: import paths of the providers registered to the matrix container of the workers
+        :param health_timeout: restart the worker if no heartbeat for the seconds
+        :return: the started runner. call `check()` periodically and `stop()` at last.
+        """
+        from ghostos.framework.eventbuses import SQLiteEventBusImpl
+        from ghostos.framework.ghostos.process_runner import ProcessBackgroundRunner, MatrixWorkerSpec
+
+        self._validate_closed()
+        if not isinstance(self._eventbus, SQLiteEventBusImpl):
+            raise RuntimeError(
+                f"background worker processes need a cross-process eventbus, got {type(self._eventbus)}"
+            )
+        config = self._conf.model_copy(update={"providers": [*self._conf.providers, *(providers or [])]})
+        spec = MatrixWorkerSpec(
+            container_maker=container_maker,
+            config=config,
+            process=GoProcess(shell_id=self._shell_id, process_id=self._process_id),
+            eventbus=self._eventbus.conf(),
+            idle_time=self._conf.background_idle_time,
+        )
+        runner = ProcessBackgroundRunner(spec, worker, health_timeout)
+        runner.start()
+        return runner
 
     def _run_background_worker(self, background: Optional[Background] = None):
         def is_stopped() -> bool:
@@ -392,8 +492,12 @@ class MatrixImpl(Matrix):
             self.logger.info("closing shell conversation %s", conversation.task_id)
             conversation.close()
         self.logger.info("shell conversations are closed")
+        self._scheduler.release()
         self._container.shutdown()
         self.logger.info("shell container destroyed")
         self.logger.info("shutting down shell pool")
         self._pool.shutdown(cancel_futures=True)
         self.logger.info("shell pool is shut")
+        for t in self._background_threads:
+            t.join(self._conf.background_idle_time + 1)
+        self._background_threads.clear()
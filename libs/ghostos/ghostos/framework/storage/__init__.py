@@ -1,3 +1,4 @@
 from ghostos.contracts.storage import Storage, FileStorage
-from ghostos.framework.storage.filestorage import FileStorageProvider, FileStorageImpl
+from ghostos.framework.storage.filestorage import FileStorageProvider, FileStorageImpl, FileStorageConf
 from ghostos.framework.storage.memstorage import MemStorage
+from ghostos.framework.storage.saved_hashes import SavedHashes
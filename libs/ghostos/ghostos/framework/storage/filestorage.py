@@ -1,10 +1,92 @@
 import os
 import re
-from typing import Optional, Iterable
+import gzip
+import threading
+from contextlib import contextmanager
+from typing import Optional, Iterable, Dict, List, Tuple, Literal
+from pydantic import BaseModel, Field
 from ghostos_container import Provider, Container, ABSTRACT
 from ghostos.contracts.storage import Storage, FileStorage
 
-__all__ = ["FileStorageProvider", "FileStorageImpl"]
+__all__ = ["FileStorageProvider", "FileStorageImpl", "FileStorageConf"]
+
+_COMPRESSED_MAGIC = b"\x00ghostos-gzip\x00"
+"""prefix of the compressed file content, the null bytes never appear in a text file"""
+
+_batching = threading.local()
+"""the writes of the file storages in the batch of the current thread, (file path, content, atomic, fsync)"""
+
+
+class FileStorageConf(BaseModel):
+    atomic: bool = Field(
+        default=True,
+        description="write to a temporary file and rename it, the readers never see a half-written file",
+    )
+    fsync: Literal["never", "always", "batch"] = Field(
+        default="never",
+        description="never: leave the flushing to the os; "
+                    "always: fsync each file before it is renamed into place; "
+                    "batch: fsync the files of one put_many or one batch together, the single puts are not synced",
+    )
+    compress_threshold: int = Field(
+        default=0,
+        description="gzip the content not smaller than the bytes, 0 means never compress. "
+                    "the compressed files are only readable by the storage",
+    )
+    compress_level: int = Field(default=6, ge=1, le=9)
+
+
+def _write_files(writes: List[Tuple[str, bytes, bool, bool]]) -> None:
+    """
+    write all the files first, then rename them together, so the fsync calls are issued back to back.
+    :param writes: (absolute file path, encoded content, atomic, fsync)
+    """
+    # the later write of the same file replaces the earlier one.
+    latest = {write[0]: write for write in writes}
+    renames = []
+    synced_dirs = set()
+    try:
+        for file_path, content, atomic, fsync in latest.values():
+            file_dir = os.path.dirname(file_path)
+            if not os.path.exists(file_dir):
+                os.makedirs(file_dir, exist_ok=True)
+            writing = file_path
+            if atomic:
+                writing = _temp_file_path(file_path)
+                renames.append((writing, file_path))
+                if fsync:
+                    # the renames are durable only when the directories are synced.
+                    synced_dirs.add(file_dir)
+            with open(writing, 'wb') as f:
+                f.write(content)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        for writing, file_path in renames:
+            os.replace(writing, file_path)
+        renames = []
+    finally:
+        for writing, _ in renames:
+            if os.path.exists(writing):
+                os.remove(writing)
+    for file_dir in synced_dirs:
+        _fsync_dir(file_dir)
+
+
+def _temp_file_path(file_path: str) -> str:
+    dirname, basename = os.path.split(file_path)
+    return os.path.join(dirname, f".{basename}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _fsync_dir(file_dir: str) -> None:
+    if not hasattr(os, "O_DIRECTORY"):
+        # windows can not open a directory.
+        return
+    fd = os.open(file_dir, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 class FileStorageImpl(FileStorage):
@@ -13,8 +95,9 @@ class FileStorageImpl(FileStorage):
     Simplest implementation.
     """
 
-    def __init__(self, dir_: str):
+    def __init__(self, dir_: str, conf: Optional[FileStorageConf] = None):
         self._dir: str = os.path.abspath(dir_)
+        self._conf = conf or FileStorageConf()
 
     def abspath(self) -> str:
         return self._dir
@@ -22,7 +105,10 @@ class FileStorageImpl(FileStorage):
     def get(self, file_path: str) -> bytes:
         file_path = self._join_file_path(file_path)
         with open(file_path, 'rb') as f:
-            return f.read()
+            content = f.read()
+        if content.startswith(_COMPRESSED_MAGIC):
+            return gzip.decompress(content[len(_COMPRESSED_MAGIC):])
+        return content
 
     def remove(self, file_path: str) -> None:
         file_path = self._join_file_path(file_path)
@@ -41,19 +127,50 @@ class FileStorageImpl(FileStorage):
 
     def put(self, file_path: str, content: bytes) -> None:
         file_path = self._join_file_path(file_path)
-        if not file_path.startswith(self._dir):
-            raise FileNotFoundError(f"file path {file_path} is not allowed")
-        file_dir = os.path.dirname(file_path)
-        if not os.path.exists(file_dir):
-            os.makedirs(file_dir)
-        with open(file_path, 'wb') as f:
-            f.write(content)
+        _write_files([(file_path, self._encode(content), self._conf.atomic, self._conf.fsync == "always")])
+
+    def put_many(self, contents: Dict[str, bytes]) -> None:
+        fsync = self._conf.fsync != "never"
+        writes = [
+            (self._join_file_path(file_path), self._encode(content), self._conf.atomic, fsync)
+            for file_path, content in contents.items()
+        ]
+        buffer = getattr(_batching, "writes", None)
+        if buffer is not None:
+            buffer.extend(writes)
+            return
+        _write_files(writes)
+
+    @contextmanager
+    def batch(self):
+        """
+        the put_many calls of all the file storages in the batch are written together when it exits,
+        so the files of one batch are synced back to back, and each directory is synced once.
+        """
+        if getattr(_batching, "writes", None) is not None:
+            yield
+            return
+        _batching.writes = []
+        try:
+            yield
+        finally:
+            # the writes already made are not discarded on error, the same as without the batch.
+            writes = _batching.writes
+            _batching.writes = None
+            if writes:
+                _write_files(writes)
+
+    def _encode(self, content: bytes) -> bytes:
+        threshold = self._conf.compress_threshold
+        if 0 < threshold <= len(content):
+            return _COMPRESSED_MAGIC + gzip.compress(content, compresslevel=self._conf.compress_level)
+        return content
 
     def sub_storage(self, relative_path: str) -> "FileStorage":
         if not relative_path:
             return self
         dir_path = self._join_file_path(relative_path)
-        return FileStorageImpl(dir_path)
+        return FileStorageImpl(dir_path, self._conf)
 
     def dir(self, prefix_dir: str, recursive: bool, patten: Optional[str] = None) -> Iterable[str]:
         dir_path = self._join_file_path(prefix_dir)
@@ -81,8 +198,9 @@ class FileStorageImpl(FileStorage):
 
 class FileStorageProvider(Provider[FileStorage]):
 
-    def __init__(self, dir_: str):
+    def __init__(self, dir_: str, conf: Optional[FileStorageConf] = None):
         self._dir: str = dir_
+        self._conf = conf
 
     def singleton(self) -> bool:
         return True
@@ -91,4 +209,4 @@ class FileStorageProvider(Provider[FileStorage]):
         yield Storage
 
     def factory(self, con: Container) -> Optional[Storage]:
-        return FileStorageImpl(self._dir)
+        return FileStorageImpl(self._dir, self._conf)
@@ -0,0 +1,49 @@
+from typing import Dict
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+
+__all__ = ['SavedHashes']
+
+
+class SavedHashes:
+    """
+    remember the content hashes of the recently loaded or saved objects,
+    so the repositories can skip saving an object that is not changed.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self._max_size = max_size
+        self._hashes: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = Lock()
+        self.written = 0
+        self.skipped = 0
+
+    @staticmethod
+    def hash(content: bytes) -> str:
+        return hashlib.md5(content).hexdigest()
+
+    def remember(self, key: str, content_hash: str) -> None:
+        with self._lock:
+            self._hashes[key] = content_hash
+            self._hashes.move_to_end(key)
+            if len(self._hashes) > self._max_size:
+                self._hashes.popitem(last=False)
+
+    def changed(self, key: str, content_hash: str) -> bool:
+        """
+        check the content is changed since loaded or saved, and count the skipped write if not.
+        """
+        with self._lock:
+            if self._hashes.get(key, None) == content_hash:
+                self.skipped += 1
+                return False
+            self.written += 1
+            return True
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._hashes.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"written": self.written, "skipped": self.skipped}
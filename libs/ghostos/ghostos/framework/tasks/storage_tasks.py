@@ -1,15 +1,25 @@
+import os
 import time
-from typing import Optional, List, Iterable, Type, TypedDict
+from contextlib import contextmanager
+from typing import Optional, List, Iterable, Type, TypedDict, Dict
 import yaml
 from ghostos.core.runtime import TaskState, TaskBrief, GoTaskStruct, GoTasks
 from ghostos.contracts.workspace import Workspace
 from ghostos.contracts.logger import LoggerItf
-from ghostos.contracts.storage import Storage
+from ghostos.contracts.storage import Storage, FileStorage
+from ghostos.framework.storage.filestorage import FileStorageImpl
+from ghostos.framework.storage.saved_hashes import SavedHashes
 from ghostos_container import Provider, Container
 from ghostos.core.runtime.tasks import TaskLocker
 from ghostos_common.helpers import uuid, timestamp
 
-__all__ = ['StorageGoTasksImpl', 'StorageTasksImplProvider', 'WorkspaceTasksProvider']
+try:
+    import fcntl
+except ImportError:
+    # windows
+    fcntl = None
+
+__all__ = ['StorageGoTasksImpl', 'StorageTasksImplProvider', 'WorkspaceTasksProvider', 'FileTaskLocker']
 
 
 class SimpleStorageLocker(TaskLocker):
@@ -26,6 +36,9 @@ class SimpleStorageLocker(TaskLocker):
         self._force = force
 
     def acquire(self) -> bool:
+        return self._acquire()
+
+    def _acquire(self) -> bool:
         filename = self.locker_file_name()
         if self.storage.exists(filename):
             content = self.storage.get(filename)
@@ -69,26 +82,70 @@ class SimpleStorageLocker(TaskLocker):
         if not self._acquired:
             return False
         filename = self.locker_file_name()
-        if self.refresh():
+        if self._acquire():
             self.storage.remove(filename)
             self._acquired = False
             return True
         return False
 
 
+class FileTaskLocker(SimpleStorageLocker):
+    """
+    the task lock shared by the processes of a workspace.
+    the check-then-write of the lock file runs while holding an exclusive flock of a mutex file,
+    so two processes never acquire the same task. the flock is released by the os if the process crashes.
+    """
+
+    def __init__(self, storage: FileStorage, task_id: str, overdue: float, force: bool = False):
+        super().__init__(storage, task_id, overdue, force)
+        self._mutex_file = os.path.join(storage.abspath(), f"{task_id}.lock.mutex")
+
+    @contextmanager
+    def _mutex(self):
+        os.makedirs(os.path.dirname(self._mutex_file), exist_ok=True)
+        fd = os.open(self._mutex_file, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # closing the file releases the flock.
+            os.close(fd)
+
+    def acquire(self) -> bool:
+        with self._mutex():
+            return self._acquire()
+
+    def release(self) -> bool:
+        if not self._acquired:
+            return False
+        with self._mutex():
+            return super().release()
+
+
 class StorageGoTasksImpl(GoTasks):
 
     def __init__(self, storage: Storage, logger: LoggerItf):
         self._storage = storage
         self._logger = logger
+        self._saved_hashes = SavedHashes()
 
     def save_task(self, *tasks: GoTaskStruct) -> None:
+        contents = {}
+        hashes = {}
         for task in tasks:
+            content_hash = task.content_hash()
+            if not self._saved_hashes.changed(task.task_id, content_hash):
+                continue
+            hashes[task.task_id] = content_hash
             filename = self._get_task_filename(task.task_id)
             data = task.model_dump(exclude_defaults=True)
             content = yaml.safe_dump(data)
             task.updated = timestamp()
-            self._storage.put(filename, content.encode('utf-8'))
+            contents[filename] = content.encode('utf-8')
+        if contents:
+            self._storage.put_many(contents)
+        for task_id, content_hash in hashes.items():
+            self._saved_hashes.remember(task_id, content_hash)
 
     @staticmethod
     def _get_task_filename(task_id: str) -> str:
@@ -101,8 +158,15 @@ class StorageGoTasksImpl(GoTasks):
         content = self._storage.get(filename)
         data = yaml.safe_load(content)
         task = GoTaskStruct(**data)
+        self._saved_hashes.remember(task_id, task.content_hash())
         return task
 
+    def save_stats(self) -> Dict[str, int]:
+        """
+        the number of the written tasks, and the skipped ones which are not changed.
+        """
+        return self._saved_hashes.stats()
+
     def exists(self, task_id: str) -> bool:
         filename = self._get_task_filename(task_id)
         return self._storage.exists(filename)
@@ -122,7 +186,14 @@ class StorageGoTasksImpl(GoTasks):
         for task in self.get_tasks(task_ids, states):
             yield TaskBrief.from_task(task)
 
+    @contextmanager
+    def transaction(self):
+        with self._storage.batch():
+            yield
+
     def lock_task(self, task_id: str, overdue: float = 30, force: bool = False) -> TaskLocker:
+        if fcntl is not None and isinstance(self._storage, FileStorageImpl):
+            return FileTaskLocker(self._storage, task_id, overdue, force)
         return SimpleStorageLocker(self._storage, task_id, overdue, force)
 
 
@@ -1,7 +1,9 @@
-from typing import Optional, Type
+from typing import Optional, Type, Tuple, Dict
+from contextlib import contextmanager
 from ghostos.core.runtime import GoThreadInfo, GoThreads, ThreadHistory
 from ghostos.contracts.workspace import Workspace
 from ghostos.contracts.storage import Storage
+from ghostos.framework.storage.saved_hashes import SavedHashes
 from ghostos.contracts.logger import LoggerItf
 from ghostos_common.helpers import yaml_pretty_dump
 from ghostos_container import Provider, Container
@@ -22,6 +24,7 @@ class GoThreadsByStorage(GoThreads):
         self._storage = storage
         self._logger = logger
         self._allow_saving_file = allow_saving_file
+        self._saved_hashes = SavedHashes()
 
     def get_thread(self, thread_id: str, create: bool = False) -> Optional[GoThreadInfo]:
         path = self._get_thread_filename(thread_id)
@@ -34,14 +37,43 @@ class GoThreadsByStorage(GoThreads):
         content = self._storage.get(path)
         data = yaml.safe_load(content)
         thread = GoThreadInfo(**data)
+        self._saved_hashes.remember(thread_id, thread.content_hash())
         return thread
 
     def save_thread(self, thread: GoThreadInfo) -> None:
+        self.save_threads(thread)
+
+    def save_threads(self, *threads: GoThreadInfo) -> None:
+        contents = {}
+        hashes = {}
+        for thread in threads:
+            content_hash = thread.content_hash()
+            if not self._saved_hashes.changed(thread.id, content_hash):
+                continue
+            path, saving = self._dump_thread(thread)
+            contents[path] = saving
+            hashes[thread.id] = content_hash
+        if contents:
+            self._storage.put_many(contents)
+        for thread_id, content_hash in hashes.items():
+            self._saved_hashes.remember(thread_id, content_hash)
+
+    @contextmanager
+    def transaction(self):
+        with self._storage.batch():
+            yield
+
+    def save_stats(self) -> Dict[str, int]:
+        """
+        the number of the written threads, and the skipped ones which are not changed.
+        """
+        return self._saved_hashes.stats()
+
+    def _dump_thread(self, thread: GoThreadInfo) -> Tuple[str, bytes]:
         data = thread.model_dump(exclude_defaults=True)
         data_content = yaml_pretty_dump(data)
         path = self._get_thread_filename(thread.id)
-        saving = data_content.encode('utf-8')
-        self._storage.put(path, saving)
+        return path, data_content.encode('utf-8')
 
     @staticmethod
     def _get_thread_filename(thread_id: str) -> str:
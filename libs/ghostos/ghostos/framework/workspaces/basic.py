@@ -1,7 +1,7 @@
 from typing import Optional, Type
 
 from ghostos.contracts.workspace import Workspace
-from ghostos.framework.storage import FileStorage, FileStorageImpl
+from ghostos.framework.storage import FileStorage, FileStorageImpl, FileStorageConf
 from ghostos_container import Provider, Container, INSTANCE
 
 
@@ -46,13 +46,16 @@ class BasicWorkspaceProvider(Provider):
             runtime_path: str = "runtime",
             configs_path="configs",
             assets_path: str = "assets",
+            storage_conf: Optional[FileStorageConf] = None,
     ):
         """
         :param workspace_dir: relative workspace dir to the root path
         :param runtime_path: relative runtime path to the workspace dir
         :param configs_path: relative configs path to the workspace dir
+        :param storage_conf: atomic write, fsync and compression options of the workspace storage
         """
         self._root_path = workspace_dir
+        self._storage_conf = storage_conf
         self._runtime_path = runtime_path
         self._configs_path = configs_path
         self._assets_path = assets_path
@@ -64,7 +67,7 @@ class BasicWorkspaceProvider(Provider):
         return Workspace
 
     def factory(self, con: Container) -> Optional[INSTANCE]:
-        root_storage = FileStorageImpl(self._root_path)
+        root_storage = FileStorageImpl(self._root_path, self._storage_conf)
         return BasicWorkspace(
             root_storage,
             runtime_path=self._runtime_path,
@@ -11,7 +11,7 @@ from ghostos.abcd import (
     MossAction, MOSS_INTRODUCTION, get_moss_context_pom,
 )
 from ghostos.core.runtime import Event, GoThreadInfo
-from ghostos_moss import MossCompiler, MossRuntime
+from ghostos_moss import MossCompiler, MossRuntime, MossRuntimePool
 from ghostos_common.entity import ModelEntity
 from ghostos.core.messages import Role
 from ghostos.core.llms import (
@@ -280,6 +280,11 @@ class MossAgentDriver(GhostDriver[MossAgent]):
         injections = fn(self.ghost, session)
         if injections:
             compiler = compiler.injects(**injections)
+
+        # reuse the warm runtime of this agent.
+        pool = session.container.get(MossRuntimePool)
+        if pool is not None:
+            compiler = compiler.with_runtime_pool(pool, self.ghost.__identifier__().id)
         return compiler
 
     def get_pycontext(self, session: Session) -> SessionPyContext:
@@ -18,7 +18,7 @@ from ghostos.abcd import (
     OpThought,
 )
 from ghostos.core.runtime import Event, GoThreadInfo
-from ghostos_moss import MossCompiler, PyContext, MossRuntime, PromptAbleClass
+from ghostos_moss import MossCompiler, PyContext, MossRuntime, PromptAbleClass, MossRuntimePool
 from ghostos.core.messages import Role
 from ghostos.core.llms import (
     PromptPipe, AssistantNamePipe, run_prompt_pipeline, ModelConf,
@@ -328,6 +328,11 @@ providing llm connections, body shell, tools, memory etc and specially the `MOSS
         injections = self.moss_injections(session)
         if injections:
             compiler = compiler.injects(**injections)
+
+        # reuse the warm runtime of this ghost.
+        pool = session.container.get(MossRuntimePool)
+        if pool is not None:
+            compiler = compiler.with_runtime_pool(pool, self.agent.__identifier__().id)
         return compiler
 
     def get_system_instruction(self, session: Session) -> str:
@@ -1,5 +1,18 @@
+from typing import TYPE_CHECKING
+
 # for other scripts.
-from ghostos.scripts.cli.run_streamlit_app import (
-    start_streamlit_app_by_ghost,
-    start_streamlit_app_by_ghost_info,
-)
+if TYPE_CHECKING:
+    from ghostos.scripts.cli.run_streamlit_app import (
+        start_streamlit_app_by_ghost,
+        start_streamlit_app_by_ghost_info,
+    )
+
+__all__ = ['start_streamlit_app_by_ghost', 'start_streamlit_app_by_ghost_info']
+
+
+def __getattr__(name: str):
+    # streamlit is loaded only when the scripts are used, not by the cli entry point.
+    if name in __all__:
+        from ghostos.scripts.cli import run_streamlit_app
+        return getattr(run_streamlit_app, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,16 +13,84 @@ from rich.panel import Panel
 from rich.prompt import Prompt
 
 
-@click.group()
+_FORWARD_ARGV = "ghostos.forward_argv"
+
+
+class _MainGroup(click.Group):
+    """
+    keep the arguments of the invoked subcommand, which click clears before the group callback.
+    """
+
+    def parse_args(self, ctx: click.Context, args: list) -> list:
+        rest = super().parse_args(ctx, args)
+        protected = getattr(ctx, "_protected_args", None)
+        if protected is None:
+            # click < 8.2
+            protected = ctx.protected_args
+        ctx.meta[_FORWARD_ARGV] = [*protected, *ctx.args]
+        return rest
+
+
+@click.group(cls=_MainGroup)
 @click.version_option(prog_name="ghostos")
-def main():
+@click.pass_context
+def main(ctx: click.Context):
     """GhostOS command line interface"""
-    from importlib.metadata import version
+    from ghostos.scripts.cli.daemon import DAEMON_COMMANDS, forward_command
+    if ctx.invoked_subcommand in DAEMON_COMMANDS:
+        # run by the warm daemon if it is running.
+        code = forward_command(ctx.meta.get(_FORWARD_ARGV, []))
+        if code is not None:
+            ctx.exit(code)
+
+
+@main.group("daemon")
+def daemon_group():
+    """
+    local daemon which keeps ghostos warm for the cli commands
+    """
+    pass
+
+
+@daemon_group.command("start")
+@click.option("--socket", "socket_path", default="", help="unix socket path, default in the workspace runtime dir")
+def start_daemon(socket_path: str):
+    """
+    start the daemon in the foreground
+    """
+    from ghostos.scripts.cli.daemon import DaemonServer
+    server = DaemonServer(socket_path or None)
+    console = Console()
+    console.print(f"ghostos daemon serving at {server.socket_path}")
     try:
-        version = version("ghostos")
-    except ImportError:
-        version = "unknown"
-    click.version_option(version=version, prog_name="ghostos")(main)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+@daemon_group.command("stop")
+@click.option("--socket", "socket_path", default="", help="unix socket path, default in the workspace runtime dir")
+def stop_daemon(socket_path: str):
+    """
+    stop the running daemon
+    """
+    from ghostos.scripts.cli.daemon import request_daemon
+    result = request_daemon({"command": "stop"}, socket_path or None)
+    Console().print("ghostos daemon stopped" if result else "ghostos daemon is not running")
+
+
+@daemon_group.command("status")
+@click.option("--socket", "socket_path", default="", help="unix socket path, default in the workspace runtime dir")
+def daemon_status(socket_path: str):
+    """
+    show the status of the daemon
+    """
+    from ghostos.scripts.cli.daemon import request_daemon
+    result = request_daemon({"command": "status"}, socket_path or None)
+    if result is None:
+        Console().print("ghostos daemon is not running")
+    else:
+        Console().print(result)
 
 
 @main.command("thread")
@@ -266,6 +334,10 @@ def dump_moss_context(python_file_or_module: str):
 
     else:
         # consider it a module
+        if python_file_or_module in sys.modules:
+            # the module imported before by the daemon, reload it if the user edited it.
+            from ghostos.contracts.modules import Modules
+            container.force_fetch(Modules).reload(python_file_or_module)
         compiled = compiler.compile(python_file_or_module)
 
     with compiled:
@@ -328,6 +400,40 @@ def dump_moss_context(python_file_or_module: str):
         )
 
 
+@main.command("profile-container")
+@click.option(
+    "--bootstrap", "-b", default="", show_default=True,
+    help="load a python module for bootstrap",
+)
+@click.option(
+    "--maker", "-m", default="", show_default=True,
+    help="import path of the app container maker, default is ghostos.bootstrap:bootstrap",
+)
+@click.option(
+    "--contract", "-c", multiple=True,
+    help="import path of the contract to fetch, default are all the bound contracts",
+)
+@click.option("--min-ms", default=0.0, show_default=True, help="hide the builds faster than it")
+@click.option("--dot", default="", show_default=True, help="save the dependency graph to the DOT file")
+def profile_container(bootstrap: str, maker: str, contract: tuple, min_ms: float, dot: str):
+    """
+    profile the construction of the application container providers
+    """
+    from ghostos.scripts.cli.run_profile_container import profile_app_container
+    if bootstrap:
+        importlib.import_module(bootstrap)
+
+    profiler, errors = profile_app_container(maker, contract)
+    console = Console()
+    console.print(profiler.flame_table(min_ms=min_ms), markup=False, highlight=False)
+    for target, error in errors:
+        console.print(f"failed to fetch {target}: {error!r}", style="red", markup=False)
+    if dot:
+        with open(dot, "w") as f:
+            f.write(profiler.dot())
+        console.print(f"dependency graph saved to {dot}")
+
+
 @main.command("help")
 def ghostos_help():
     """Print this help message."""
@@ -0,0 +1,263 @@
+"""
+optional local daemon of the ghostos cli.
+the daemon keeps the bootstrapped application container, the llm clients and the compiled moss modules warm,
+the cli forwards the commands to it through a unix socket and streams the output back.
+
+only the non-interactive commands are served by the daemon,
+the interactive ones (console, tinker) and the ones starting streamlit still run in the cli process.
+"""
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from hashlib import md5
+from os.path import join, exists
+from typing import Optional, List, Dict, IO
+
+__all__ = [
+    'DAEMON_COMMANDS',
+    'DaemonServer',
+    'default_socket_path',
+    'forward_command',
+    'request_daemon',
+]
+
+DAEMON_COMMANDS = {"moss", "docs"}
+"""
+the cli commands which can be served by the daemon.
+profile-container is not one of them, it profiles the construction of a fresh container by design.
+"""
+
+SOCKET_PATH_ENV = "GHOSTOS_DAEMON_SOCKET"
+NO_DAEMON_ENV = "GHOSTOS_NO_DAEMON"
+
+_serving = False
+"""the commands run by the daemon itself are never forwarded"""
+
+
+def default_socket_path() -> str:
+    if path := os.environ.get(SOCKET_PATH_ENV, ""):
+        return path
+    from ghostos.bootstrap import get_bootstrap_config
+    runtime_dir = get_bootstrap_config(local=True).abs_runtime_dir()
+    path = join(runtime_dir, "ghostos_daemon.sock")
+    # the length of unix socket path is limited.
+    if len(path) > 100:
+        path = join("/tmp", f"ghostos_daemon_{md5(runtime_dir.encode()).hexdigest()[:12]}.sock")
+    return path
+
+
+def _connect(socket_path: str, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    if not hasattr(socket, "AF_UNIX") or not exists(socket_path):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(socket_path)
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+def _send(conn: socket.socket, data: Dict) -> None:
+    conn.sendall(json.dumps(data).encode("utf-8") + b"\n")
+
+
+def request_daemon(request: Dict, socket_path: Optional[str] = None) -> Optional[Dict]:
+    """
+    send a control request (status, stop) to the daemon.
+    :return: None if the daemon is not running.
+    """
+    conn = _connect(socket_path or default_socket_path(), timeout=5)
+    if conn is None:
+        return None
+    with conn:
+        _send(conn, request)
+        line = conn.makefile("rb").readline()
+    return json.loads(line) if line else None
+
+
+def forward_command(
+        argv: List[str],
+        socket_path: Optional[str] = None,
+        stdout: Optional[IO] = None,
+        stderr: Optional[IO] = None,
+) -> Optional[int]:
+    """
+    run the cli command by the daemon and stream the output.
+    :return: exit code of the command, or None if the daemon is not available.
+    """
+    if _serving or os.environ.get(NO_DAEMON_ENV, ""):
+        return None
+    conn = _connect(socket_path or default_socket_path())
+    if conn is None:
+        return None
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    with conn:
+        _send(conn, {"command": "run", "argv": argv, "cwd": os.getcwd()})
+        for line in conn.makefile("rb"):
+            item = json.loads(line)
+            if "exit" in item:
+                return item["exit"]
+            output = stderr if item.get("stream") == "stderr" else stdout
+            output.write(item.get("data", ""))
+            output.flush()
+    stderr.write("ghostos daemon closed the connection unexpectedly\n")
+    return 1
+
+
+class _StreamWriter(io.TextIOBase):
+    """
+    redirect stdout or stderr of the command to the client.
+    """
+
+    def __init__(self, conn: socket.socket, stream: str, lock: threading.Lock):
+        self._conn = conn
+        self._stream = stream
+        self._lock = lock
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, s: str) -> int:
+        if s:
+            with self._lock:
+                _send(self._conn, {"stream": self._stream, "data": s})
+        return len(s)
+
+
+class DaemonServer:
+    """
+    serve the cli commands by a local unix socket. the commands run one by one in the daemon process,
+    since they share stdout, stderr and the working directory.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, warmup: bool = True):
+        self.socket_path = socket_path or default_socket_path()
+        self._warmup = warmup
+        self._sock: Optional[socket.socket] = None
+        self._stopped = threading.Event()
+        self._run_lock = threading.Lock()
+        self._started_at = 0.0
+        self._served = 0
+
+    def serve_forever(self) -> None:
+        global _serving
+        if _connect(self.socket_path) is not None:
+            raise RuntimeError(f"ghostos daemon is already running at {self.socket_path}")
+        if exists(self.socket_path):
+            # stale socket file of a dead daemon.
+            os.unlink(self.socket_path)
+
+        _serving = True
+        if self._warmup:
+            from ghostos.bootstrap import get_container
+            get_container()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # local only, and only for the current user since the socket file is created.
+        umask = os.umask(0o177)
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, 0o600)
+        sock.listen(8)
+        sock.settimeout(0.5)
+        self._sock = sock
+        self._started_at = time.time()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            sock.close()
+            self._sock = None
+            if exists(self.socket_path):
+                os.unlink(self.socket_path)
+            _serving = False
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            try:
+                line = conn.makefile("rb").readline()
+                if not line:
+                    return
+                request = json.loads(line)
+                command = request.get("command", "")
+                if command == "status":
+                    _send(conn, {
+                        "pid": os.getpid(),
+                        "socket": self.socket_path,
+                        "uptime": time.time() - self._started_at,
+                        "served": self._served,
+                    })
+                elif command == "stop":
+                    _send(conn, {"stopped": True})
+                    self.stop()
+                elif command == "run":
+                    code = self._run(conn, request.get("argv", []), request.get("cwd", ""))
+                    _send(conn, {"exit": code})
+                else:
+                    _send(conn, {"error": f"unknown command {command!r}"})
+            except (OSError, ValueError):
+                # the client is gone or sent a broken request.
+                pass
+
+    def _run(self, conn: socket.socket, argv: List[str], cwd: str) -> int:
+        import click
+        from ghostos.scripts.cli import main
+
+        send_lock = threading.Lock()
+        stdout = _StreamWriter(conn, "stdout", send_lock)
+        stderr = _StreamWriter(conn, "stderr", send_lock)
+        if not argv or argv[0] not in DAEMON_COMMANDS:
+            stderr.write(f"command {argv[:1]} is not served by ghostos daemon\n")
+            return 2
+
+        with self._run_lock:
+            self._served += 1
+            origin_cwd = os.getcwd()
+            origin_stdout, origin_stderr = sys.stdout, sys.stderr
+            sys.stdout, sys.stderr = stdout, stderr
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                main.main(args=argv, prog_name="ghostos", standalone_mode=False)
+                return 0
+            except click.exceptions.Exit as e:
+                return e.exit_code
+            except click.ClickException as e:
+                e.show(file=stderr)
+                return e.exit_code
+            except click.Abort:
+                stderr.write("Aborted!\n")
+                return 1
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 1
+            except Exception:
+                stderr.write(traceback.format_exc())
+                return 1
+            finally:
+                sys.stdout, sys.stderr = origin_stdout, origin_stderr
+                os.chdir(origin_cwd)
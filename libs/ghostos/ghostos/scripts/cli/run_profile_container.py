@@ -0,0 +1,36 @@
+from typing import List, Tuple, Iterable
+
+from ghostos_container import Container, ContainerProfiler
+
+
+def profile_app_container(
+        maker: str = "",
+        contracts: Iterable[str] = (),
+) -> Tuple[ContainerProfiler, List[Tuple[str, Exception]]]:
+    """
+    bootstrap the application container and fetch the contracts with the profiler installed.
+    :param maker: import path of the app container maker, default is `ghostos.bootstrap:bootstrap`
+    :param contracts: import paths of the contracts to fetch, default are all the bound contracts.
+    :return: the profiler, and the contracts failed to fetch.
+    """
+    from ghostos_common.helpers import import_from_path
+    from ghostos.bootstrap import bootstrap
+
+    errors = []
+    with ContainerProfiler() as profiler:
+        if maker:
+            container: Container = import_from_path(maker)()
+            container.bootstrap()
+        else:
+            container = bootstrap()
+
+        if contracts:
+            targets = [import_from_path(contract) for contract in contracts]
+        else:
+            targets = list(container.contracts())
+        for target in targets:
+            try:
+                container.get(target)
+            except Exception as e:
+                errors.append((str(target), e))
+    return profiler, errors
@@ -1,6 +1,11 @@
+from enum import Enum
 from ghostos.abcd import MossAction
 
 
+class Color(str, Enum):
+    red = "red"
+
+
 def test_moss_action_unmarshal_code():
     bad_case = """```python
 def run(moss: Moss):
@@ -10,3 +15,56 @@ def run(moss: Moss):
 
     value = MossAction.unmarshal_code(bad_case)
     assert not value.startswith("```")
+
+
+def test_moss_action_rebind_pycontext():
+    from types import SimpleNamespace
+    from ghostos.abcd import SessionPyContext
+
+    bound = SessionPyContext()
+    bound.set_prop("foo", 1)
+    session = SimpleNamespace(state={SessionPyContext.__name__: bound})
+
+    # nothing changed, the bound pycontext is kept.
+    executed = bound.fork()
+    executed.execute_code = "print(1)"
+    executed.set_prop("foo", 1)
+    MossAction._rebind_pycontext(session, executed)
+    assert session.state[SessionPyContext.__name__] is bound
+    assert bound.execute_code == "print(1)"
+
+    executed = bound.fork()
+    executed.set_prop("foo", 2)
+    MossAction._rebind_pycontext(session, executed)
+    rebound = session.state[SessionPyContext.__name__]
+    assert rebound is not bound
+    assert rebound.get_prop("foo") == 2
+
+
+def test_moss_action_enum_pycontext_property():
+    import base64
+    import json
+    import pickle
+    from types import SimpleNamespace
+    from ghostos.abcd import SessionPyContext
+
+    session = SimpleNamespace(state={})
+    executed = SessionPyContext()
+    executed.set_prop("color", Color.red)
+    executed.set_prop("colors", {"first": Color.red})
+    MossAction._rebind_pycontext(session, executed)
+
+    bound = session.state[SessionPyContext.__name__]
+    data = json.loads(bound.model_dump_json())
+    assert data["properties"]["color"] == {
+        "type": "pickle",
+        "content": base64.b64encode(pickle.dumps(Color.red)).decode(),
+    }
+    assert data["properties"]["colors"] == {
+        "type": "pickle",
+        "content": base64.b64encode(pickle.dumps({"first": Color.red})).decode(),
+    }
+    # loaded back as the enum, not the plain string.
+    restored = SessionPyContext(**data)
+    assert restored.get_prop("color") is Color.red
+    assert restored.get_prop("colors")["first"] is Color.red
@@ -16,3 +16,43 @@ def test_default_pool():
     pool.submit(foo.go)
     pool.shutdown()
     assert foo.count == 4
+
+
+def test_bounded_pool_backpressure():
+    import pytest
+    from threading import Event
+    from ghostos.contracts.pool import BoundedPool, PoolFullError
+
+    pool = BoundedPool(2, max_pending=1, queue_timeout=0)
+    release = Event()
+    futures = [pool.submit(release.wait) for _ in range(3)]
+    with pytest.raises(PoolFullError):
+        pool.submit(release.wait)
+    stats = pool.stats()
+    assert stats.submitted == 3
+    assert stats.rejected == 1
+    assert stats.running + stats.pending == 3
+
+    release.set()
+    for f in futures:
+        f.result()
+    pool.shutdown()
+    stats = pool.stats()
+    assert stats.running == 0
+    assert stats.pending == 0
+    assert stats.started == 3
+    assert stats.max_wait >= stats.avg_wait() >= 0
+
+
+def test_bounded_pool_blocks_for_slot():
+    import time
+    from ghostos.contracts.pool import BoundedPool
+
+    pool = BoundedPool(1, queue_timeout=5)
+    pool.submit(time.sleep, 0.1)
+    # blocks until the first one is done.
+    pool.submit(time.sleep, 0)
+    pool.shutdown()
+    stats = pool.stats()
+    assert stats.started == 2
+    assert stats.rejected == 0
@@ -0,0 +1,83 @@
+import time
+from typing import Optional, Tuple, Any
+
+from ghostos_container import Container
+from ghostos.core.aifunc import (
+    AIFunc, AIFuncResult, AIFuncDriver, AIFuncCache, AIFuncCacheConf,
+    AIFuncCacheImpl, DefaultAIFuncExecutorImpl, ExecFrame, ExecStep,
+)
+from ghostos.core.runtime import GoThreadInfo, EventTypes
+from ghostos.framework.storage import MemStorage
+
+
+class CountDriver(AIFuncDriver):
+    calls = 0
+
+    def initialize(self, container: Container, frame: ExecFrame) -> GoThreadInfo:
+        return GoThreadInfo.new(event=EventTypes.ROTATE.new(task_id="", from_task_id="", messages=[]))
+
+    def think(self, manager, thread: GoThreadInfo, step: ExecStep, upstream) -> Tuple[GoThreadInfo, Optional[Any], bool]:
+        CountDriver.calls += 1
+        return thread, SquareResult(value=self.aifunc.x * self.aifunc.x), True
+
+    def on_save(self, container: Container, frame: ExecFrame, step: ExecStep, thread: GoThreadInfo) -> None:
+        pass
+
+
+class SquareResult(AIFuncResult):
+    value: int
+
+
+class Square(AIFunc):
+    x: int
+    __aifunc_result__ = SquareResult
+    __aifunc_driver__ = CountDriver
+    __aifunc_cache__ = AIFuncCacheConf(ttl=60)
+
+
+class NoCacheSquare(Square):
+    __aifunc_cache__ = None
+
+
+def test_aifunc_cache_tiers():
+    storage = MemStorage()
+    cache = AIFuncCacheImpl(storage)
+    assert cache.get(Square(x=2)) is None
+    cache.set(Square(x=2), SquareResult(value=4))
+    assert cache.get(Square(x=2)).value == 4
+    assert cache.get(Square(x=3)) is None
+
+    # a new process only has the disk tier.
+    other = AIFuncCacheImpl(storage)
+    assert other.get(Square(x=2)).value == 4
+
+    cache.set(NoCacheSquare(x=2), SquareResult(value=4))
+    assert cache.get(NoCacheSquare(x=2)) is None
+
+
+class ShortSquare(Square):
+    __aifunc_cache__ = AIFuncCacheConf(ttl=0.01)
+
+
+def test_aifunc_cache_expired():
+    storage = MemStorage()
+    cache = AIFuncCacheImpl(storage)
+    cache.set(ShortSquare(x=2), SquareResult(value=4))
+    assert cache.get(ShortSquare(x=2)) is not None
+    time.sleep(0.02)
+    assert cache.get(ShortSquare(x=2)) is None
+    assert AIFuncCacheImpl(storage).get(ShortSquare(x=2)) is None
+
+
+def test_executor_use_aifunc_cache():
+    container = Container()
+    container.set(AIFuncCache, AIFuncCacheImpl())
+    executor = DefaultAIFuncExecutorImpl(container=container)
+    CountDriver.calls = 0
+    assert executor.execute(Square(x=3)).value == 9
+    assert executor.execute(Square(x=3)).value == 9
+    assert CountDriver.calls == 1
+    assert executor.execute(NoCacheSquare(x=3)).value == 9
+    assert executor.execute(NoCacheSquare(x=3)).value == 9
+    assert CountDriver.calls == 3
+    executor.destroy()
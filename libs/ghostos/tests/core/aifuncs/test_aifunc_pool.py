@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+from ghostos_container import Container
+from ghostos.core.aifunc import AIFunc, AIFuncResult, DefaultAIFuncExecutorImpl
+from ghostos.core.aifunc.pool import AIFuncPool
+
+
+class Add(AIFunc):
+    a: int
+    b: int = 0
+
+
+class AddResult(AIFuncResult):
+    value: int
+
+
+class FakeExecutor(DefaultAIFuncExecutorImpl):
+    """
+    add the numbers instead of thinking by llm, and fan out to test the nested calls.
+    """
+
+    threads = set()
+    max_threads = 0
+    lock = threading.Lock()
+
+    def _run(self, key: str, fn: Add, scope) -> AddResult:
+        ident = threading.get_ident()
+        with self.lock:
+            outer = ident not in FakeExecutor.threads
+            FakeExecutor.threads.add(ident)
+            FakeExecutor.max_threads = max(FakeExecutor.max_threads, len(FakeExecutor.threads))
+        try:
+            time.sleep(0.01)
+            if fn.b > 0:
+                # nested fan out.
+                sub = FakeExecutor(container=self.container(), pool=self.pool())
+                results = sub.parallel_run({str(i): Add(a=1) for i in range(fn.b)})
+                value = fn.a + sum(r.value for r in results.values())
+            else:
+                value = fn.a
+            result = AddResult(value=value)
+            self._values[key] = result
+            return result
+        finally:
+            if outer:
+                with self.lock:
+                    FakeExecutor.threads.discard(ident)
+
+
+def test_aifunc_pool_caller_runs_when_saturated():
+    pool = AIFuncPool(1)
+    release = threading.Event()
+    first = pool.submit(release.wait)
+    # no idle worker, the job runs on the caller thread.
+    caller = pool.submit(threading.get_ident)
+    assert caller.future.result() == threading.get_ident()
+    assert pool.inline_runs == 1
+    release.set()
+    first.future.result()
+    pool.shutdown()
+
+
+def test_run_graph_nested_and_bounded():
+    executor = FakeExecutor(container=Container(), max_workers=2)
+    results = executor.run_graph({
+        "x": Add(a=1, b=3),
+        "y": Add(a=2, b=3),
+        "sum": lambda x, y: Add(a=x.value + y.value),
+        "double": lambda sum: Add(a=sum.value * 2),
+    })
+    assert results["x"].value == 4
+    assert results["y"].value == 5
+    assert results["sum"].value == 9
+    assert results["double"].value == 18
+    assert executor.get("double").value == 18
+    # the pool workers plus the caller thread.
+    assert FakeExecutor.max_threads <= 3
+
+    with pytest.raises(KeyError):
+        executor.run_graph({"a": lambda b: Add(a=b.value)})
+    with pytest.raises(RuntimeError):
+        executor.run_graph({"a": lambda b: Add(a=1), "b": lambda a: Add(a=1)})
+    executor.destroy()
@@ -0,0 +1,155 @@
+from typing import Iterable, List, Optional, Tuple, Any
+
+import pytest
+from ghostos_container import Container
+from ghostos.core.aifunc import (
+    AIFunc, AIFuncResult, AIFuncDriver, AIFuncCancelledError,
+    DefaultAIFuncDriverImpl, DefaultAIFuncExecutorImpl, ExecFrame, ExecStep,
+)
+from ghostos.core.llms import Prompt
+from ghostos.core.messages import Message, Stream
+from ghostos.core.messages.pipeline import SequencePipe, run_pipeline
+from ghostos.core.runtime import GoThreadInfo, EventTypes
+
+
+class FakeStream(Stream):
+
+    def __init__(self, alive: bool = True):
+        self.delivered: List[Message] = []
+        self._alive = alive
+
+    def deliver(self, message: Message) -> bool:
+        self.delivered.append(message)
+        return True
+
+    def send(self, messages: Iterable[Message]) -> bool:
+        for item in messages:
+            self.deliver(item)
+        return True
+
+    def completes_only(self) -> bool:
+        return False
+
+    def alive(self) -> bool:
+        return self._alive
+
+    def close(self):
+        self._alive = False
+
+    def fail(self, error: str) -> bool:
+        return False
+
+    def error(self) -> Optional[Message]:
+        return None
+
+    def closed(self) -> bool:
+        return not self._alive
+
+
+class FakeLLMApi:
+
+    def __init__(self, contents: List[str]):
+        self.contents = contents
+        self.sent = 0
+        self.closed = False
+
+    def deliver_chat_completion(self, prompt: Prompt, stream: bool) -> Iterable[Message]:
+        def chunks():
+            try:
+                for content in self.contents:
+                    self.sent += 1
+                    yield Message.new_chunk(content=content)
+            finally:
+                self.closed = True
+
+        return run_pipeline([SequencePipe()], chunks())
+
+
+class Echo(AIFunc):
+    text: str = ""
+
+
+class EchoResult(AIFuncResult):
+    text: str = ""
+
+
+def test_stream_generation_forward_chunks():
+    upstream = FakeStream()
+    executor = DefaultAIFuncExecutorImpl(container=Container())
+    driver = DefaultAIFuncDriverImpl(Echo())
+    step = ExecFrame.from_func(Echo()).new_step()
+    generated = driver.stream_generation(executor, FakeLLMApi(["<code>", "pass", "</code>"]), Prompt(), step, upstream)
+    assert len(generated) == 1
+    assert generated[0].content == "<code>pass</code>"
+    # head, chunks and the tail.
+    assert len(upstream.delivered) == 4
+    assert upstream.delivered[-1].is_complete()
+    assert not upstream.delivered[0].is_complete()
+
+
+def test_stream_generation_stop_when_cancelled():
+    executor = DefaultAIFuncExecutorImpl(container=Container())
+    driver = DefaultAIFuncDriverImpl(Echo())
+    step = ExecFrame.from_func(Echo()).new_step()
+    llm_api = FakeLLMApi(["a"] * 10)
+
+    class CancelAfterFirst(FakeStream):
+        def deliver(self, message: Message) -> bool:
+            executor.cancel()
+            return super().deliver(message)
+
+    upstream = CancelAfterFirst()
+    with pytest.raises(AIFuncCancelledError):
+        driver.stream_generation(executor, llm_api, Prompt(), step, upstream)
+    assert llm_api.closed
+    assert llm_api.sent < 10
+
+    # closed upstream means nobody needs the result.
+    executor = DefaultAIFuncExecutorImpl(container=Container())
+    with pytest.raises(AIFuncCancelledError):
+        driver.stream_generation(executor, FakeLLMApi(["a"]), Prompt(), step, FakeStream(alive=False))
+    assert executor.is_cancelled()
+
+
+class LoopDriver(AIFuncDriver):
+    """
+    never finish until cancelled.
+    """
+
+    def initialize(self, container: Container, frame: ExecFrame) -> GoThreadInfo:
+        return GoThreadInfo.new(event=EventTypes.ROTATE.new(task_id="", from_task_id="", messages=[]))
+
+    def think(self, manager, thread: GoThreadInfo, step: ExecStep, upstream) -> Tuple[GoThreadInfo, Optional[Any], bool]:
+        if self.aifunc.text == "fail":
+            raise ValueError("fail")
+        return thread, None, False
+
+    def on_save(self, container: Container, frame: ExecFrame, step: ExecStep, thread: GoThreadInfo) -> None:
+        pass
+
+
+class Loop(AIFunc):
+    text: str = ""
+    __aifunc_result__ = EchoResult
+    __aifunc_driver__ = LoopDriver
+
+
+def test_cancel_sub_executors():
+    executor = DefaultAIFuncExecutorImpl(container=Container(), max_step=0)
+    step = ExecFrame.from_func(Loop()).new_step()
+    sub = executor.sub_executor(step)
+    executor.cancel()
+    assert sub.is_cancelled()
+    with pytest.raises(AIFuncCancelledError):
+        sub.execute(Loop())
+    executor.destroy()
+
+
+def test_run_graph_failure_cancels_others():
+    executor = DefaultAIFuncExecutorImpl(container=Container(), max_step=0, max_workers=2)
+    with pytest.raises(ValueError):
+        # the looping one is cancelled once the other fails.
+        executor.run_graph({"loop": Loop(), "fail": Loop(text="fail")})
+    executor.pool().shutdown(wait=True)
+    assert not executor.is_cancelled()
+    executor.destroy()
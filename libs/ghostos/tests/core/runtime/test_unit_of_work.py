@@ -0,0 +1,94 @@
+from typing import Dict
+
+from ghostos.core.runtime import UnitOfWork, GoTaskStruct, GoThreadInfo, EventTypes
+from ghostos.framework.storage import MemStorage
+from ghostos.framework.tasks.storage_tasks import StorageGoTasksImpl
+from ghostos.framework.threads.storage_threads import GoThreadsByStorage
+from ghostos.framework.eventbuses import FairEventBusImpl
+from ghostos.framework.logger import FakeLogger
+from ghostos_common.entity import EntityMeta
+
+
+class CountingStorage(MemStorage):
+    puts = 0
+    batches = 0
+
+    def put(self, file_path: str, content: bytes) -> None:
+        CountingStorage.puts += 1
+        super().put(file_path, content)
+
+    def put_many(self, contents: Dict[str, bytes]) -> None:
+        CountingStorage.batches += 1
+        super().put_many(contents)
+
+    def sub_storage(self, relative_path: str) -> "CountingStorage":
+        return CountingStorage(self._saved, self._namespace + "/" + relative_path)
+
+
+def test_unit_of_work_flush_in_batches():
+    storage = CountingStorage()
+    tasks = StorageGoTasksImpl(storage.sub_storage("tasks"), FakeLogger())
+    threads = GoThreadsByStorage(storage=storage.sub_storage("threads"), logger=FakeLogger())
+    bus = FairEventBusImpl()
+    uow = UnitOfWork(tasks, threads, bus)
+
+    task = GoTaskStruct.new(
+        task_id="task",
+        shell_id="shell",
+        process_id="process",
+        depth=0,
+        name="task",
+        description="",
+        meta=EntityMeta(type="type", content=""),
+    )
+    child = task.add_child(task_id="child", name="child", description="", meta=task.meta)
+    uow.save_task(task)
+    uow.save_task(child, task)
+    uow.save_thread(GoThreadInfo(id="thread"), GoThreadInfo(id="thread"), GoThreadInfo(id="other"))
+    uow.send_event(EventTypes.CREATED.new(task_id="child", messages=[]), notify=True)
+    assert uow.pending() == 5
+    # nothing is written before flush.
+    assert CountingStorage.batches == 0
+    assert bus.pop_task_notification() is None
+
+    uow.flush()
+    assert uow.pending() == 0
+    assert CountingStorage.batches == 2
+    assert tasks.get_task("child").parent == "task"
+    assert threads.get_thread("other") is not None
+    assert bus.pop_task_notification() == "child"
+
+
+def test_unit_of_work_flush_file_storages_in_one_batch(tmp_path, monkeypatch):
+    from ghostos.framework.storage import filestorage
+    from ghostos.framework.storage import FileStorageImpl, FileStorageConf
+
+    written = []
+    write_files = filestorage._write_files
+
+    def counting_write_files(writes):
+        written.append([w[0] for w in writes])
+        write_files(writes)
+
+    monkeypatch.setattr(filestorage, "_write_files", counting_write_files)
+    storage = FileStorageImpl(str(tmp_path), FileStorageConf(fsync="batch"))
+    tasks = StorageGoTasksImpl(storage.sub_storage("tasks"), FakeLogger())
+    threads = GoThreadsByStorage(storage=storage.sub_storage("threads"), logger=FakeLogger())
+    uow = UnitOfWork(tasks, threads, FairEventBusImpl())
+
+    uow.save_task(GoTaskStruct.new(
+        task_id="task",
+        shell_id="shell",
+        process_id="process",
+        depth=0,
+        name="task",
+        description="",
+        meta=EntityMeta(type="type", content=""),
+    ))
+    uow.save_thread(GoThreadInfo(id="thread"))
+    uow.flush()
+    # the tasks and the threads are written and synced in one pass.
+    assert len(written) == 1
+    assert len(written[0]) == 2
+    assert tasks.get_task("task") is not None
+    assert threads.get_thread("thread") is not None
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from ghostos.framework.eventbuses.fairimpl import FairEventBusImpl
+from ghostos.core.runtime.events import EventTypes
+
+
+def test_fair_impl_dedup_and_round_robin():
+    bus = FairEventBusImpl()
+    chatty = [EventTypes.INPUT.new("chatty", []) for _ in range(3)]
+    for e in chatty:
+        bus.send_event(e, notify=True)
+    quiet = EventTypes.INPUT.new("quiet", [])
+    bus.send_event(quiet, notify=True)
+
+    # notifications of the same task are deduplicated.
+    assert bus.pop_task_notification() == "chatty"
+    assert bus.pop_task_event("chatty") is chatty[0]
+    # the consumer notifies the task again after handling an event, the task goes to the back.
+    bus.notify_task("chatty")
+    assert bus.pop_task_notification() == "quiet"
+    assert bus.pop_task_event("quiet") is quiet
+    assert bus.pop_task_notification() == "chatty"
+    assert bus.pop_task_notification() is None
+
+    stats = bus.task_queue_stats()
+    assert len(stats) == 1
+    assert stats[0].task_id == "chatty"
+    assert stats[0].depth == 2
+    assert not stats[0].notified
+
+    # canceled event is higher priority.
+    cancel = EventTypes.CANCEL.new("chatty", [])
+    bus.send_event(cancel, notify=False)
+    assert bus.pop_task_event("chatty") is cancel
+    bus.clear_task("chatty")
+    assert bus.pop_task_event("chatty") is None
+
+
+def test_fair_impl_blocking_pop():
+    bus = FairEventBusImpl()
+    start = time.time()
+    assert bus.pop_task_notification(timeout=0.05) is None
+    assert time.time() - start >= 0.05
+
+    e = EventTypes.INPUT.new("foo", [])
+    threading.Timer(0.05, bus.send_event, args=(e, True)).start()
+    assert bus.pop_task_notification(timeout=5) == "foo"
+
+    threading.Timer(0.05, bus.shutdown).start()
+    assert bus.pop_task_notification(timeout=None) is None
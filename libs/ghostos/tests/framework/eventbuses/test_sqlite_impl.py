@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from ghostos.framework.eventbuses.sqliteimpl import SQLiteEventBusImpl
+from ghostos.core.runtime.events import EventTypes
+
+
+def test_sqlite_impl_send_pop_ack(tmp_path):
+    filename = str(tmp_path / "eventbus.db")
+    bus = SQLiteEventBusImpl(filename, visibility_timeout=0.1)
+    e = EventTypes.INPUT.new("foo", [])
+    bus.send_event(e, notify=True)
+    bus.notify_task("foo")
+
+    # another worker process on the same database.
+    worker = SQLiteEventBusImpl(filename, visibility_timeout=0.1)
+    assert worker.pop_task_notification() == "foo"
+    assert worker.pop_task_notification() is None
+    popped = worker.pop_task_event("foo")
+    assert popped.event_id == e.event_id
+    # invisible until the visibility timeout.
+    assert bus.pop_task_event("foo") is None
+
+    # the worker crashed, the event is delivered again, and notified only once.
+    time.sleep(0.15)
+    assert bus.pop_task_notification() == "foo"
+    assert bus.pop_task_notification() is None
+    popped = bus.pop_task_event("foo")
+    assert popped.event_id == e.event_id
+    bus.ack_event(popped)
+    time.sleep(0.15)
+    assert bus.pop_task_event("foo") is None
+    assert bus.task_queue_depths() == []
+
+
+def test_sqlite_impl_drop_after_max_attempts(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"), visibility_timeout=0, max_attempts=2)
+    e = EventTypes.INPUT.new("foo", [])
+    bus.send_event(e, notify=False)
+    assert bus.pop_task_event("foo") is not None
+    assert bus.pop_task_event("foo") is not None
+    assert bus.pop_task_event("foo") is None
+
+
+def test_sqlite_impl_transaction_and_priority(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+    e = EventTypes.INPUT.new("foo", [])
+    with pytest.raises(ValueError):
+        with bus.transaction():
+            bus.send_event(e, notify=True)
+            raise ValueError("task save failed")
+    assert bus.pop_task_notification() is None
+    assert bus.pop_task_event("foo") is None
+
+    cancel = EventTypes.CANCEL.new("foo", [])
+    with bus.transaction():
+        bus.send_event(e, notify=True)
+        with bus.transaction():
+            bus.send_event(cancel, notify=True)
+        # not committed yet.
+        assert SQLiteEventBusImpl(str(tmp_path / "eventbus.db")).pop_task_notification() is None
+    assert bus.pop_task_notification() == "foo"
+    assert bus.pop_task_event("foo").event_id == cancel.event_id
+    assert bus.pop_task_event("foo").event_id == e.event_id
+
+    # events of the other process are private.
+    private = bus.with_process_id("process")
+    private.send_event(EventTypes.INPUT.new("bar", []), notify=True)
+    assert bus.pop_task_notification() is None
+    assert private.pop_task_notification() == "bar"
+    private.clear_all()
+    assert private.pop_task_event("bar") is None
+
+
+def test_sqlite_impl_blocking_pop(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+    e = EventTypes.INPUT.new("foo", [])
+    threading.Timer(0.05, bus.send_event, args=(e, True)).start()
+    assert bus.pop_task_notification(timeout=5) == "foo"
+    start = time.time()
+    assert bus.pop_task_notification(timeout=0.1) is None
+    assert time.time() - start >= 0.1
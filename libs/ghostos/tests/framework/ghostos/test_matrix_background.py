@@ -0,0 +1,33 @@
+import time
+
+from ghostos_container import Container
+from ghostos.core.runtime import GoProcess, EventBus, GoTasks
+from ghostos.framework.eventbuses import FairEventBusImpl
+from ghostos.framework.storage import MemStorage
+from ghostos.framework.tasks.storage_tasks import StorageGoTasksImpl
+from ghostos.framework.logger import FakeLogger
+from ghostos.framework.ghostos import MatrixConf, MatrixImpl
+
+
+def test_background_workers_do_not_hold_the_pool():
+    container = Container()
+    container.set(EventBus, FairEventBusImpl())
+    container.set(GoTasks, StorageGoTasksImpl(MemStorage(), FakeLogger()))
+    matrix = MatrixImpl(
+        MatrixConf(pool_size=2, background_idle_time=0.05),
+        container,
+        GoProcess.new(shell_id="test"),
+        [],
+    )
+    try:
+        matrix.background_run(worker=4)
+        time.sleep(0.1)
+        stats = matrix.pool_stats()
+        assert stats.running == 0
+        # the session events still get the whole pool.
+        done = []
+        matrix.submit(done.append, 1)
+        time.sleep(0.1)
+        assert done == [1]
+    finally:
+        matrix.close()
@@ -0,0 +1,197 @@
+import os
+import sys
+import time
+
+import pytest
+
+from ghostos.core.runtime import GoProcess
+from ghostos.framework.ghostos import MatrixConf, ProcessBackgroundRunner, MatrixWorkerSpec
+
+_MAKER = '''
+from ghostos_container import Container
+from ghostos.core.runtime import EventBus, GoTasks
+from ghostos.contracts.logger import get_ghostos_logger
+from ghostos.framework.eventbuses import SQLiteEventBusImpl
+from ghostos.framework.storage import FileStorageImpl
+from ghostos.framework.tasks.storage_tasks import StorageGoTasksImpl
+
+
+def make_container() -> Container:
+    container = Container()
+    container.set(EventBus, SQLiteEventBusImpl({db!r}))
+    container.set(GoTasks, StorageGoTasksImpl(FileStorageImpl({tasks!r}), get_ghostos_logger()))
+    return container
+'''
+
+
+_PING_MAKER = '''
+import os
+from ghostos_container import Container
+from ghostos.abcd import Agent, GhostDriver
+from ghostos.core.runtime import EventBus, GoTasks, GoThreads
+from ghostos.contracts.logger import get_ghostos_logger, LoggerItf
+from ghostos.contracts.variables import Variables
+from ghostos.framework.eventbuses import FairEventBusImpl
+from ghostos.framework.storage import FileStorageImpl
+from ghostos.framework.tasks.storage_tasks import StorageGoTasksImpl
+from ghostos.framework.threads.storage_threads import GoThreadsByStorage
+from ghostos.framework.variables.variables_impl import VariablesImpl
+from ghostos_common.entity import ModelEntity
+from ghostos_common.identifier import Identifier
+
+WORKSPACE = {workspace!r}
+
+
+class PingGhost(ModelEntity, Agent):
+    name: str = "ping"
+
+    def __identifier__(self) -> Identifier:
+        return Identifier(name=self.name)
+
+
+class PingGhostDriver(GhostDriver[PingGhost]):
+
+    def get_artifact(self, session):
+        return None
+
+    def get_system_instruction(self, session):
+        return ""
+
+    def actions(self, session):
+        return []
+
+    def providers(self):
+        return []
+
+    def parse_event(self, session, event):
+        return event
+
+    def on_creating(self, session):
+        return None
+
+    def truncate(self, session):
+        return session.thread
+
+    def on_event(self, session, event):
+        with open(os.path.join(WORKSPACE, "handled_" + event.event_id), "w") as f:
+            f.write(str(os.getpid()))
+        return session.mindflow().wait()
+
+
+def make_container() -> Container:
+    logger = get_ghostos_logger()
+    container = Container()
+    container.set(LoggerItf, logger)
+    # the private eventbus of the bootstrap, as the default one.
+    container.set(EventBus, FairEventBusImpl())
+    container.set(GoTasks, StorageGoTasksImpl(FileStorageImpl(os.path.join(WORKSPACE, "tasks")), logger))
+    threads = FileStorageImpl(os.path.join(WORKSPACE, "threads"))
+    container.set(GoThreads, GoThreadsByStorage(storage=threads, logger=logger))
+    container.set(Variables, VariablesImpl(FileStorageImpl(os.path.join(WORKSPACE, "variables"))))
+    return container
+'''
+
+
+def _wait(condition, timeout: float = 60.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def test_process_background_runner(tmp_path):
+    tasks_dir = tmp_path / "tasks"
+    tasks_dir.mkdir()
+    maker = tmp_path / "process_runner_maker.py"
+    maker.write_text(_MAKER.format(db=str(tmp_path / "eventbus.db"), tasks=str(tasks_dir)))
+    sys.path.insert(0, str(tmp_path))
+    spec = MatrixWorkerSpec(
+        container_maker="process_runner_maker:make_container",
+        config=MatrixConf(),
+        process=GoProcess.new(shell_id="test"),
+        idle_time=0.05,
+        heartbeat_interval=0.1,
+    )
+    runner = ProcessBackgroundRunner(spec, workers=2, health_timeout=60)
+    try:
+        runner.start()
+        started_at = time.time()
+        assert _wait(lambda: all(s.last_heartbeat > started_at for s in runner.check()))
+        stats = runner.stats()
+        assert len(stats) == 2
+        assert all(s.alive and s.errors == 0 for s in stats)
+
+        # the dead worker is restarted by check.
+        dead_pid = stats[0].pid
+        os.kill(dead_pid, 9)
+        assert _wait(lambda: runner.check()[0].restarts == 1)
+        stats = runner.stats()
+        assert stats[0].pid != dead_pid
+        assert stats[1].restarts == 0
+    finally:
+        runner.stop(timeout=10)
+        sys.path.remove(str(tmp_path))
+    assert not runner.alive()
+
+
+def _ping_workspace(tmp_path):
+    for name in ("tasks", "threads", "variables"):
+        (tmp_path / name).mkdir()
+    maker = tmp_path / "process_runner_ping.py"
+    maker.write_text(_PING_MAKER.format(workspace=str(tmp_path)))
+    sys.path.insert(0, str(tmp_path))
+
+
+def test_process_workers_handle_the_events_of_the_parent(tmp_path):
+    from ghostos.core.runtime import EventBus, EventTypes
+    from ghostos.framework.eventbuses import SQLiteEventBusImpl
+    from ghostos.framework.ghostos import MatrixImpl
+
+    _ping_workspace(tmp_path)
+    runner = None
+    try:
+        import process_runner_ping
+        container = process_runner_ping.make_container()
+        eventbus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"))
+        container.set(EventBus, eventbus)
+        matrix = MatrixImpl(MatrixConf(background_idle_time=0.05), container, GoProcess.new(shell_id="test"), [])
+        task = matrix.get_or_create_task(process_runner_ping.PingGhost(), save=True)
+        event = EventTypes.INPUT.new(task.task_id, [])
+        eventbus.send_event(event, notify=True)
+
+        # the worker bootstraps a private eventbus, and handles the events of the parent's one.
+        runner = matrix.background_run_processes(
+            worker=1,
+            container_maker="process_runner_ping:make_container",
+        )
+        handled = tmp_path / ("handled_" + event.event_id)
+        assert _wait(handled.exists)
+        assert int(handled.read_text()) == runner.stats()[0].pid
+        assert _wait(lambda: eventbus.task_queue_depths() == [])
+        assert _wait(lambda: runner.check()[0].handled == 1)
+        matrix.close()
+    finally:
+        if runner is not None:
+            runner.stop(timeout=10)
+        sys.path.remove(str(tmp_path))
+        sys.modules.pop("process_runner_ping", None)
+
+
+def test_process_worker_with_private_eventbus_fails_fast(tmp_path):
+    _ping_workspace(tmp_path)
+    spec = MatrixWorkerSpec(
+        container_maker="process_runner_ping:make_container",
+        config=MatrixConf(),
+        process=GoProcess.new(shell_id="test"),
+    )
+    runner = ProcessBackgroundRunner(spec, workers=1, health_timeout=60)
+    try:
+        runner.start()
+        assert _wait(lambda: not runner.alive())
+        with pytest.raises(RuntimeError):
+            runner.check()
+    finally:
+        runner.stop(timeout=10)
+        sys.path.remove(str(tmp_path))
@@ -0,0 +1,122 @@
+import time
+
+from ghostos.framework.storage import MemStorage
+from ghostos.framework.tasks.storage_tasks import StorageGoTasksImpl
+from ghostos.framework.logger import FakeLogger
+from ghostos.framework.eventbuses import FairEventBusImpl, SQLiteEventBusImpl
+from ghostos.framework.ghostos import TaskScheduler, TaskSchedulerConf
+from ghostos.core.runtime import GoTaskStruct, EventTypes
+from ghostos_common.entity import EntityMeta
+
+
+def _new_task(task_id: str, priority: float = 0.0, deadline: float = None, parent: str = None) -> GoTaskStruct:
+    return GoTaskStruct.new(
+        task_id=task_id,
+        shell_id="shell_id",
+        process_id="process_id",
+        depth=1,
+        name=task_id,
+        description="",
+        meta=EntityMeta(type="type", content=""),
+        parent_task_id=parent,
+        priority=priority,
+        deadline=deadline,
+    )
+
+
+def test_task_scheduler_priority_and_aging():
+    bus = FairEventBusImpl()
+    tasks = StorageGoTasksImpl(MemStorage(), FakeLogger())
+    for task in [
+        _new_task("batch"),
+        _new_task("urgent", priority=1.0),
+        _new_task("deadline", deadline=time.time() + 1),
+        _new_task("child", parent="live"),
+    ]:
+        tasks.save_task(task)
+        bus.notify_task(task.task_id)
+    bus.notify_task("not_exists")
+
+    scheduler = TaskScheduler(
+        bus, tasks,
+        TaskSchedulerConf(interactive_boost=20, deadline_boost=10),
+        is_interactive=lambda t: t.parent == "live",
+    )
+    assert scheduler.next_task_id() == "child"
+    assert scheduler.next_task_id() == "deadline"
+    assert scheduler.next_task_id() == "urgent"
+    assert scheduler.next_task_id() == "batch"
+    assert scheduler.next_task_id() is None
+
+    # the low priority task ages.
+    scheduler = TaskScheduler(bus, tasks, TaskSchedulerConf(aging_rate=100))
+    bus.notify_task("batch")
+    scheduler._fill()
+    time.sleep(0.05)
+    bus.notify_task("urgent")
+    assert scheduler.next_task_id() == "batch"
+
+    # the priority of the event raises the task.
+    scheduler.next_task_id()
+    event = EventTypes.INPUT.new("batch", [])
+    event.priority = 2.0
+    scheduler.hint(event.task_id, event.priority, event.deadline)
+    bus.notify_task("urgent")
+    bus.notify_task("batch")
+    assert scheduler.next_task_id() == "batch"
+
+    # the tasks in the window are given back.
+    scheduler._fill()
+    assert scheduler.size() == 1
+    scheduler.release()
+    assert scheduler.size() == 0
+    assert bus.pop_task_notification() == "urgent"
+
+
+def test_event_expired():
+    event = EventTypes.INPUT.new("task", [])
+    assert not event.is_expired()
+    event.deadline = time.time() - 1
+    assert event.is_expired()
+    cancel = EventTypes.CANCEL.new("task", [])
+    cancel.deadline = time.time() - 1
+    assert not cancel.is_expired()
+
+
+def test_task_scheduler_on_redelivered_events(tmp_path):
+    bus = SQLiteEventBusImpl(str(tmp_path / "eventbus.db"), visibility_timeout=0.05)
+    tasks = StorageGoTasksImpl(MemStorage(), FakeLogger())
+    tasks.save_task(_new_task("foo"))
+    bus.send_event(EventTypes.INPUT.new("foo", []), notify=True)
+
+    scheduler = TaskScheduler(bus, tasks)
+    assert scheduler.next_task_id() == "foo"
+    # the worker crashed without ack.
+    assert bus.pop_task_event("foo") is not None
+    time.sleep(0.1)
+    assert scheduler.next_task_id() == "foo"
+    assert scheduler.next_task_id() is None
+
+    class RepeatBus(FairEventBusImpl):
+        def pop_task_notification(self, timeout=0):
+            return "foo"
+
+    scheduler = TaskScheduler(RepeatBus(), tasks)
+    assert scheduler.next_task_id() == "foo"
+    assert scheduler.next_task_id() == "foo"
+
+
+def test_task_scheduler_gives_back_the_unchosen_tasks(tmp_path):
+    filename = str(tmp_path / "eventbus.db")
+    bus = SQLiteEventBusImpl(filename)
+    tasks = StorageGoTasksImpl(MemStorage(), FakeLogger())
+    for task in [_new_task("batch"), _new_task("urgent", priority=1.0)]:
+        tasks.save_task(task)
+        bus.send_event(EventTypes.INPUT.new(task.task_id, []), notify=True)
+
+    # the scheduler of a worker process crashes after choosing.
+    assert TaskScheduler(bus, tasks).next_task_id() == "urgent"
+    # the other worker process still gets the unchosen task.
+    other = TaskScheduler(SQLiteEventBusImpl(filename), tasks)
+    assert other.next_task_id() == "batch"
+    assert other.next_task_id() is None
@@ -0,0 +1,33 @@
+import os
+
+from ghostos.framework.storage import FileStorageImpl, FileStorageConf
+
+
+def test_file_storage_atomic_put(tmp_path):
+    storage = FileStorageImpl(str(tmp_path), FileStorageConf(fsync="always"))
+    storage.put("a/b.yml", b"hello")
+    assert storage.get("a/b.yml") == b"hello"
+    storage.put("a/b.yml", b"world")
+    assert storage.get("a/b.yml") == b"world"
+    # no temporary file is left.
+    assert os.listdir(tmp_path / "a") == ["b.yml"]
+
+    sub = storage.sub_storage("a")
+    sub.put_many({"c.yml": b"c", "d/e.yml": b"e"})
+    assert storage.get("a/c.yml") == b"c"
+    assert storage.get("a/d/e.yml") == b"e"
+
+
+def test_file_storage_compress(tmp_path):
+    storage = FileStorageImpl(str(tmp_path), FileStorageConf(compress_threshold=100, fsync="batch"))
+    large = b"hello world\n" * 100
+    storage.put_many({"large.yml": large, "small.yml": b"small"})
+    assert os.path.getsize(tmp_path / "large.yml") < len(large)
+    assert (tmp_path / "small.yml").read_bytes() == b"small"
+    assert storage.get("large.yml") == large
+
+    # the compressed files are still readable when the compression is off.
+    plain = FileStorageImpl(str(tmp_path), FileStorageConf(atomic=False))
+    assert plain.get("large.yml") == large
+    plain.put("large.yml", large)
+    assert (tmp_path / "large.yml").read_bytes() == large
@@ -1,10 +1,14 @@
-from ghostos.framework.storage import MemStorage
-from ghostos.framework.tasks.storage_tasks import StorageGoTasksImpl
+from ghostos.framework.storage import MemStorage, FileStorageImpl
+from ghostos.framework.tasks.storage_tasks import StorageGoTasksImpl, FileTaskLocker
 from ghostos.framework.logger import FakeLogger
 from ghostos.core.runtime import GoTaskStruct, TaskBrief
 from ghostos_common.entity import EntityMeta
+import multiprocessing
+import sys
 import time
 
+import pytest
+
 
 def test_storage_tasks_impl():
     storage = MemStorage()
@@ -60,3 +64,58 @@ def test_storage_tasks_impl_lock():
     with locker:
         assert locker.acquired()
     assert not locker.acquired()
+
+
+def _acquire_in_process(dirname: str, start, acquired) -> None:
+    tasks = StorageGoTasksImpl(FileStorageImpl(dirname), FakeLogger())
+    locker = tasks.lock_task("task_id", overdue=30)
+    start.wait()
+    if locker.acquire():
+        with acquired.get_lock():
+            acquired.value += 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock is not available")
+def test_file_task_locker_across_processes(tmp_path):
+    tasks = StorageGoTasksImpl(FileStorageImpl(str(tmp_path)), FakeLogger())
+    assert isinstance(tasks.lock_task("task_id"), FileTaskLocker)
+
+    ctx = multiprocessing.get_context("fork")
+    start = ctx.Event()
+    acquired = ctx.Value("i", 0)
+    processes = [ctx.Process(target=_acquire_in_process, args=(str(tmp_path), start, acquired)) for _ in range(8)]
+    for p in processes:
+        p.start()
+    start.set()
+    for p in processes:
+        p.join(10)
+    assert acquired.value == 1
+
+    locker = tasks.lock_task("task_id", overdue=30, force=True)
+    assert locker.acquire()
+    assert locker.release()
+
+
+def test_storage_tasks_skip_unchanged_save():
+    storage = MemStorage()
+    tasks = StorageGoTasksImpl(storage, FakeLogger())
+    task = GoTaskStruct.new(
+        task_id="task_id",
+        shell_id="shell_id",
+        process_id="process_id",
+        depth=0,
+        name="name",
+        description="description",
+        meta=EntityMeta(type="type", content=""),
+    )
+    tasks.save_task(task)
+    task.updated += 10
+    tasks.save_task(task)
+    got = tasks.get_task(task.task_id)
+    tasks.save_task(got)
+    assert tasks.save_stats() == {"written": 1, "skipped": 2}
+
+    got.state = "running"
+    tasks.save_task(got)
+    assert tasks.save_stats() == {"written": 2, "skipped": 2}
+    assert tasks.get_task(task.task_id).state == "running"
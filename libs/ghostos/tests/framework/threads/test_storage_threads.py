@@ -33,3 +33,19 @@ def test_threads_baseline():
     assert fork.id != got.id
     assert fork.root_id == got.id
     assert fork.parent_id == got.id
+
+
+def test_threads_skip_unchanged_save():
+    container = _prepare_container()
+    threads = container.force_fetch(GoThreads)
+    thread = GoThreadInfo()
+    threads.save_thread(thread)
+    threads.save_thread(thread)
+    got = threads.get_thread(thread.id)
+    threads.save_thread(got)
+    assert threads.save_stats() == {"written": 1, "skipped": 2}
+
+    got.append(Message.new_tail(content="hello world"))
+    threads.save_threads(got, thread)
+    assert threads.save_stats() == {"written": 2, "skipped": 3}
+    assert threads.get_thread(thread.id) == got
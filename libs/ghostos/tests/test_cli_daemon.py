@@ -0,0 +1,108 @@
+import io
+import threading
+import time
+
+import ghostos.scripts.cli.daemon as cli_daemon
+from ghostos.scripts.cli.daemon import DaemonServer, forward_command, request_daemon
+
+
+def test_cli_daemon_forward_command(tmp_path):
+    socket_path = str(tmp_path / "daemon.sock")
+    assert forward_command(["docs"], socket_path) is None
+
+    server = DaemonServer(socket_path, warmup=False)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    for _ in range(100):
+        if request_daemon({"command": "status"}, socket_path):
+            break
+        time.sleep(0.02)
+
+    # the client process is not the daemon process in practice.
+    cli_daemon._serving = False
+    try:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        assert forward_command(["docs"], socket_path, stdout, stderr) == 0
+        assert "documentation" in stdout.getvalue()
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        assert forward_command(["console", "foo"], socket_path, stdout, stderr) == 2
+        assert "not served" in stderr.getvalue()
+
+        status = request_daemon({"command": "status"}, socket_path)
+        assert status["served"] == 1
+    finally:
+        cli_daemon._serving = True
+        assert request_daemon({"command": "stop"}, socket_path) == {"stopped": True}
+        t.join(5)
+    assert not t.is_alive()
+    assert not cli_daemon._serving
+    assert forward_command(["docs"], socket_path) is None
+
+
+def test_cli_forward_invoked_args(monkeypatch):
+    from click.testing import CliRunner
+    from ghostos.scripts.cli import main
+
+    forwarded = []
+
+    def fake_forward(argv):
+        forwarded.append(argv)
+        return 0
+
+    monkeypatch.setattr(cli_daemon, "forward_command", fake_forward)
+    result = CliRunner().invoke(main, ["docs", "--help"])
+    assert result.exit_code == 0
+    assert forwarded == [["docs", "--help"]]
+    assert "profile-container" not in cli_daemon.DAEMON_COMMANDS
+
+
+def test_cli_daemon_socket_mode(tmp_path):
+    import os
+    import stat
+    socket_path = str(tmp_path / "daemon.sock")
+    server = DaemonServer(socket_path, warmup=False)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    try:
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.02)
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    finally:
+        server.stop()
+        t.join(5)
+
+
+def test_cli_moss_reloads_the_edited_module(tmp_path, monkeypatch):
+    import sys
+    from click.testing import CliRunner
+    from ghostos.scripts.cli import main
+
+    monkeypatch.setenv(cli_daemon.NO_DAEMON_ENV, "1")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module_file = tmp_path / "cli_edited_module.py"
+    module_file.write_text("def foo() -> int:\n    return 1\n")
+    try:
+        import cli_edited_module
+        assert cli_edited_module.foo() == 1
+
+        # the user edits the module imported by the long-lived daemon.
+        module_file.write_text("def foo() -> int:\n    return 2\n")
+        result = CliRunner().invoke(main, ["moss", "cli_edited_module"])
+        assert result.exit_code == 0, result.output
+        assert cli_edited_module.foo() == 2
+    finally:
+        sys.modules.pop("cli_edited_module", None)
+
+
+def test_cli_version_option_is_added_once():
+    from click.testing import CliRunner
+    from ghostos.scripts.cli import main
+
+    params = len(main.params)
+    for _ in range(3):
+        CliRunner().invoke(main, ["docs", "--help"], env={cli_daemon.NO_DAEMON_ENV: "1"})
+    assert len(main.params) == params
+    assert len([p for p in main.params if "--version" in p.opts]) == 1
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from typing import Dict
+
+# cumulative import time budget of the cli entry point, in microseconds.
+CLI_IMPORT_BUDGET = 1_000_000
+
+
+def _import_times(statement: str) -> Dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_entry_point_import_time():
+    times = _import_times("import ghostos.scripts.cli")
+    for heavy in ("openai", "streamlit", "ghostos.abcd", "ghostos_moss"):
+        assert heavy not in times, f"{heavy} is imported by the cli entry point"
+    assert times["ghostos.scripts.cli"] < CLI_IMPORT_BUDGET
+
+
+def test_abcd_does_not_import_openai():
+    times = _import_times("import ghostos.abcd")
+    assert "openai" not in times
+
+
+def test_lazy_package_root():
+    import ghostos
+    from ghostos_container import Container
+    from ghostos.abcd.concepts import GhostOS
+    assert ghostos.Container is Container
+    assert ghostos.GhostOS is GhostOS
+    assert "Ghost" in ghostos.__all__
+
+
+def test_star_imports():
+    namespace = {}
+    exec("from ghostos import *", namespace)
+    assert "Container" in namespace
+    assert "__is_subclass__" in namespace
+
+    namespace = {}
+    exec("from ghostos.core.messages import *", namespace)
+    assert "Message" in namespace
+    assert "DefaultOpenAIParserProvider" in namespace
@@ -8,6 +8,7 @@ from ghostos_moss.abcd import (
 from ghostos_moss.modules import Modules, ImportWrapper, DefaultModules, DefaultModulesProvider
 from ghostos_moss.moss_impl import DefaultMOSSProvider
 from ghostos_moss.testsuite import MossTestSuite
+from ghostos_moss.pool import MossRuntimePool, DefaultMossRuntimePool, DefaultMossRuntimePoolProvider
 from ghostos_moss.pycontext import PyContext
 from ghostos_moss.exports import Exporter
 from ghostos_moss.magics import __is_subclass__, __is_instance__, MagicPrompter
@@ -31,6 +32,9 @@ __all__ = [
 
     'Modules', 'DefaultModules', 'DefaultModulesProvider',
 
+    # warm runtimes
+    'MossRuntimePool', 'DefaultMossRuntimePool', 'DefaultMossRuntimePoolProvider',
+
     'Exporter',  # useful to exports values in group, and other module will reflect them in moss_imported_attrs_prompt
     'moss_container',
     'moss_test_suite',
@@ -90,4 +94,4 @@ def moss_test_suite() -> MossTestSuite:
     return a MossTestSuite
     """
     container = moss_container()
-    return MossTestSuite(container)
+    return MossTestSuite(container, container_factory=moss_container)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Dict, Any, Union, List, Optional, NamedTuple, Type, Callable, TypeVar, ClassVar
+from typing import Dict, Any, Union, List, Optional, NamedTuple, Type, Callable, TypeVar, ClassVar, TYPE_CHECKING
 from typing_extensions import Self
 from types import ModuleType, FunctionType
 from abc import ABC, abstractmethod
@@ -10,6 +10,9 @@ from ghostos_moss.prompts import (
 )
 from ghostos_common.prompter import PromptObjectModel
 
+if TYPE_CHECKING:
+    from ghostos_moss.pool import MossRuntimePool
+
 """
 MOSS 是 Model-oriented Operating System Simulation 的简写. 
 它将系统当前上下文的 API 通过全代码的方式 Prompt 给模型, 让模型直接生成代码并且执行. 
@@ -177,6 +180,18 @@ class MossCompiler(ABC):
         """
         pass
 
+    def with_runtime_pool(self, pool: MossRuntimePool, key: str) -> Self:
+        """
+        compile through the runtime pool.
+        if an idle runtime of the same key and the same compiled module version exists,
+        it is reset to this compiler's container, pycontext and injections instead of compiling the module again.
+        the runtime is given back to the pool when it is closed.
+        a compiler without pooling support ignores the pool by default.
+        :param pool: the runtime pool
+        :param key: the owner of the pooled runtimes, such as the ghost id.
+        """
+        return self
+
     def register(self, provider: Provider) -> None:
         """
         向生成 MOSS 的 IoC 容器里注册 Provider.
@@ -2,10 +2,12 @@ import inspect
 from abc import ABC, abstractmethod
 from typing import Optional, Type, Union, Iterable, Tuple
 from types import ModuleType
-from importlib import import_module, reload as reload_module
+from importlib import import_module
 import pkgutil
+import os
 
 from ghostos_container import Provider, Container
+from ghostos_common.helpers import reload_module_if_changed
 
 __all__ = [
     'Modules', 'ImportWrapper', 'DefaultModules', 'DefaultModulesProvider',
@@ -47,6 +49,9 @@ class Modules(ABC):
 
     @abstractmethod
     def reload(self, module: Union[str, ModuleType]):
+        """
+        reload the module. a module whose source code is not changed may not be executed again.
+        """
         pass
 
 
@@ -87,10 +92,15 @@ class DefaultModules(Modules):
     def save_source(self, modulename: str, source: str, reload: bool = False) -> None:
         module = self.import_module(modulename)
         file = module.__file__
-        with open(file, 'w') as f:
-            f.write(source)
+        existing = None
+        if os.path.exists(file):
+            with open(file, 'r', encoding='utf-8') as f:
+                existing = f.read()
+        if existing != source:
+            with open(file, 'w', encoding='utf-8') as f:
+                f.write(source)
         if reload:
-            self.reload(module)
+            reload_module_if_changed(module, source)
 
     def iter_modules(self, module: Union[str, ModuleType]) -> Iterable[Tuple[str, bool]]:
         if isinstance(module, str):
@@ -109,7 +119,8 @@ class DefaultModules(Modules):
     def reload(self, module: Union[str, ModuleType]):
         if isinstance(module, str):
             module = self.import_module(module)
-        reload_module(module)
+        # compiled code of the same source is cached by hash, and the unchanged module is not executed again.
+        reload_module_if_changed(module)
 
 
 class DefaultModulesProvider(Provider[Modules]):
@@ -1,7 +1,10 @@
+import copy
 import importlib
 import inspect
 from types import ModuleType, FunctionType
-from typing import Optional, Any, Dict, get_type_hints, Type, List, Callable, ClassVar, Union
+from typing import Optional, Any, Dict, get_type_hints, Type, List, Callable, ClassVar, Union, Tuple, Set
+from collections import OrderedDict
+from threading import Lock
 import io
 from typing_extensions import Self
 
@@ -13,6 +16,7 @@ from ghostos_moss.abcd import (
     Injection,
 )
 from ghostos_moss.modules import Modules, ImportWrapper, DefaultModules
+from ghostos_moss.pool import MossRuntimePool
 from ghostos_moss.prompts import reflect_code_prompt
 from ghostos_moss.pycontext import PyContext
 from ghostos_moss.exports import Exporter
@@ -20,7 +24,7 @@ from ghostos_moss.magics import replace_magic_prompter
 from ghostos_moss.self_updater import SelfUpdaterProvider
 from ghostos_common.helpers import (
     generate_module_and_attr_name, code_syntax_check, get_code_interface_str,
-    import_from_path,
+    import_from_path, generate_import_path, md5,
 )
 from ghostos_moss.utils import is_typing, is_subclass
 from contextlib import contextmanager, redirect_stdout
@@ -29,6 +33,8 @@ IMPORT_FUTURE = "from __future__ import annotations"
 
 __all__ = [
     'MossStub',
+    'MossTypeMeta',
+    'get_moss_type_meta',
     'MossCompilerImpl',
     'MossRuntimeImpl',
     'DefaultMOSSProvider',
@@ -72,6 +78,10 @@ class MossCompilerImpl(MossCompiler):
             'abc',
             'openai',
         ]
+        self._runtime_pool: Optional[MossRuntimePool] = None
+        self._runtime_pool_key: str = ""
+        self._runtime_pool_version: str = ""
+        self._pooled_runtime: Optional[MossRuntimeImpl] = None
         self._compiled = False
         self._closed = False
 
@@ -108,6 +118,11 @@ class MossCompilerImpl(MossCompiler):
         self._injections.update(attrs)
         return self
 
+    def with_runtime_pool(self, pool: MossRuntimePool, key: str) -> Self:
+        self._runtime_pool = pool
+        self._runtime_pool_key = key
+        return self
+
     def _compile(self, modulename: Optional[str] = None) -> ModuleType:
         origin: Optional[ModuleType] = None
         filename = "<moss_temp_module>"
@@ -128,6 +143,17 @@ class MossCompilerImpl(MossCompiler):
             modulename = origin_modulename if origin_modulename else "__moss__"
 
         code = self.pycontext_code()
+        if self._runtime_pool is not None:
+            moss_type_path = generate_import_path(self._default_moss_type)
+            self._runtime_pool_version = md5(
+                f"{modulename}|{filename}|{moss_type_path}|{self._locals_version()}|{self._attr_prompts!r}|{code}"
+            )
+            pooled = self._runtime_pool.checkout(self._runtime_pool_key, self._runtime_pool_version)
+            if pooled is not None:
+                # reuse the compiled module of the warm runtime.
+                self._pooled_runtime = pooled
+                return pooled.module()
+
         # 创建临时模块.
         module = MossTempModuleType(modulename)
         MossTempModuleType.__instance_count__ += 1
@@ -143,6 +169,24 @@ class MossCompilerImpl(MossCompiler):
             module.__dict__.update(updating)
         return module
 
+    def _locals_version(self) -> str:
+        """
+        the predefined locals are part of the compiled module, so they are part of the pooled runtime version.
+        """
+        items = []
+        for name, value in sorted(self._predefined_locals.items()):
+            if name == "__import__":
+                # rebuilt with the modules of each compiler when the pooled runtime is reset.
+                continue
+            if inspect.ismodule(value):
+                desc = value.__name__
+            elif inspect.isclass(value) or inspect.isfunction(value):
+                desc = f"{value.__module__}:{value.__qualname__}"
+            else:
+                desc = f"{type(value).__qualname__}@{id(value)}"
+            items.append(f"{name}={desc}")
+        return ",".join(items)
+
     @staticmethod
     def _filter_origin(origin: ModuleType) -> Dict[str, Any]:
         result = {}
@@ -164,15 +208,30 @@ class MossCompilerImpl(MossCompiler):
         # default moss container bindings
         self._container.register(SelfUpdaterProvider())
 
-        return MossRuntimeImpl(
-            container=self._container,
-            pycontext=self._pycontext.model_copy(deep=True),
-            source_code=self.pycontext_code(),
-            compiled=module,
-            injections=self._injections,
-            attr_prompts=attr_prompts,
-            ignored_modules=self._ignored_modules,
-        )
+        if self._pooled_runtime is not None:
+            runtime = self._pooled_runtime
+            self._pooled_runtime = None
+            runtime.reset(
+                container=self._container,
+                pycontext=self._pycontext.fork(),
+                injections=self._injections,
+                attr_prompts=attr_prompts,
+                ignored_modules=self._ignored_modules,
+                predefined_locals=self._predefined_locals,
+            )
+        else:
+            runtime = MossRuntimeImpl(
+                container=self._container,
+                pycontext=self._pycontext.fork(),
+                source_code=self.pycontext_code(),
+                compiled=module,
+                injections=self._injections,
+                attr_prompts=attr_prompts,
+                ignored_modules=self._ignored_modules,
+            )
+        if self._runtime_pool is not None:
+            runtime.bind_pool(self._runtime_pool, self._runtime_pool_key, self._runtime_pool_version)
+        return runtime
 
     def pycontext_code(self) -> str:
         code = self._pycontext.code
@@ -195,6 +254,8 @@ class MossCompilerImpl(MossCompiler):
         del self._pycontext
         del self._predefined_locals
         del self._injections
+        del self._runtime_pool
+        del self._pooled_runtime
 
 
 class MossStub(Moss):
@@ -235,24 +296,91 @@ class MossStub(Moss):
         MossStub.instance_count -= 1
 
 
-def new_moss_stub(cls: Type[Moss], container: Container, pycontext: PyContext, pprint: Callable) -> Moss:
-    # cls 必须不包含参数.
+class MossTypeMeta:
+    """
+    reflection metadata of a Moss type, computed once per compiled module version.
+    """
+
+    def __init__(self, moss_type: Type[Moss], localns: Dict[str, Any]):
+        # resolve the typehints only once, it is expensive.
+        self.typehints: Dict[str, Any] = get_type_hints(moss_type, localns=localns)
+        # the attributes that shall be injected by the container.
+        self.injectable: List[Tuple[str, Any]] = [
+            (name, typehint) for name, typehint in self.typehints.items() if not name.startswith('_')
+        ]
+        self.ignored: Tuple[str, ...] = tuple(moss_type.__ignored__)
+        self.watching: List = list(moss_type.__watching__)
 
-    watching = cls.__watching__
-    stub = MossStub(pycontext, container, pprint, watching, cls.__ignored__)
+        # public class attributes that are copied to each stub instance.
+        self.class_attrs: Dict[str, Any] = {}
+        for attr_name in dir(moss_type):
+            if attr_name.startswith("_") or hasattr(MossStub, attr_name) or attr_name == "executing_code":
+                continue
+            self.class_attrs[attr_name] = getattr(moss_type, attr_name)
+        # the attributes defined by the moss type itself, which shall be reversely injected to pycontext.
+        self.own_attrs: Dict[str, Any] = {
+            name: value for name, value in moss_type.__dict__.items()
+            if not name.startswith("_") and PyContext.allow_prop(value)
+        }
+        # one stub class for each moss type.
+        self.stub_type: Type[MossStub] = type(
+            f"{moss_type.__name__}Stub",
+            (MossStub,),
+            {"__module__": MossStub.__module__},
+        )
+
+
+_moss_type_metas_lock = Lock()
+_moss_type_metas_versions = 16
+""" max cached compiled module versions of each moss type """
+
+
+def get_moss_type_meta(moss_type: Type[Moss], compiled: ModuleType, source_code: str) -> MossTypeMeta:
+    """
+    get the cached reflection metadata of the moss type.
+    the compiled module name and the source code are used as the version of the metadata,
+    because the type hints are resolved with the compiled module's locals.
+    the metadata is cached on the moss type itself, and collected with the type.
+    """
+    version = f"{compiled.__name__}:{source_code}"
+    with _moss_type_metas_lock:
+        # not inherited from the parent moss type.
+        versions = moss_type.__dict__.get("__moss_metas__", None)
+        if versions is not None and version in versions:
+            versions.move_to_end(version)
+            return versions[version]
+
+    # resolve outside the lock. the worst case is the same metadata is computed twice.
+    meta = MossTypeMeta(moss_type, compiled.__dict__)
+    with _moss_type_metas_lock:
+        versions = moss_type.__dict__.get("__moss_metas__", None)
+        if versions is None:
+            versions = OrderedDict()
+            setattr(moss_type, "__moss_metas__", versions)
+        versions[version] = meta
+        while len(versions) > _moss_type_metas_versions:
+            versions.popitem(last=False)
+    return meta
+
+
+def new_moss_stub(
+        cls: Type[Moss],
+        container: Container,
+        pycontext: PyContext,
+        pprint: Callable,
+        meta: MossTypeMeta,
+) -> Moss:
+    # cls 必须不包含参数.
+    stub = meta.stub_type(pycontext, container, pprint, meta.watching, list(meta.ignored))
     stub.executing_code = None
-    # assert stub.instance_count > 0
-    for attr_name in dir(cls):
-        if not attr_name.startswith("_") and not hasattr(stub, attr_name):
-            attr_value = getattr(cls, attr_name)
-            setattr(stub, attr_name, attr_value)
+    for attr_name, attr_value in meta.class_attrs.items():
+        setattr(stub, attr_name, attr_value)
 
     # 反向注入.
-    for name, value in cls.__dict__.items():
-        if name in pycontext.properties or name.startswith("_"):
+    for name, value in meta.own_attrs.items():
+        if name in pycontext.properties:
             continue
-        if stub.__pycontext__.allow_prop(value):
-            stub.__pycontext__.set_prop(name, value)
+        pycontext.set_prop(name, value)
 
     return stub
 
@@ -285,13 +413,95 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
         self._closed: bool = False
         self._injected = set()
         self._injected_types: Dict[Any, str] = {}
+        self._moss_type_meta: Optional[MossTypeMeta] = None
         self._moss: Moss = self._compile_moss()
         self._initialize_moss()
-        self._ignored_modules = set(ignored_modules) | set(self._moss.__ignored__)
+        self._ignored_modules = set(ignored_modules) | set(self._moss_type_meta.ignored)
 
         self._replaced_magic_prompts = replace_magic_prompter(self._compiled)
+        # the clean module values, restored when the runtime is given back to the pool.
+        self._module_snapshot: Dict[str, Any] = {}
+        # the mutable values of the snapshot, restored by deep copies.
+        self._snapshot_copied: Set[str] = set()
+        self._take_module_snapshot()
+        self._pool: Optional[Tuple[MossRuntimePool, str, str]] = None
         MossRuntime.instance_count += 1
 
+    def bind_pool(self, pool: MossRuntimePool, key: str, version: str) -> None:
+        """
+        give back the runtime to the pool when it is closed.
+        """
+        self._pool = (pool, key, version)
+
+    @staticmethod
+    def _is_shared_value(value: Any) -> bool:
+        return (
+                value is None
+                or isinstance(value, (str, bytes, int, float, bool, complex, frozenset, ImportWrapper))
+                or inspect.ismodule(value)
+                or inspect.isclass(value)
+                or inspect.isroutine(value)
+        )
+
+    def _take_module_snapshot(self) -> None:
+        snapshot = {}
+        copied = set()
+        for name, value in self._compiled.__dict__.items():
+            if name == MOSS_VALUE_NAME:
+                continue
+            if not self._is_shared_value(value):
+                try:
+                    # the module level objects may be mutated by the executed code.
+                    value = copy.deepcopy(value)
+                    copied.add(name)
+                except Exception:
+                    # such as locks and clients, shared as they are.
+                    pass
+            snapshot[name] = value
+        self._module_snapshot = snapshot
+        self._snapshot_copied = copied
+
+    def _restore_module_snapshot(self) -> None:
+        values = {}
+        for name, value in self._module_snapshot.items():
+            values[name] = copy.deepcopy(value) if name in self._snapshot_copied else value
+        self._compiled.__dict__.clear()
+        self._compiled.__dict__.update(values)
+
+    def reset(
+            self, *,
+            container: Container,
+            pycontext: PyContext,
+            injections: Dict[str, Any],
+            attr_prompts: Dict[str, str],
+            ignored_modules: List[str],
+            predefined_locals: Dict[str, Any],
+    ) -> None:
+        """
+        reset a closed runtime from the pool to a new execution context.
+        the compiled module and the reflections of it are reused,
+        the predefined locals such as `__import__` are bound to the new compiler.
+        """
+        if not self._closed:
+            raise RuntimeError("only the closed moss runtime can be reset")
+        for name, value in predefined_locals.items():
+            self._compiled.__dict__[name] = value
+            self._module_snapshot[name] = value
+            self._snapshot_copied.discard(name)
+        self._attr_prompts = attr_prompts
+        self._container = container
+        self._modules = container.force_fetch(Modules)
+        self._pycontext = pycontext
+        self._container.set(PyContext, self._pycontext)
+        self._injections = injections
+        self._runtime_std_output = ""
+        self._injected = set()
+        self._injected_types = {}
+        self._closed = False
+        self._moss = self._compile_moss()
+        self._initialize_moss()
+        self._ignored_modules = set(ignored_modules) | set(self._moss_type_meta.ignored)
+
     def _compile_moss(self) -> Moss:
         moss_type = self.moss_type()
         if not issubclass(moss_type, Moss):
@@ -299,14 +509,15 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
 
         # 创建 stub.
         pycontext = self._pycontext
-        moss = new_moss_stub(moss_type, self._container, pycontext, self.pprint)
+        self._moss_type_meta = get_moss_type_meta(moss_type, self._compiled, self._source_code)
+        moss = new_moss_stub(moss_type, self._container, pycontext, self.pprint, self._moss_type_meta)
         return moss
 
     def _initialize_moss(self) -> None:
         from .lifecycle import __moss_compiled__
         moss = self._moss
         pycontext = self._pycontext
-        moss_type = self.moss_type()
+        meta = self._moss_type_meta
 
         def inject(attr_name: str, injected: Any) -> Any:
             if isinstance(injected, Injection):
@@ -325,11 +536,7 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
             inject(name, injection)
 
         # 初始化基于容器的依赖注入.
-        typehints = get_type_hints(moss_type, localns=self._compiled.__dict__)
-        for name, typehint in typehints.items():
-            if name.startswith('_'):
-                continue
-
+        for name, typehint in meta.injectable:
             # 已经有的就不再注入.
             if hasattr(moss, name):
                 continue
@@ -471,7 +678,7 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
                 property_name = self._injected_types[injected_type]
                 reverse_imported[injected_type] = f"{Moss}.{property_name}"
 
-        for watched in self.moss().__watching__:
+        for watched in self._moss_type_meta.watching:
             if watched in reverse_imported:
                 reflection_types.add(watched)
 
@@ -593,8 +800,15 @@ class MossRuntimeImpl(MossRuntime, MossPrompter):
             if isinstance(val, Injection):
                 val.on_destroy()
         self._container.shutdown()
+        if self._pool is not None:
+            pool, key, version = self._pool
+            self._pool = None
+            # clear the values defined by the executed code.
+            self._restore_module_snapshot()
+            pool.release(key, version, self)
 
     def __del__(self):
+        self._pool = None
         if not self._closed:
             self.close()
         MossRuntime.instance_count -= 1
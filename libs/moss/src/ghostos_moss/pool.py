@@ -0,0 +1,159 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Tuple, List, Type
+from threading import Lock
+import time
+
+from ghostos_container import Provider, Container
+from ghostos_moss.abcd import MossRuntime
+
+__all__ = [
+    'MossRuntimePool', 'DefaultMossRuntimePool', 'DefaultMossRuntimePoolProvider',
+]
+
+
+class MossRuntimePool(ABC):
+    """
+    keep closed moss runtimes warm, so the same moss module of the same ghost is not compiled again.
+    the pooled runtime is reset to the new container, pycontext and injections when it is checked out.
+    use `MossCompiler.with_runtime_pool` to compile runtime through the pool.
+    """
+
+    @abstractmethod
+    def checkout(self, key: str, version: str) -> Optional[MossRuntime]:
+        """
+        pop an idle runtime of the key and the compiled module version.
+        :param key: the owner of the runtimes, such as ghost id
+        :param version: the version of the compiled module, such as modulename and source hash
+        :return: None if no idle runtime.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, key: str, version: str, runtime: MossRuntime) -> None:
+        """
+        give back a closed runtime to the pool. the runtime may be dropped if the pool is full.
+        """
+        pass
+
+    @abstractmethod
+    def evict(self, idle_seconds: Optional[float] = None) -> int:
+        """
+        drop the runtimes that idle longer than the seconds.
+        :param idle_seconds: if None, use the pool's default idle timeout.
+        :return: the number of evicted runtimes.
+        """
+        pass
+
+    @abstractmethod
+    def size(self) -> int:
+        """
+        the number of the idle runtimes in the pool.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class DefaultMossRuntimePool(MossRuntimePool):
+    """
+    size bounded pool in memory. idle runtimes are evicted lazily on checkout and release.
+    """
+
+    def __init__(self, max_idle_per_key: int = 2, max_idle: int = 32, idle_timeout: float = 600.0):
+        self._max_idle_per_key = max_idle_per_key
+        self._max_idle = max_idle
+        self._idle_timeout = idle_timeout
+        self._idle: Dict[Tuple[str, str], List[Tuple[float, MossRuntime]]] = {}
+        self._size = 0
+        self._lock = Lock()
+
+    def checkout(self, key: str, version: str) -> Optional[MossRuntime]:
+        self.evict()
+        with self._lock:
+            idle = self._idle.get((key, version), None)
+            if not idle:
+                return None
+            # the most recently released one is the warmest.
+            _, runtime = idle.pop()
+            self._size -= 1
+            if not idle:
+                del self._idle[(key, version)]
+            return runtime
+
+    def release(self, key: str, version: str, runtime: MossRuntime) -> None:
+        now = time.time()
+        with self._lock:
+            # the old versions of the key will never be checked out.
+            for pool_key in list(self._idle.keys()):
+                if pool_key[0] == key and pool_key[1] != version:
+                    self._size -= len(self._idle.pop(pool_key))
+
+            idle = self._idle.setdefault((key, version), [])
+            if len(idle) >= self._max_idle_per_key:
+                return
+            idle.append((now, runtime))
+            self._size += 1
+            if self._size > self._max_idle:
+                self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        oldest_key = None
+        oldest_at = None
+        for pool_key, idle in self._idle.items():
+            if idle and (oldest_at is None or idle[0][0] < oldest_at):
+                oldest_key = pool_key
+                oldest_at = idle[0][0]
+        if oldest_key is not None:
+            idle = self._idle[oldest_key]
+            idle.pop(0)
+            self._size -= 1
+            if not idle:
+                del self._idle[oldest_key]
+
+    def evict(self, idle_seconds: Optional[float] = None) -> int:
+        if idle_seconds is None:
+            idle_seconds = self._idle_timeout
+        expired_at = time.time() - idle_seconds
+        evicted = 0
+        with self._lock:
+            for pool_key in list(self._idle.keys()):
+                idle = self._idle[pool_key]
+                alive = [item for item in idle if item[0] > expired_at]
+                evicted += len(idle) - len(alive)
+                if alive:
+                    self._idle[pool_key] = alive
+                else:
+                    del self._idle[pool_key]
+            self._size -= evicted
+        return evicted
+
+    def size(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._size = 0
+
+
+class DefaultMossRuntimePoolProvider(Provider[MossRuntimePool]):
+
+    def __init__(self, max_idle_per_key: int = 2, max_idle: int = 32, idle_timeout: float = 600.0):
+        self._max_idle_per_key = max_idle_per_key
+        self._max_idle = max_idle
+        self._idle_timeout = idle_timeout
+
+    def singleton(self) -> bool:
+        return True
+
+    def contract(self) -> Type[MossRuntimePool]:
+        return MossRuntimePool
+
+    def factory(self, con: Container) -> Optional[MossRuntimePool]:
+        return DefaultMossRuntimePool(
+            max_idle_per_key=self._max_idle_per_key,
+            max_idle=self._max_idle,
+            idle_timeout=self._idle_timeout,
+        )
@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Dict, Any, Optional, Tuple, Iterator
+from typing import Dict, Any, Optional, Tuple, Iterator, Set
+from typing_extensions import Self
 from types import ModuleType
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from ghostos_common.entity import EntityMeta, to_entity_meta, from_entity_meta, is_entity_type
 
 __all__ = [
@@ -47,15 +48,59 @@ class PyContext(BaseModel):
         description="if the generated code is executed",
     )
 
+    # the entity metas in properties are never modified in place, only replaced by set_prop,
+    # so the copies of the pycontext can share them.
+    _scalars: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    """ decoded immutable values of the properties, to skip encoding and decoding them again """
+
+    _dirty: Set[str] = PrivateAttr(default_factory=set)
+    """ the properties changed since created or copied """
+
     def set_prop(self, name: str, value: Any):
-        self.properties[name] = to_entity_meta(value)
+        immutable = value is None or isinstance(value, (bool, int, float, str))
+        if immutable and name in self._scalars and name in self.properties:
+            cached = self._scalars[name]
+            if cached is value or (type(cached) is type(value) and cached == value):
+                # nothing changed.
+                return
+        meta = to_entity_meta(value)
+        if self.properties.get(name, None) != meta:
+            self.properties[name] = meta
+            self._dirty.add(name)
+        if immutable:
+            self._scalars[name] = value
+        elif name in self._scalars:
+            del self._scalars[name]
 
     def get_prop(self, name: str, module: Optional[ModuleType] = None) -> Any:
         if name not in self.properties:
             return None
+        if name in self._scalars:
+            return self._scalars[name]
         value = self.properties[name]
         return from_entity_meta(value, module)
 
+    def is_dirty(self) -> bool:
+        """
+        if any property changed since the pycontext is created or copied.
+        """
+        return len(self._dirty) > 0
+
+    def dirty_props(self) -> Set[str]:
+        """
+        names of the properties changed since the pycontext is created or copied.
+        """
+        return set(self._dirty)
+
+    def fork(self) -> Self:
+        """
+        cheap copy of the pycontext. the entity metas are shared instead of deep copied.
+        """
+        copied = self.model_copy(update={"properties": dict(self.properties)})
+        copied._scalars = dict(self._scalars)
+        copied._dirty = set()
+        return copied
+
     @staticmethod
     def allow_prop(value: Any) -> bool:
         if isinstance(value, BaseModel):
@@ -78,14 +123,13 @@ class PyContext(BaseModel):
 
     def iter_props(self, module: Optional[ModuleType] = None) -> Iterator[Tuple[str, Any]]:
         for name in self.properties:
-            value = self.properties[name]
-            yield name, from_entity_meta(value, module)
+            yield name, self.get_prop(name, module)
 
     def join(self, ctx: "PyContext") -> "PyContext":
         """
         合并两个 python context, 以右侧的为准. 并返回一个新的 PyContext 对象. 避免左向污染.
         """
-        copied = self.model_copy(deep=True)
+        copied = self.fork()
         if copied.module is None:
             copied.module = ctx.module
         if copied.code is None:
@@ -96,6 +140,10 @@ class PyContext(BaseModel):
 
         for key, val in ctx.properties.items():
             copied.properties[key] = val
+            if key in ctx._scalars:
+                copied._scalars[key] = ctx._scalars[key]
+            elif key in copied._scalars:
+                del copied._scalars[key]
         return copied
 
 # class Injection(BaseModel):
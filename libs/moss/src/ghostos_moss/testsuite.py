@@ -1,16 +1,111 @@
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Literal
 from ghostos_moss.abcd import MossCompiler, Execution
 from ghostos_moss.pycontext import PyContext
 from ghostos_container import Container
-from queue import Queue
+from pydantic import BaseModel, Field
+from queue import Queue, Empty
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from threading import Thread
+import multiprocessing
+import pickle
+import time
+import traceback
+
+__all__ = ['MossTestSuite', 'MossTestCaseReport', 'MossTestReport']
+
+
+class MossTestCaseReport(BaseModel):
+    """
+    the report of a single moss test function.
+    """
+    name: str = Field(description="the name of the test function")
+    status: Literal["passed", "failed", "timeout"] = Field(default="passed")
+    elapsed: float = Field(default=0.0, description="wall time in seconds")
+    error: str = Field(default="", description="the error message or traceback if not passed")
+
+
+class MossTestReport(BaseModel):
+    """
+    JUnit-style timing report of a batch of moss test functions.
+    """
+    modulename: str = Field(description="the tested moss module")
+    cases: List[MossTestCaseReport] = Field(default_factory=list, description="cases in completion order")
+    elapsed: float = Field(default=0.0, description="wall time of the whole batch in seconds")
+
+    def failures(self) -> List[MossTestCaseReport]:
+        return [case for case in self.cases if case.status != "passed"]
+
+    def to_junit_xml(self) -> str:
+        from xml.etree import ElementTree
+        failures = self.failures()
+        suite = ElementTree.Element(
+            "testsuite",
+            name=self.modulename,
+            tests=str(len(self.cases)),
+            failures=str(len([case for case in failures if case.status == "failed"])),
+            errors=str(len([case for case in failures if case.status == "timeout"])),
+            time=f"{self.elapsed:.6f}",
+        )
+        for case in self.cases:
+            element = ElementTree.SubElement(
+                suite,
+                "testcase",
+                classname=self.modulename,
+                name=case.name,
+                time=f"{case.elapsed:.6f}",
+            )
+            if case.status == "failed":
+                failure = ElementTree.SubElement(element, "failure", message=(case.error.splitlines() or [""])[-1])
+                failure.text = case.error
+            elif case.status == "timeout":
+                ElementTree.SubElement(element, "error", message=case.error)
+        return ElementTree.tostring(suite, encoding="unicode")
+
+
+_worker_suite: Optional["MossTestSuite"] = None
+"""the test suite of a worker process, built once by the pool initializer"""
+
+
+def _init_moss_func_worker(container_factory: Callable[[], Container]) -> None:
+    global _worker_suite
+    _worker_suite = MossTestSuite(container_factory())
+
+
+def _moss_func_process_runner(modulename: str, test_module_name: str, fn: str) -> tuple:
+    """
+    run a moss function in a worker process of the pool, returns (fn, execution, error, elapsed).
+    """
+    start = time.perf_counter()
+    try:
+        r = _worker_suite.run(
+            modulename=modulename,
+            test_module_name=test_module_name,
+            target=fn,
+            args=['moss'],
+        )
+        returns = r.returns
+        try:
+            pickle.dumps(returns)
+        except Exception:
+            # the returns can not cross the process boundary.
+            returns = repr(returns)
+        return fn, Execution(returns, r.std_output, r.pycontext), "", time.perf_counter() - start
+    except Exception:
+        return fn, None, traceback.format_exc(), time.perf_counter() - start
 
 
 class MossTestSuite:
     MAGIC_TEST_CASES_ATTR_NAME = "__moss_test_cases__"
 
-    def __init__(self, container: Container):
+    def __init__(self, container: Container, container_factory: Optional[Callable[[], Container]] = None):
+        """
+        :param container: the container to compile moss in the current process.
+        :param container_factory: picklable factory (a module level function) that builds the container
+                                  in the worker processes. required by the process mode.
+        """
         self._container = container
+        self._container_factory = container_factory
 
     def container(self) -> Container:
         return self._container
@@ -32,7 +127,10 @@ class MossTestSuite:
             callback: Callable[[str, Execution], None],
             test_modulename: str = "__test__",
             targets: Optional[str] = None,
-    ) -> None:
+            mode: Literal["thread", "process"] = "thread",
+            max_workers: Optional[int] = None,
+            timeout: Optional[float] = None,
+    ) -> MossTestReport:
         """
         run the test cases in moss module, and returns each case's result to callback function.
         :param callback: callback on (test_case_name, MossResult)
@@ -40,7 +138,10 @@ class MossTestSuite:
         :param test_modulename: the modulename that MossCompiler shall build.
         :param targets: the target functions that should be tested,
                         if None, test the func names from `__moss_test_cases__`
-        :return:
+        :param mode: see parallel_run_moss_func
+        :param max_workers: see parallel_run_moss_func
+        :param timeout: see parallel_run_moss_func
+        :return: the timing report of the test cases.
         """
         compiler = self._container.force_fetch(MossCompiler)
         compiler.join_context(PyContext(module=modulename))
@@ -52,11 +153,14 @@ class MossTestSuite:
                 raise AttributeError(f"Module {modulename} has no {self.MAGIC_TEST_CASES_ATTR_NAME} attribute")
         if not targets:
             raise AttributeError(f"test cases are empty")
-        self.parallel_run_moss_func(
+        return self.parallel_run_moss_func(
             modulename=modulename,
             callback=callback,
             test_module_name=test_modulename,
             funcs=targets,
+            mode=mode,
+            max_workers=max_workers,
+            timeout=timeout,
         )
 
     def run(
@@ -88,15 +192,54 @@ class MossTestSuite:
             funcs: List[str],
             callback: Callable[[str, Execution], None],
             test_module_name: str = "__test__",
-    ) -> None:
+            mode: Literal["thread", "process"] = "thread",
+            max_workers: Optional[int] = None,
+            timeout: Optional[float] = None,
+    ) -> MossTestReport:
         """
-        并发地运行多个测试方法, FIFO 返回结果.
-        :param callback: callback on (str, MossResult)
+        并发地运行多个测试方法, 按完成顺序返回结果.
+        :param callback: callback on (str, MossResult), only called by the passed functions.
         :param modulename: 目标 module 的名字.
         :param funcs: 需要运行的 funcs.
         :param test_module_name: 测试时创建的临时 module_name.
-        :return: 从队列中逐个取出.
+        :param mode: `thread` runs each function in a thread of this process,
+                     `process` runs the functions in a pool of worker processes,
+                     each worker bootstraps the container once and compiles its own runtime.
+        :param max_workers: the max concurrency, default is the cpu count in process mode, unbounded in thread mode.
+        :param timeout: the timeout of each function in seconds. only the process mode can kill the timeout one.
+        :return: the JUnit-style timing report.
         """
+        if mode == "process":
+            return self._process_run_moss_func(
+                modulename=modulename,
+                funcs=funcs,
+                callback=callback,
+                test_module_name=test_module_name,
+                max_workers=max_workers,
+                timeout=timeout,
+            )
+        elif mode != "thread":
+            raise ValueError(f"invalid parallel mode {mode}")
+        return self._thread_run_moss_func(
+            modulename=modulename,
+            funcs=funcs,
+            callback=callback,
+            test_module_name=test_module_name,
+            max_workers=max_workers,
+            timeout=timeout,
+        )
+
+    def _thread_run_moss_func(
+            self, *,
+            modulename: str,
+            funcs: List[str],
+            callback: Callable[[str, Execution], None],
+            test_module_name: str,
+            max_workers: Optional[int],
+            timeout: Optional[float],
+    ) -> MossTestReport:
+        report = MossTestReport(modulename=modulename)
+        batch_start = time.perf_counter()
         queue = Queue()
 
         def runner(fn: str, q: Queue) -> None:
@@ -104,30 +247,150 @@ class MossTestSuite:
             测试用 queue 来阻塞返回结果.
             :param fn: 要测试的方法名.
             :param q: 队列
-            :param c: condition
-            :param
             """
-            r = self.run(
-                modulename=modulename,
-                test_module_name=test_module_name,
-                target=fn,
-                args=['moss'],
-            )
-            q.put((fn, r))
+            start = time.perf_counter()
+            try:
+                r = self.run(
+                    modulename=modulename,
+                    test_module_name=test_module_name,
+                    target=fn,
+                    args=['moss'],
+                )
+                q.put((fn, r, "", time.perf_counter() - start))
+            except Exception:
+                q.put((fn, None, traceback.format_exc(), time.perf_counter() - start))
 
+        pending = list(funcs)
+        running: Dict[str, float] = {}
         threads = []
-        for func in funcs:
-            t = Thread(target=runner, args=(func, queue))
-            t.start()
-            threads.append(t)
-
-        i = 0
-        while i < len(threads):
-            result = queue.get(block=True)  # 获取数据
-            name, moss_result = result
-            callback(name, moss_result)
-            i += 1
-
-        queue.task_done()
-        for t in threads:
-            t.join()
+        while pending or running:
+            while pending and (not max_workers or len(running) < max_workers):
+                func = pending.pop(0)
+                t = Thread(target=runner, args=(func, queue), daemon=True)
+                running[func] = time.perf_counter()
+                t.start()
+                threads.append(t)
+            try:
+                name, moss_result, error, elapsed = queue.get(block=True, timeout=0.1)  # 获取数据
+            except Empty:
+                if timeout is not None:
+                    now = time.perf_counter()
+                    for func, started in list(running.items()):
+                        if now - started > timeout:
+                            # thread can not be killed, just stop waiting for it.
+                            del running[func]
+                            report.cases.append(MossTestCaseReport(
+                                name=func, status="timeout", elapsed=now - started,
+                                error=f"function `{func}` timeout after {timeout} seconds",
+                            ))
+                continue
+            if name not in running:
+                # already timeout
+                continue
+            del running[name]
+            self._report_result(report, callback, name, moss_result, error, elapsed)
+
+        report.elapsed = time.perf_counter() - batch_start
+        return report
+
+    def _process_run_moss_func(
+            self, *,
+            modulename: str,
+            funcs: List[str],
+            callback: Callable[[str, Execution], None],
+            test_module_name: str,
+            max_workers: Optional[int],
+            timeout: Optional[float],
+    ) -> MossTestReport:
+        if self._container_factory is None:
+            raise AttributeError("process mode requires the container_factory of the MossTestSuite")
+        if not max_workers:
+            max_workers = multiprocessing.cpu_count()
+        report = MossTestReport(modulename=modulename)
+        batch_start = time.perf_counter()
+        ctx = multiprocessing.get_context("spawn")
+        pending = list(funcs)
+        pool = None
+        # future => (func, submitted at)
+        running: Dict[Future, tuple] = {}
+        try:
+            while pending or running:
+                if pool is None:
+                    # the workers bootstrap the container once, and are reused by the functions.
+                    pool = ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        mp_context=ctx,
+                        initializer=_init_moss_func_worker,
+                        initargs=(self._container_factory,),
+                    )
+                # bounded concurrency, so the timeout counts from the submission.
+                while pending and len(running) < max_workers:
+                    func = pending.pop(0)
+                    future = pool.submit(_moss_func_process_runner, modulename, test_module_name, func)
+                    running[future] = (func, time.perf_counter())
+
+                done, _ = wait(list(running.keys()), timeout=0.1, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    func, started = running.pop(future)
+                    try:
+                        name, moss_result, error, elapsed = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        name, moss_result, elapsed = func, None, time.perf_counter() - started
+                        error = f"worker process of `{func}` exited without any result"
+                    except BaseException:
+                        # such as SystemExit raised by the function.
+                        name, moss_result, elapsed = func, None, time.perf_counter() - started
+                        error = traceback.format_exc()
+                    # stream the result in completion order.
+                    self._report_result(report, callback, name, moss_result, error, elapsed)
+
+                now = time.perf_counter()
+                for future, (func, started) in list(running.items()):
+                    if timeout is not None and now - started > timeout:
+                        broken = True
+                        del running[future]
+                        report.cases.append(MossTestCaseReport(
+                            name=func, status="timeout", elapsed=now - started,
+                            error=f"function `{func}` timeout after {timeout} seconds",
+                        ))
+                if broken:
+                    # the hanging or dead worker can not be reused, run the others again in a new pool.
+                    pending = [func for func, _ in running.values()] + pending
+                    running.clear()
+                    self._kill_pool(pool)
+                    pool = None
+        finally:
+            if pool is not None:
+                if running:
+                    self._kill_pool(pool)
+                else:
+                    pool.shutdown(wait=True)
+
+        report.elapsed = time.perf_counter() - batch_start
+        return report
+
+    @staticmethod
+    def _kill_pool(pool: ProcessPoolExecutor) -> None:
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        for p in processes:
+            p.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        for p in processes:
+            p.join()
+
+    @staticmethod
+    def _report_result(
+            report: MossTestReport,
+            callback: Callable[[str, Execution], None],
+            name: str,
+            moss_result: Optional[Execution],
+            error: str,
+            elapsed: float,
+    ) -> None:
+        if moss_result is None:
+            report.cases.append(MossTestCaseReport(name=name, status="failed", elapsed=elapsed, error=error))
+            return
+        report.cases.append(MossTestCaseReport(name=name, status="passed", elapsed=elapsed))
+        callback(name, moss_result)
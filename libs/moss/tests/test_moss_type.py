@@ -28,3 +28,56 @@ def test_with_default_moss_type():
 
         prompt = rtm.prompter().get_imported_attrs_prompt()
         assert "RandomMoss(" in prompt
+
+
+def test_moss_type_meta_cached():
+    from ghostos_moss.examples import baseline
+    from ghostos_moss.pycontext import PyContext
+    from ghostos_moss.moss_impl import get_moss_type_meta
+
+    stub_types = []
+    for i in range(2):
+        compiler = get_moss_compiler()
+        compiler.join_context(PyContext(module=baseline.__name__))
+        with compiler:
+            rtm = compiler.compile("__test__")
+            with rtm:
+                moss = rtm.moss()
+                assert getattr(moss, "foo") is not None
+                stub_types.append(type(moss))
+                meta = get_moss_type_meta(rtm.moss_type(), rtm.module(), rtm.prompter().get_source_code(False))
+                assert "foo" in dict(meta.injectable)
+    assert stub_types[0] is stub_types[1]
+
+
+def test_moss_type_meta_does_not_leak_the_type():
+    import gc
+    from ghostos_moss.pycontext import PyContext
+
+    code = """
+from ghostos_moss import Moss as Parent
+
+
+class Moss(Parent):
+    foo: int = 1
+
+    def hello(self) -> "Moss":
+        return self
+"""
+
+    def compile_once():
+        compiler = get_moss_compiler()
+        compiler.join_context(PyContext(code=code))
+        with compiler:
+            rtm = compiler.compile("__test_moss_type_leak__")
+            with rtm:
+                rtm.moss()
+
+    for i in range(5):
+        compile_once()
+    gc.collect()
+    alive = [
+        o for o in gc.get_objects()
+        if isinstance(o, type) and o.__module__ == "__test_moss_type_leak__"
+    ]
+    assert alive == []
@@ -0,0 +1,88 @@
+from ghostos_moss import moss_container, MossCompiler, PyContext, DefaultMossRuntimePool
+from ghostos_moss.examples import baseline
+
+
+def test_runtime_pool_reuse_compiled_module():
+    container = moss_container()
+    pool = DefaultMossRuntimePool(max_idle_per_key=1)
+
+    def compile_runtime(bar: int):
+        compiler = container.force_fetch(MossCompiler)
+        compiler.join_context(PyContext(module=baseline.__name__))
+        compiler.injects(bar=bar)
+        compiler.with_runtime_pool(pool, "ghost")
+        with compiler:
+            return compiler.compile("__test__")
+
+    runtime = compile_runtime(1)
+    module = runtime.module()
+    with runtime:
+        result = runtime.execute(target="test_main", code="foo = 123", local_args=["moss"])
+        assert result.returns == 3
+        assert getattr(runtime.moss(), "bar") == 1
+        assert "foo" in module.__dict__
+    assert pool.size() == 1
+
+    runtime2 = compile_runtime(2)
+    assert pool.size() == 0
+    assert runtime2 is runtime
+    with runtime2:
+        assert runtime2.module() is module
+        # the values defined by the executed code are cleared.
+        assert "foo" not in module.__dict__
+        assert getattr(runtime2.moss(), "bar") == 2
+        assert runtime2.dump_std_output() == ""
+        result = runtime2.execute(target="test_main", local_args=["moss"])
+        assert result.returns == 3
+        assert result.pycontext.get_prop("bar") == 2
+
+    # concurrent checkout compiles a new one, the pool is bounded.
+    r1 = compile_runtime(3)
+    r2 = compile_runtime(4)
+    assert r1 is not r2
+    r1.close()
+    r2.close()
+    assert pool.size() == 1
+    assert pool.evict(idle_seconds=0) == 1
+    assert pool.size() == 0
+    container.shutdown()
+
+
+def test_runtime_pool_restore_module_values():
+    container = moss_container()
+    pool = DefaultMossRuntimePool(max_idle_per_key=1)
+    code = "data = []\n\ndef main(moss):\n    data.append(1)\n    return len(data)\n"
+
+    def compile_runtime(**local_values):
+        compiler = container.force_fetch(MossCompiler)
+        compiler.join_context(PyContext(code=code))
+        compiler.with_locals(**local_values)
+        compiler.with_runtime_pool(pool, "ghost")
+        import_hook = compiler._predefined_locals["__import__"]
+        with compiler:
+            return compiler.compile("__test__"), import_hook
+
+    runtime, _ = compile_runtime()
+    with runtime:
+        assert runtime.execute(target="main", local_args=["moss"]).returns == 1
+
+    runtime2, import_hook = compile_runtime()
+    assert runtime2 is runtime
+    with runtime2:
+        # the mutated module level value is restored.
+        assert runtime2.execute(target="main", local_args=["moss"]).returns == 1
+        # the import hook is bound to the new compiler.
+        assert runtime2.module().__dict__["__import__"] is import_hook
+
+    # different locals compile a new module.
+    runtime3, _ = compile_runtime(extra=object())
+    assert runtime3 is not runtime
+    runtime3.close()
+    container.shutdown()
+
+
+def test_runtime_pool_is_optional_for_compilers():
+    # the third-party compilers are not required to support pooling.
+    assert "with_runtime_pool" not in MossCompiler.__abstractmethods__
+    compiler = moss_container().force_fetch(MossCompiler)
+    assert MossCompiler.with_runtime_pool(compiler, DefaultMossRuntimePool(), "key") is compiler
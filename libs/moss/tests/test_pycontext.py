@@ -63,3 +63,28 @@ foo = Foo()
     p = PyContext(**j)
     # 从当前 module 里重新还原出来.
     assert p.get_prop("foo", module) == foo
+
+
+def test_pycontext_dirty_props():
+    pycontext = PyContext()
+    assert not pycontext.is_dirty()
+    pycontext.set_prop("foo", 123)
+    pycontext.set_prop("bar", [1, 2, 3])
+    assert pycontext.dirty_props() == {"foo", "bar"}
+
+    forked = pycontext.fork()
+    assert not forked.is_dirty()
+    # the entity metas are shared
+    assert forked.properties["bar"] is pycontext.properties["bar"]
+    forked.set_prop("foo", 123)
+    forked.set_prop("bar", [1, 2, 3])
+    assert not forked.is_dirty()
+    forked.set_prop("bar", [1, 2])
+    assert forked.dirty_props() == {"bar"}
+    # do not pollute the origin one.
+    assert pycontext.get_prop("bar") == [1, 2, 3]
+    assert forked.get_prop("bar") == [1, 2]
+    assert forked.get_prop("foo") == 123
+
+    data = json.loads(forked.model_dump_json())
+    assert PyContext(**data).get_prop("bar") == [1, 2]
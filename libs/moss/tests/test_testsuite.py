@@ -0,0 +1,48 @@
+from ghostos_moss import moss_test_suite
+from ghostos_moss.examples import suite_example
+
+
+def test_run_module_tests_in_threads():
+    suite = moss_test_suite()
+    results = {}
+    report = suite.run_module_tests(
+        modulename=suite_example.__name__,
+        callback=lambda name, r: results.__setitem__(name, r.returns),
+    )
+    assert results == {"test_1": 1, "test_2": 2, "test_3": 3}
+    assert len(report.cases) == 3
+    assert not report.failures()
+
+
+def test_run_module_tests_in_processes():
+    suite = moss_test_suite()
+    names = []
+    report = suite.run_module_tests(
+        modulename=suite_example.__name__,
+        callback=lambda name, r: names.append(name),
+        mode="process",
+        max_workers=2,
+        timeout=60,
+    )
+    # streamed in completion order.
+    assert [case.name for case in report.cases] == names
+    assert set(names) == {"test_1", "test_2", "test_3"}
+    xml = report.to_junit_xml()
+    assert 'tests="3"' in xml
+    assert 'failures="0"' in xml
+
+
+def test_process_mode_exit_and_timeout():
+    suite = moss_test_suite()
+    names = []
+    report = suite.parallel_run_moss_func(
+        modulename=suite_example.__name__,
+        funcs=["test_1", "test_exit", "test_hang", "test_2"],
+        callback=lambda name, r: names.append(name),
+        mode="process",
+        max_workers=2,
+        timeout=5,
+    )
+    status = {case.name: case.status for case in report.cases}
+    assert status == {"test_1": "passed", "test_2": "passed", "test_exit": "failed", "test_hang": "timeout"}
+    assert set(names) == {"test_1", "test_2"}